@@ -0,0 +1,122 @@
+"""
+Micro-benchmark: decoding a PodList into client models vs orjson + PodRecord.
+
+Usage:
+    python -m benchmarks.bench_decode --pods 5000
+"""
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+from types import SimpleNamespace
+import orjson
+from kubernetes.client import ApiClient
+from src.utils.records import PodRecord
+
+
+def make_pod_list(count):
+    """
+    Build a PodList body shaped like the pods of k8s_manifests/scale-test.yaml.
+    """
+    items = []
+    for i in range(count):
+        name = f"scale-test-5d8f7c9b6d-{i:05d}"
+        items.append({
+            "metadata": {
+                "name": name,
+                "namespace": "scale-test",
+                "uid": f"00000000-0000-0000-0000-{i:012d}",
+                "resourceVersion": str(100000 + i),
+                "creationTimestamp": "2024-12-01T10:00:00Z",
+                "labels": {"app": "date-logger", "pod-template-hash": "5d8f7c9b6d"},
+                "ownerReferences": [{
+                    "apiVersion": "apps/v1", "kind": "ReplicaSet", "name": "scale-test-5d8f7c9b6d",
+                    "uid": "00000000-0000-0000-0000-000000000001", "controller": True, "blockOwnerDeletion": True,
+                }],
+            },
+            "spec": {
+                "nodeName": f"gke-nap-n2-spot-{i // 32:04d}",
+                "nodeSelector": {"cloud.google.com/compute-class": "scale-testing-cc"},
+                "containers": [{
+                    "name": "date-logger",
+                    "image": "busybox:latest",
+                    "command": ["/bin/sh", "-c", "while true; do date; sleep 600; done"],
+                    "resources": {"requests": {"cpu": "2"}},
+                    "terminationMessagePath": "/dev/termination-log",
+                    "imagePullPolicy": "Always",
+                }],
+                "restartPolicy": "Always",
+                "schedulerName": "default-scheduler",
+                "tolerations": [
+                    {"key": "node.kubernetes.io/not-ready", "operator": "Exists", "effect": "NoExecute", "tolerationSeconds": 300},
+                    {"key": "node.kubernetes.io/unreachable", "operator": "Exists", "effect": "NoExecute", "tolerationSeconds": 300},
+                ],
+            },
+            "status": {
+                "phase": "Running",
+                "hostIP": "10.128.0.10",
+                "podIP": f"10.4.{i // 256}.{i % 256}",
+                "startTime": "2024-12-01T10:00:30Z",
+                "conditions": [
+                    {"type": "Initialized", "status": "True", "lastTransitionTime": "2024-12-01T10:00:30Z"},
+                    {"type": "Ready", "status": "True", "lastTransitionTime": "2024-12-01T10:00:42Z"},
+                    {"type": "ContainersReady", "status": "True", "lastTransitionTime": "2024-12-01T10:00:42Z"},
+                    {"type": "PodScheduled", "status": "True", "lastTransitionTime": "2024-12-01T10:00:05Z"},
+                ],
+                "containerStatuses": [{
+                    "name": "date-logger", "ready": True, "restartCount": 0, "started": True,
+                    "image": "docker.io/library/busybox:latest", "imageID": "docker.io/library/busybox@sha256:0",
+                    "containerID": f"containerd://{i:064x}",
+                    "state": {"running": {"startedAt": "2024-12-01T10:00:41Z"}},
+                }],
+            },
+        })
+    return json.dumps({"kind": "PodList", "apiVersion": "v1", "metadata": {"resourceVersion": "200000"}, "items": items}).encode()
+
+
+def measure(decode, data):
+    # Time and memory are measured in separate runs; tracemalloc slows decoding down.
+    # Like timeit, the cyclic garbage collector is paused while timing.
+    gc.collect()
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        result = decode(data)
+        elapsed = time.perf_counter() - start
+    finally:
+        gc.enable()
+    del result
+    gc.collect()
+    tracemalloc.start()
+    result = decode(data)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pods", type=int, default=5000, help="Pods in the synthetic PodList.")
+    args = parser.parse_args()
+
+    data = make_pod_list(args.pods)
+    api_client = ApiClient()
+
+    def decode_models(body):
+        return api_client.deserialize(SimpleNamespace(data=body), "V1PodList").items
+
+    def decode_records(body):
+        return [PodRecord.from_dict(item) for item in orjson.loads(body)["items"]]
+
+    print(f"PodList with {args.pods} pods: {len(data) / 1e6:.1f} MB of JSON")
+    models, model_seconds, model_peak = measure(decode_models, data)
+    records, record_seconds, record_peak = measure(decode_records, data)
+    assert len(models) == len(records) == args.pods
+    print(f"client models     : {model_seconds:8.3f}s  peak {model_peak / 1e6:8.1f} MB")
+    print(f"orjson + records  : {record_seconds:8.3f}s  peak {record_peak / 1e6:8.1f} MB")
+    print(f"speedup           : {model_seconds / record_seconds:8.1f}x  memory {model_peak / record_peak:.1f}x smaller")
+
+
+if __name__ == "__main__":
+    main()
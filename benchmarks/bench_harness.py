@@ -0,0 +1,70 @@
+"""
+Benchmark the harness (waiter, informer cache, lifecycle metrics) against the fake API server.
+
+Usage:
+    python -m benchmarks.bench_harness --pods 10000
+"""
+import argparse
+import time
+from src.utils.k8s_client import KubernetesClient
+from src.utils.pod_lifecycle import PodLifecycleCollector
+from src.utils.waiter import deployment_scaled_to, wait_for_deployment
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pods", type=int, default=10000, help="Replicas to scale the deployment to.")
+    parser.add_argument("--pods-per-second", type=int, default=5000, help="Simulated pod creation rate.")
+    parser.add_argument("--pods-per-node", type=int, default=110, help="Simulated pod capacity per node.")
+    parser.add_argument("--timeout", type=float, default=600, help="Scale-up timeout in seconds.")
+    parser.add_argument("--fast-decode", action="store_true", help="Cache slim records instead of client models.")
+    args = parser.parse_args()
+
+    k8s = KubernetesClient(fast_decode=args.fast_decode)
+    if k8s.fake_server is None:
+        raise SystemExit("Set config_mode = \"fake\" (or SCALE_TEST_K8S__CONFIG_MODE=fake) to run this benchmark.")
+    settings = k8s.fake_server.cluster.settings
+    settings.update(pods_per_second=args.pods_per_second, pods_per_node=args.pods_per_node)
+    namespace = k8s.settings.k8s.namespace
+    deployment_name = k8s.settings.k8s.deployment_name
+    apps_api = k8s.get_client("AppsV1Api")
+
+    try:
+        start = time.perf_counter()
+        pods = k8s.get_informer("pods")
+        nodes = k8s.get_informer("nodes")
+        print(f"informer initial sync: {time.perf_counter() - start:.3f}s")
+
+        apps_api.patch_namespaced_deployment_scale(
+            name=deployment_name, namespace=namespace, body={"spec": {"replicas": args.pods}}
+        )
+        _, elapsed = wait_for_deployment(
+            apps_api,
+            deployment_name,
+            namespace,
+            deployment_scaled_to(args.pods),
+            args.timeout,
+            fast_decode=k8s.fast_decode,
+        )
+        print(f"scale to {args.pods} observed by waiter: {elapsed:.3f}s")
+
+        lag = pods.wait_until(lambda cache: cache.count("ready", True) >= args.pods, args.timeout)
+        print(f"pod informer caught up {lag:.3f}s later ({len(pods)} pods, {len(nodes)} nodes cached)")
+
+        start = time.perf_counter()
+        for _ in range(1000):
+            nodes.count("ready", True)
+        print(f"ready node count: {(time.perf_counter() - start) * 1e3:.3f}us per lookup")
+
+        start = time.perf_counter()
+        collector = PodLifecycleCollector(pods.by_index("owner_deployment", deployment_name))
+        summary = collector.summary()
+        print(f"lifecycle summary over {len(collector)} pods: {time.perf_counter() - start:.3f}s")
+        print(collector.format_summary())
+        print(f"ready p99: {summary['ready']['p99']:.3f}s")
+    finally:
+        k8s.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,18 @@
+Feature: Concurrent scaling with the async client
+  As a Kubernetes user
+  I want one event loop to scale several deployments and follow their watches
+  So that concurrent scale operations do not need a thread or process each
+
+  Scenario: Scale two deployments concurrently with the async client
+    Given a Kubernetes cluster is running
+    And deployments named "scale-test" and "3-container-scale-test" exist
+    When I scale "scale-test" to 100 replicas and "3-container-scale-test" to 20 replicas with the async client
+    Then both deployments should have all replicas available
+    And I scale both deployments back with the async client
+
+  Scenario: Relist when the async watch's resourceVersion expired
+    Given a Kubernetes cluster is running
+    And deployments named "scale-test" and "3-container-scale-test" exist
+    When I wait with the async client for "scale-test" to scale to 20 replicas after its watch expired
+    Then the async wait should have relisted and seen 20 available replicas
+    And I scale both deployments back with the async client
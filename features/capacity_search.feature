@@ -0,0 +1,11 @@
+Feature: Deployment capacity within a pod readiness SLO
+  As a Kubernetes user
+  I want to find the largest replica count a cluster can bring up within an SLO
+  So that I can track one capacity number per cluster configuration
+
+  Scenario: Search the largest scale-up whose pods become ready within the SLO
+    Given a Kubernetes cluster is running
+    And a deployment named "scale-test" exists in the "scale-test" namespace
+    When I search for the largest replica count between 100 and 10000 with a ready p99 under 240 seconds
+    Then the deployment should sustain at least 100 replicas within the SLO
+    And I log the capacity search trials
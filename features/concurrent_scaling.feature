@@ -0,0 +1,16 @@
+Feature: Concurrent scaling across namespace shards
+  As a Kubernetes user
+  I want several independent clients to scale their own deployments at the same time
+  So that I can measure the control plane under concurrent load rather than one client's requests
+
+  Scenario: Scale every shard at once
+    Given a Kubernetes cluster is running
+    When 4 load workers each scale a clone of "scale-test" to 250 replicas at once
+    Then every load worker should have finished without errors
+    And I log the merged pod latency distributions
+
+  Scenario: Scale the shards one after another
+    Given a Kubernetes cluster is running
+    When 4 load workers each scale a clone of "scale-test" to 250 replicas staggered by 2 seconds
+    Then every load worker should have finished without errors
+    And I log the merged pod latency distributions
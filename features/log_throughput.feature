@@ -0,0 +1,12 @@
+Feature: Pod log ingest throughput
+  As a Kubernetes user
+  I want to stream the logs of every replica of a high-volume logging deployment at once
+  So that I can analyze how log volume affects kubelet and API server performance
+
+  Scenario: Stream the logs of every peak-logging replica concurrently
+    Given a Kubernetes cluster is running
+    And a deployment named "peak-logging" exists in the "scale-test" namespace
+    When I scale "peak-logging" to 10 replicas
+    And I stream the logs of every "peak-logging" pod for up to 60 seconds
+    Then every pod should have produced log output
+    And I log the per-pod and total log throughput
@@ -0,0 +1,11 @@
+Feature: Record and replay of API traffic
+  As a Kubernetes user
+  I want to record the API traffic of a scale test and replay it without a cluster
+  So that I can rerun the analysis of a past run without paying for another one
+
+  Scenario: Replay a recorded scale-up offline
+    Given a Kubernetes cluster is running
+    When I record the API traffic of scaling "scale-test" to 50 replicas
+    And I replay the recording
+    Then the replay should report the recorded deployment and pods
+    And every replayed request should have been recorded
@@ -3,6 +3,22 @@ Feature: Scale deployment to 1000 replicas
   Scenario: Successfully scale an existing deployment to 1000 replicas
     Given a Kubernetes cluster is running
     And a deployment named "scale-test" exists
+    And the deployment "scale-test" is scaled to 3 replicas
     When I scale "scale-test" to 1000 replicas
     Then the deployment should have exactly 1000 replicas
     And all replicas should be running and available
+
+  Scenario Outline: Scale an existing deployment through a matrix of replica counts
+    Given a Kubernetes cluster is running
+    And a deployment named "scale-test" exists
+    And the deployment "scale-test" is scaled to 3 replicas
+    When I scale "scale-test" to <replicas> replicas
+    Then the deployment should have exactly <replicas> replicas
+    And all replicas should be running and available
+
+    Examples:
+      | replicas |
+      | 100      |
+      | 1000     |
+      | 5000     |
+      | 10000    |
@@ -3,5 +3,9 @@ Feature: Scale deployment down to 1 replica
   Scenario: Successfully scale an existing deployment down to 1 replica
     Given a Kubernetes cluster is running
     And a deployment named "scale-test" exists in the "scale-test" namespace
+    And the deployment has been scaled up to 500 replicas
     When I scale "scale-test" to 1 replica in the "scale-test" namespace
     Then the deployment should have exactly 1 replica
+    And every removed pod should be gone within 300 seconds
+    And the drained compute-class nodes should be removed within 1800 seconds
+    And I log the pod termination latencies and the node scale-down timeline
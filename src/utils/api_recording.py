@@ -0,0 +1,568 @@
+import argparse
+import atexit
+import collections
+import functools
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+import zlib
+from urllib.parse import parse_qsl, urlencode, urlsplit
+import orjson
+from urllib3 import HTTPHeaderDict
+from urllib3.exceptions import ProtocolError
+from src.utils.logging_util import get_logger
+
+logger = get_logger(__name__)
+
+# File layout: MAGIC, then zlib-compressed blocks of frames. Blocks are only ever appended, so a
+# recording cut short by a crash is readable up to its last complete block.
+MAGIC = b"K8SREC\x00\x01"
+BLOCK_HEADER = struct.Struct("<II")  # compressed length, uncompressed length
+FRAME_HEADER = struct.Struct("<BIdI")  # frame type, exchange ID, epoch seconds, payload length
+REQUEST, RESPONSE, CHUNK, END, ERROR = range(5)
+DEFAULT_BLOCK_SIZE = 1024 * 1024
+# Query parameters that differ between otherwise identical requests (watch timeouts count down,
+# resume points follow the served events); requests are matched without them.
+VOLATILE_PARAMS = frozenset(("timeoutSeconds", "resourceVersion"))
+# Methods whose `fields` urllib3 encodes into the URL.
+URL_FIELD_METHODS = frozenset(("DELETE", "GET", "HEAD", "OPTIONS"))
+
+
+def _full_url(method, url, fields):
+    if fields and method in URL_FIELD_METHODS:
+        url += ("&" if "?" in url else "?") + urlencode(fields)
+    return url
+
+
+def _path(url):
+    parts = urlsplit(url)
+    return f"{parts.path}?{parts.query}" if parts.query else parts.path
+
+
+def _body_text(body):
+    if body is None:
+        return ""
+    return body.decode("utf-8", errors="replace") if isinstance(body, bytes) else str(body)
+
+
+def request_key(method, url, body):
+    """
+    Return the key a replayed request is matched on: method, path, query without
+    `VOLATILE_PARAMS` (in sorted order) and body.
+    """
+    parts = urlsplit(url)
+    query = sorted((name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+                   if name not in VOLATILE_PARAMS)
+    return method, parts.path, urlencode(query), body
+
+
+def _is_stream(url):
+    query = dict(parse_qsl(urlsplit(url).query))
+    return query.get("watch") == "true" or query.get("follow") == "true"
+
+
+class ApiRecorder:
+    """
+    Appends timestamped API requests, response headers and response body chunks to a
+    compressed recording file.
+
+    Frames are buffered and written as one zlib-compressed block every `block_size`
+    bytes (and on `flush`), so watch streams and log chunks cost a memory copy each,
+    not a write. The recorder is thread-safe.
+    """
+
+    def __init__(self, path, block_size=DEFAULT_BLOCK_SIZE):
+        """
+        Initializes the recorder, truncating `path`.
+
+        Args:
+            path (str): Recording file.
+            block_size (int): Uncompressed bytes buffered before a block is written.
+        """
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.block_size = block_size
+        self._file = open(path, "wb")
+        self._file.write(MAGIC)
+        self._buffer = bytearray()
+        self._lock = threading.Lock()
+        self.exchanges = 0  # Requests recorded; also the ID of the next one
+        self.bytes_written = len(MAGIC)
+        logger.info("Recording API traffic to %s.", path)
+
+    def _frame(self, frame_type, exchange, payload=b""):
+        with self._lock:
+            self._buffer += FRAME_HEADER.pack(frame_type, exchange, time.time(), len(payload))
+            self._buffer += payload
+            if len(self._buffer) >= self.block_size:
+                self._write_block()
+
+    def _write_block(self):
+        if not self._buffer or self._file is None:
+            return
+        compressed = zlib.compress(self._buffer)
+        self._file.write(BLOCK_HEADER.pack(len(compressed), len(self._buffer)))
+        self._file.write(compressed)
+        self._file.flush()
+        self.bytes_written += BLOCK_HEADER.size + len(compressed)
+        self._buffer.clear()
+
+    def request(self, method, url, body=None):
+        """
+        Record a request and return the ID its response frames are recorded under.
+        """
+        with self._lock:
+            exchange = self.exchanges
+            self.exchanges += 1
+        self._frame(REQUEST, exchange, orjson.dumps({"method": method, "url": url, "body": _body_text(body)}))
+        return exchange
+
+    def response(self, exchange, status, reason, headers):
+        self._frame(RESPONSE, exchange, orjson.dumps({"status": status, "reason": reason, "headers": dict(headers)}))
+
+    def chunk(self, exchange, data):
+        self._frame(CHUNK, exchange, data.encode("utf-8") if isinstance(data, str) else bytes(data))
+
+    def end(self, exchange):
+        self._frame(END, exchange)
+
+    def error(self, exchange, exception):
+        self._frame(ERROR, exchange, f"{type(exception).__name__}: {exception}".encode("utf-8"))
+
+    def flush(self):
+        """
+        Write the buffered frames as a block, making them visible to readers.
+        """
+        with self._lock:
+            self._write_block()
+        logger.info("Recorded %s API requests to %s (%s bytes).", self.exchanges, self.path, self.bytes_written)
+
+    def close(self):
+        with self._lock:
+            self._write_block()
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+class _RecordingResponse:
+    """
+    Proxy of a streamed urllib3 response that records the body as the caller reads it.
+    """
+
+    def __init__(self, response, recorder, exchange):
+        self._response = response
+        self._recorder = recorder
+        self._exchange = exchange
+        self._ended = False
+
+    def __getattr__(self, name):
+        return getattr(self._response, name)
+
+    def _end(self):
+        if not self._ended:
+            self._ended = True
+            self._recorder.end(self._exchange)
+
+    @property
+    def data(self):
+        data = self._response.data
+        if not self._ended:
+            if data:
+                self._recorder.chunk(self._exchange, data)
+            self._end()
+        return data
+
+    def stream(self, amt=2 ** 16, decode_content=None):
+        try:
+            for chunk in self._response.stream(amt, decode_content=decode_content):
+                self._recorder.chunk(self._exchange, chunk)
+                yield chunk
+        finally:
+            self._end()
+
+    def read(self, amt=None, decode_content=None, cache_content=False):
+        data = self._response.read(amt=amt, decode_content=decode_content, cache_content=cache_content)
+        if data:
+            self._recorder.chunk(self._exchange, data)
+        if amt is None or not data:
+            self._end()
+        return data
+
+    def release_conn(self):
+        self._end()
+        self._response.release_conn()
+
+    def close(self):
+        self._end()
+        self._response.close()
+
+
+class RecordingPoolManager:
+    """
+    urllib3 pool manager wrapper (installed as an ApiClient's `rest_client.pool_manager`)
+    that records every request and its response.
+    """
+
+    def __init__(self, pool_manager, recorder):
+        self.pool_manager = pool_manager
+        self.recorder = recorder
+
+    def __getattr__(self, name):
+        return getattr(self.pool_manager, name)
+
+    def request(self, method, url, fields=None, headers=None, preload_content=True, **kwargs):
+        exchange = self.recorder.request(method, _path(_full_url(method, url, fields)), kwargs.get("body"))
+        try:
+            response = self.pool_manager.request(
+                method, url, fields=fields, headers=headers, preload_content=preload_content, **kwargs
+            )
+        except Exception as e:
+            self.recorder.error(exchange, e)
+            raise
+        self.recorder.response(exchange, response.status, response.reason, response.headers)
+        if not preload_content:
+            return _RecordingResponse(response, self.recorder, exchange)
+        if response.data:
+            self.recorder.chunk(exchange, response.data)
+        self.recorder.end(exchange)
+        return response
+
+
+class ApiRecording:
+    """
+    Read-only view of a recording file.
+
+    The file is memory-mapped and only the block headers are read up front; blocks are
+    decompressed on demand and a few are cached, so concurrent readers at similar
+    positions (e.g. replayed watches) share the work and a multi-GB recording never
+    has to fit in memory.
+    """
+
+    def __init__(self, path, cached_blocks=8):
+        """
+        Initializes the recording.
+
+        Args:
+            path (str): Recording file written by ApiRecorder.
+            cached_blocks (int): Number of decompressed blocks kept in memory.
+
+        Raises:
+            ValueError: If the file is not a recording.
+        """
+        self.path = path
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not an API recording.")
+        self.blocks = []  # File offset of each block
+        offset = len(MAGIC)
+        while offset + BLOCK_HEADER.size <= len(self._map):
+            compressed_length, _ = BLOCK_HEADER.unpack_from(self._map, offset)
+            if offset + BLOCK_HEADER.size + compressed_length > len(self._map):
+                logger.warning("Ignoring the truncated last block of %s.", path)
+                break
+            self.blocks.append(offset)
+            offset += BLOCK_HEADER.size + compressed_length
+        self._cache = collections.OrderedDict()
+        self._cached_blocks = cached_blocks
+        self._lock = threading.Lock()
+
+    def block(self, number):
+        """
+        Return the decompressed frames of a block.
+        """
+        with self._lock:
+            if number in self._cache:
+                self._cache.move_to_end(number)
+                return self._cache[number]
+        offset = self.blocks[number]
+        compressed_length, _ = BLOCK_HEADER.unpack_from(self._map, offset)
+        start = offset + BLOCK_HEADER.size
+        data = zlib.decompress(self._map[start:start + compressed_length])
+        with self._lock:
+            self._cache[number] = data
+            if len(self._cache) > self._cached_blocks:
+                self._cache.popitem(last=False)
+        return data
+
+    def iter_frames(self, start_block=0):
+        """
+        Yield (block number, frame type, exchange ID, epoch seconds, payload) of every
+        frame, decompressing one block at a time.
+        """
+        for number in range(start_block, len(self.blocks)):
+            data = self.block(number)
+            view = memoryview(data)
+            offset = 0
+            while offset < len(data):
+                frame_type, exchange, timestamp, length = FRAME_HEADER.unpack_from(data, offset)
+                offset += FRAME_HEADER.size
+                yield number, frame_type, exchange, timestamp, view[offset:offset + length]
+                offset += length
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+
+class _ReplayConnection:
+    """
+    Stands in for the connection and socket of a replayed response, so callers that
+    interrupt streams with `response.connection.sock.shutdown()` can stop replays too.
+    """
+
+    def __init__(self, closed):
+        self.sock = self
+        self._closed = closed
+
+    def shutdown(self, how=None):
+        self._closed.set()
+
+
+class _ReplayResponse:
+    """
+    Minimal urllib3 response serving recorded body chunks.
+    """
+
+    def __init__(self, status, reason, headers, chunks, closed):
+        self.status = status
+        self.reason = reason
+        self.headers = HTTPHeaderDict(headers)
+        self.connection = _ReplayConnection(closed)
+        self._chunks = chunks
+        self._closed = closed
+        self._buffer = b""
+        self._body = None
+
+    def getheaders(self):
+        return self.headers
+
+    def getheader(self, name, default=None):
+        return self.headers.get(name, default)
+
+    def stream(self, amt=2 ** 16, decode_content=None):
+        if self._buffer:
+            buffer, self._buffer = self._buffer, b""
+            yield buffer
+        for chunk in self._chunks:
+            if self._closed.is_set():
+                break
+            yield chunk
+
+    def read(self, amt=None, decode_content=None, cache_content=False):
+        if amt is None:
+            return b"".join(self.stream())
+        while len(self._buffer) < amt:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                break
+            self._buffer += chunk
+        data, self._buffer = self._buffer[:amt], self._buffer[amt:]
+        return data
+
+    @property
+    def data(self):
+        if self._body is None:
+            self._body = self.read()
+        return self._body
+
+    def release_conn(self):
+        self._closed.set()
+
+    def close(self):
+        self._closed.set()
+
+
+class ReplayPoolManager:
+    """
+    urllib3 pool manager stand-in that answers requests from a recording.
+
+    Requests are matched on `request_key`; recorded exchanges with the same key are
+    served in recorded order. Once they are used up, reads repeat the last recorded
+    response and watches and log follows stay open without data until closed. Requests
+    that were never recorded get a 404 Status.
+
+    With `speed` > 0 every response frame is held back until its recorded time,
+    measured from the first request and scaled by `speed` (1.0 replays in real time);
+    with `speed` 0 responses are served as fast as the caller reads them.
+    """
+
+    def __init__(self, recording, speed=1.0):
+        """
+        Initializes the replay and indexes the recorded requests (one pass over the file).
+
+        Args:
+            recording (ApiRecording): The recording to serve.
+            speed (float): Replay speed relative to the recording, 0 for as fast as possible.
+        """
+        self.recording = recording
+        self.speed = speed
+        self._queues = collections.defaultdict(collections.deque)  # request key -> (exchange, block)
+        self._last = {}
+        self._lock = threading.Lock()
+        self._start = None
+        self.origin = None  # Epoch time of the first recorded request
+        self.requests = 0
+        self.misses = 0
+        for block, frame_type, exchange, timestamp, payload in recording.iter_frames():
+            if frame_type == REQUEST:
+                request = orjson.loads(payload)
+                key = request_key(request["method"], request["url"], request["body"])
+                self._queues[key].append((exchange, block))
+                if self.origin is None:
+                    self.origin = timestamp
+        logger.info(
+            "Replaying %s recorded requests from %s at %s.",
+            sum(map(len, self._queues.values())),
+            recording.path,
+            f"{speed:g}x speed" if speed > 0 else "full speed",
+        )
+
+    def clear(self):
+        pass
+
+    def _wait(self, timestamp, closed):
+        if self.speed <= 0:
+            return
+        remaining = self._start + (timestamp - self.origin) / self.speed - time.monotonic()
+        if remaining > 0:
+            closed.wait(remaining)
+
+    def _frames(self, exchange, block, closed):
+        for _, frame_type, frame_exchange, timestamp, payload in self.recording.iter_frames(block):
+            if frame_exchange != exchange or frame_type == REQUEST:
+                continue
+            self._wait(timestamp, closed)
+            if frame_type == END or closed.is_set():
+                return
+            yield frame_type, payload
+
+    def _idle_response(self, closed):
+        def chunks():
+            closed.wait()
+            yield from ()
+
+        return _ReplayResponse(200, "OK", {"Content-Type": "application/json"}, chunks(), closed)
+
+    def _not_found(self, method, url, closed):
+        body = orjson.dumps({
+            "kind": "Status",
+            "apiVersion": "v1",
+            "status": "Failure",
+            "message": f"{method} {url} is not in the recording",
+            "reason": "NotFound",
+            "code": 404,
+        })
+        return _ReplayResponse(404, "Not Found", {"Content-Type": "application/json"}, iter((body,)), closed)
+
+    def _next_exchange(self, key, url):
+        with self._lock:
+            if self._start is None:
+                self._start = time.monotonic()
+            self.requests += 1
+            queue = self._queues.get(key)
+            if queue:
+                self._last[key] = queue.popleft()
+                return self._last[key]
+            if key in self._last and not _is_stream(url):
+                return self._last[key]
+            if key not in self._last:
+                self.misses += 1
+            return None
+
+    def request(self, method, url, fields=None, headers=None, preload_content=True, body=None, **kwargs):
+        url = _path(_full_url(method, url, fields))
+        key = request_key(method, url, _body_text(body))
+        closed = threading.Event()
+        entry = self._next_exchange(key, url)
+        if entry is not None:
+            frames = self._frames(*entry, closed)
+            frame_type, payload = next(frames, (None, None))
+            if frame_type == ERROR:
+                raise ProtocolError(f"Recorded request failed: {bytes(payload).decode()}")
+            if frame_type != RESPONSE:
+                raise ProtocolError(f"The recording has no response to {method} {url}.")
+            head = orjson.loads(payload)
+            chunks = (bytes(payload) for frame_type, payload in frames if frame_type == CHUNK)
+            response = _ReplayResponse(head["status"], head["reason"], head["headers"], chunks, closed)
+        elif key in self._last:
+            response = self._idle_response(closed)
+        else:
+            logger.warning("Replay has no response to %s %s.", method, url)
+            response = self._not_found(method, url, closed)
+        if preload_content:
+            response.data
+        return response
+
+
+@functools.lru_cache(maxsize=None)
+def shared_recorder(path, block_size=DEFAULT_BLOCK_SIZE):
+    """
+    Return the process-wide recorder of `path`, so the clients of successive test modules
+    append to one recording. It is closed when the interpreter exits.
+    """
+    recorder = ApiRecorder(path, block_size)
+    atexit.register(recorder.close)
+    return recorder
+
+
+@functools.lru_cache(maxsize=None)
+def shared_replay(path, speed=1.0):
+    """
+    Return the process-wide replay of `path`, so the clients of successive test modules
+    are served the recording in order.
+    """
+    recording = ApiRecording(path)
+    atexit.register(recording.close)
+    return ReplayPoolManager(recording, speed)
+
+
+def summarize(recording):
+    """
+    Summarize a recording per request path template.
+
+    Args:
+        recording (ApiRecording): The recording.
+
+    Returns:
+        str: Duration, request count, and requests and response bytes per method and path.
+    """
+    requests = {}
+    routes = collections.Counter()
+    received = collections.Counter()
+    first = last = None
+    for _, frame_type, exchange, timestamp, payload in recording.iter_frames():
+        first = timestamp if first is None else first
+        last = timestamp
+        if frame_type == REQUEST:
+            request = orjson.loads(payload)
+            route = f"{request['method']} {urlsplit(request['url']).path}"
+            requests[exchange] = route
+            routes[route] += 1
+        elif frame_type == CHUNK:
+            received[requests.get(exchange)] += len(payload)
+    lines = [f"{len(requests)} requests over {(last or 0) - (first or 0):.1f}s, {len(recording.blocks)} blocks"]
+    for route, count in routes.most_common():
+        lines.append(f"{count:>8} {received[route]:>14} B  {route}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m src.utils.api_recording")
+    parser.add_argument("path", help="Recording file.")
+    args = parser.parse_args(argv)
+    recording = ApiRecording(args.path)
+    try:
+        print(summarize(recording))
+    finally:
+        recording.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,254 @@
+import asyncio
+import time
+from kubernetes_asyncio import client, config, watch
+from kubernetes_asyncio.client.rest import ApiException
+from src.utils.config_util import get_settings
+from src.utils.fake_api_server import FakeApiServer
+from src.utils.logging_util import get_logger
+from src.utils.waiter import HTTP_STATUS_GONE, WaitTimeoutError
+
+logger = get_logger(__name__)
+
+DEFAULT_POOL_SIZE = 100
+
+
+class AsyncKubernetesClient:
+    """
+    Asyncio counterpart of KubernetesClient.
+
+    All API clients share one ApiClient and therefore one aiohttp connection pool, so a
+    single event loop can drive many concurrent scale operations and watch streams.
+
+    Usage:
+        async with AsyncKubernetesClient() as k8s:
+            apps_api = k8s.get_client("AppsV1Api")
+            await apps_api.read_namespaced_deployment(name, namespace)
+    """
+
+    def __init__(self, config_file=None, fake_server=None):
+        """
+        Initializes the async Kubernetes client settings. Call `initialize()` (or use
+        `async with`) before requesting API clients.
+
+        Args:
+            config_file (str): Path to the configuration file (defaults to the shared settings).
+            fake_server (FakeApiServer): Running fake API server to share with a
+                synchronous KubernetesClient when config_mode is "fake".
+        """
+        self.settings = get_settings(config_file)
+        self.api_client = None  # Shared ApiClient (and connection pool)
+        self.api_clients = {}  # Cache for API clients
+        self.fake_server = fake_server
+        self._owns_fake_server = False
+
+    async def __aenter__(self):
+        await self.initialize()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def initialize(self):
+        """
+        Load the Kubernetes configuration and create the shared, pooled ApiClient.
+        """
+        try:
+            logger.info("Initializing async Kubernetes client...")
+            configuration = client.Configuration()
+            config_mode = self.settings.k8s.config_mode
+            if config_mode == "local":
+                logger.debug("Loading kubeconfig for local setup.")
+                await config.load_kube_config(client_configuration=configuration)
+                self._configure_proxy(configuration)
+                self._configure_ssl_settings(configuration)
+            elif config_mode == "in-cluster":
+                logger.debug("Loading in-cluster Kubernetes configuration.")
+                config.load_incluster_config(client_configuration=configuration)
+                self._configure_ssl_settings(configuration)
+            elif config_mode == "fake":
+                if self.fake_server is None:
+                    logger.debug("Starting local fake Kubernetes API server.")
+                    self.fake_server = FakeApiServer(self.settings.fake).start()
+                    self._owns_fake_server = True
+                configuration.host = self.fake_server.url
+            else:
+                logger.error("Invalid config_mode: %s", config_mode)
+                raise ValueError(f"Invalid config_mode: {config_mode}. Use 'local', 'in-cluster' or 'fake'.")
+
+            configuration.connection_pool_maxsize = self.settings.k8s.connection_pool_size or DEFAULT_POOL_SIZE
+            self.api_client = client.ApiClient(configuration)
+            logger.info(
+                "Async Kubernetes client initialized with a pool of %s connections.",
+                configuration.connection_pool_maxsize,
+            )
+        except Exception as e:
+            logger.exception("Failed to initialize async Kubernetes client: %s", e)
+            raise
+
+    def _configure_proxy(self, configuration):
+        """
+        Route requests through the configured HTTP(S) proxy, if any.
+        """
+        proxy_url = self.settings.proxy.https_proxy or self.settings.proxy.http_proxy
+        if proxy_url:
+            logger.info("Configuring proxy: %s", proxy_url)
+            configuration.proxy = proxy_url
+        else:
+            logger.info("No proxy settings provided. Skipping proxy configuration.")
+
+    def _configure_ssl_settings(self, configuration):
+        """
+        Configure SSL verification settings for the async Kubernetes client.
+        """
+        verify_ssl = self.settings.proxy.verify_ssl
+        configuration.verify_ssl = verify_ssl
+        logger.info("SSL verification set to: %s", verify_ssl)
+
+    def get_client(self, api_type):
+        """
+        Retrieve the specified async Kubernetes API client.
+
+        Args:
+            api_type (str): Type of Kubernetes API client (e.g., "AppsV1Api", "CoreV1Api").
+
+        Returns:
+            object: The requested async Kubernetes API client instance.
+        """
+        if self.api_client is None:
+            raise RuntimeError("AsyncKubernetesClient is not initialized. Call initialize() first.")
+        if api_type not in self.api_clients:
+            logger.info("Initializing async API client for: %s", api_type)
+            if api_type == "AppsV1Api":
+                self.api_clients[api_type] = client.AppsV1Api(self.api_client)
+            elif api_type == "CoreV1Api":
+                self.api_clients[api_type] = client.CoreV1Api(self.api_client)
+            else:
+                logger.error("Unsupported API client type: %s", api_type)
+                raise ValueError(f"Unsupported API client type: {api_type}")
+        return self.api_clients[api_type]
+
+    async def close(self):
+        """
+        Close the shared connection pool and the fake API server started by this client, if any.
+        """
+        if self.api_client is not None:
+            await self.api_client.close()
+            self.api_client = None
+            self.api_clients.clear()
+        if self._owns_fake_server:
+            self.fake_server.stop()
+            self.fake_server = None
+            self._owns_fake_server = False
+
+
+async def watch_until(list_func, condition, timeout, *args, **kwargs):
+    """
+    Async counterpart of `src.utils.waiter.watch_until`.
+
+    Args:
+        list_func (callable): A list coroutine function of an async Kubernetes API client.
+        condition (callable): Predicate evaluated on every listed or watched object.
+        timeout (float): Maximum time to wait in seconds.
+        *args: Positional arguments passed to `list_func`.
+        **kwargs: Keyword arguments passed to `list_func` (e.g. field_selector).
+
+    Returns:
+        tuple: The object satisfying the condition and the elapsed time in seconds.
+
+    Raises:
+        WaitTimeoutError: If the condition does not hold within the timeout.
+    """
+    start_time = time.monotonic()
+    deadline = start_time + timeout
+    resource_version = None
+
+    while True:
+        if resource_version is None:
+            listing = await list_func(*args, **kwargs)
+            resource_version = listing.metadata.resource_version
+            for item in listing.items:
+                if condition(item):
+                    return item, time.monotonic() - start_time
+
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+
+        w = watch.Watch()
+        try:
+            async with w.stream(
+                list_func,
+                *args,
+                resource_version=resource_version,
+                allow_watch_bookmarks=True,
+                timeout_seconds=max(1, int(remaining)),
+                _request_timeout=remaining + 5,
+                **kwargs,
+            ) as stream:
+                async for event in stream:
+                    if event["type"] == "BOOKMARK":
+                        resource_version = event["raw_object"]["metadata"]["resourceVersion"]
+                        continue
+                    obj = event["object"]
+                    resource_version = obj.metadata.resource_version
+                    if event["type"] != "DELETED" and condition(obj):
+                        return obj, time.monotonic() - start_time
+                    if time.monotonic() >= deadline:
+                        break
+        except ApiException as e:
+            if e.status != HTTP_STATUS_GONE:
+                raise
+            logger.info("Watch resourceVersion expired (410 Gone); relisting.")
+            resource_version = None
+        finally:
+            await w.close()
+
+    raise WaitTimeoutError(f"Condition not met within {timeout} seconds.")
+
+
+async def wait_for_deployment(apps_api, name, namespace, condition, timeout):
+    """
+    Async counterpart of `src.utils.waiter.wait_for_deployment`.
+
+    Args:
+        apps_api (AppsV1Api): Async AppsV1Api client.
+        name (str): Name of the deployment.
+        namespace (str): Namespace of the deployment.
+        condition (callable): Predicate accepting a V1Deployment.
+        timeout (float): Maximum time to wait in seconds.
+
+    Returns:
+        tuple: The matching V1Deployment and the elapsed time in seconds.
+    """
+    return await watch_until(
+        apps_api.list_namespaced_deployment,
+        condition,
+        timeout,
+        namespace,
+        field_selector=f"metadata.name={name}",
+    )
+
+
+async def scale_deployments(apps_api, targets, condition_factory, timeout):
+    """
+    Scale several deployments concurrently and wait until each satisfies its condition.
+
+    Args:
+        apps_api (AppsV1Api): Async AppsV1Api client.
+        targets (list): (namespace, name, replicas) tuples.
+        condition_factory (callable): Builds a condition from a replica count
+            (e.g. `src.utils.waiter.deployment_scaled_to`).
+        timeout (float): Maximum time to wait for each deployment in seconds.
+
+    Returns:
+        list: Elapsed time in seconds for each target, in order.
+    """
+    async def scale_one(namespace, name, replicas):
+        await apps_api.patch_namespaced_deployment_scale(
+            name=name, namespace=namespace, body={"spec": {"replicas": replicas}}
+        )
+        _, elapsed = await wait_for_deployment(apps_api, name, namespace, condition_factory(replicas), timeout)
+        logger.info("Deployment '%s/%s' scaled to %s replicas in %.3f seconds.", namespace, name, replicas, elapsed)
+        return elapsed
+
+    return await asyncio.gather(*(scale_one(*target) for target in targets))
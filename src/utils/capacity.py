@@ -0,0 +1,194 @@
+import collections
+import csv
+import os
+import numpy as np
+from src.utils.logging_util import get_logger
+from src.utils.pod_lifecycle import PodLifecycleCollector, wait_for_ready_pods
+from src.utils.progress import ProgressTracker
+from src.utils.waiter import WaitTimeoutError, deployment_scaled_to, wait_for_deployment
+
+logger = get_logger(__name__)
+
+# One scale-up of a capacity search. Latencies are None when the scale-up timed out.
+CapacityTrial = collections.namedtuple("CapacityTrial", "replicas passed available_seconds ready_p99_seconds")
+
+
+def measure_scale_up(
+    apps_api, pod_informer, name, namespace, replicas, timeout, baseline=1, stall_window=0, fast_decode=False
+):
+    """
+    Scale a deployment down to `baseline` replicas, then up to `replicas`, and measure
+    how long the pods created by the scale-up took to become ready.
+
+    Args:
+        apps_api (AppsV1Api): API client used to scale and watch the deployment.
+        pod_informer (Informer): Started pods informer covering the deployment's pods.
+        name (str): Deployment name.
+        namespace (str): Deployment namespace.
+        replicas (int): Replica count to scale up to.
+        timeout (float): Maximum time to wait for each scale operation in seconds.
+        baseline (int): Replica count every scale-up starts from.
+        stall_window (float): Fail the scale-up once no replica became ready for this many
+            seconds, instead of waiting for the timeout (0 disables).
+        fast_decode (bool): Decode the watched deployment into DeploymentStatus records.
+
+    The pods informer is waited for until it holds exactly `baseline` and then `replicas`
+    ready pods, so the latencies cover every new pod rather than the ones it had seen when
+    the deployment reported them available.
+
+    Returns:
+        tuple: Seconds until all replicas were available and the p99 creation-to-ready
+        latency of the new pods, both None if the scale-up did not finish in time or stalled.
+        The latency is also None if a new pod has no ready latency, which fails the SLO.
+    """
+    apps_api.patch_namespaced_deployment_scale(name=name, namespace=namespace, body={"spec": {"replicas": baseline}})
+    wait_for_deployment(
+        apps_api, name, namespace, deployment_scaled_to(baseline), timeout, fast_decode=fast_decode
+    )
+    baseline_pods = wait_for_ready_pods(pod_informer, name, baseline, timeout)
+    if baseline_pods is None:
+        logger.info("The pods informer did not observe %s ready pods of '%s' in time.", baseline, name)
+        return None, None
+    existing = set(PodLifecycleCollector(baseline_pods).names)
+
+    logger.info("Scaling deployment '%s' from %s to %s replicas.", name, baseline, replicas)
+    progress = ProgressTracker(name, replicas, stall_window=stall_window)
+    apps_api.patch_namespaced_deployment_scale(name=name, namespace=namespace, body={"spec": {"replicas": replicas}})
+    try:
+        _, available_seconds = wait_for_deployment(
+            apps_api,
+            name,
+            namespace,
+            deployment_scaled_to(replicas),
+            timeout,
+            progress=progress,
+            fast_decode=fast_decode,
+        )
+    except WaitTimeoutError as e:
+        logger.info("Deployment '%s' did not reach %s available replicas: %s", name, replicas, e)
+        return None, None
+
+    pods = wait_for_ready_pods(pod_informer, name, replicas, timeout)
+    if pods is None:
+        logger.info("The pods informer did not observe %s ready pods of '%s' in time.", replicas, name)
+        return available_seconds, None
+    collector = PodLifecycleCollector(pods)
+    new_pods = np.array([pod_name not in existing for pod_name in collector.names], dtype=bool)
+    latencies = collector.latencies("ready")[new_pods]
+    if latencies.size < replicas - baseline or np.isnan(latencies).any():
+        # A new pod without a ready latency counts as missing the SLO rather than being dropped.
+        logger.info(
+            "%s of %s new pods of '%s' have a ready latency.",
+            np.count_nonzero(~np.isnan(latencies)),
+            replicas - baseline,
+            name,
+        )
+        return available_seconds, None
+    ready_p99 = float(np.percentile(latencies, 99)) if latencies.size else None
+    return available_seconds, ready_p99
+
+
+class CapacitySearch:
+    """
+    Bisection search for the largest replica count whose scale-up still meets a
+    latency SLO (p99 creation-to-ready latency of the new pods at most `slo_seconds`).
+
+    The search assumes that meeting the SLO is monotonic in the replica count: if N
+    replicas pass, fewer pass too. It needs about log2((high - low) / resolution) + 2 trials.
+    """
+
+    def __init__(self, trial, slo_seconds, low, high, resolution=100):
+        """
+        Initializes the search.
+
+        Args:
+            trial (callable): Runs one scale-up to the given replica count and returns
+                (available seconds, ready p99 seconds), see `measure_scale_up`.
+            slo_seconds (float): Maximum p99 ready latency in seconds.
+            low (int): Smallest replica count searched.
+            high (int): Largest replica count searched.
+            resolution (int): Stop once the passing and failing counts are this close.
+        """
+        self.trial = trial
+        self.slo_seconds = slo_seconds
+        self.low = low
+        self.high = high
+        self.resolution = max(1, resolution)
+        self.trials = []
+        self.capacity = None
+
+    def _passes(self, replicas):
+        available_seconds, ready_p99 = self.trial(replicas)
+        passed = ready_p99 is not None and ready_p99 <= self.slo_seconds
+        self.trials.append(CapacityTrial(replicas, passed, available_seconds, ready_p99))
+        logger.info(
+            "Capacity trial %s: %s replicas %s the SLO (ready p99 %s, SLO %.0fs).",
+            len(self.trials),
+            replicas,
+            "met" if passed else "missed",
+            f"{ready_p99:.1f}s" if ready_p99 is not None else "not reached",
+            self.slo_seconds,
+        )
+        return passed
+
+    def run(self):
+        """
+        Run trials until the capacity is known to within `resolution` replicas.
+
+        Returns:
+            int: The largest passing replica count, or None if even `low` missed the SLO.
+        """
+        if not self._passes(self.low):
+            return None
+        low, high = self.low, self.high
+        if self._passes(high):
+            low = high
+        while high - low > self.resolution:
+            middle = (low + high) // 2
+            if self._passes(middle):
+                low = middle
+            else:
+                high = middle
+        self.capacity = low
+        logger.info("Capacity within the SLO: %s replicas after %s trials.", low, len(self.trials))
+        return low
+
+    def format_summary(self):
+        """
+        Render the trials in the order they ran and the resulting capacity as text.
+        """
+        lines = [f"{'replicas':>10}{'result':>8}{'available':>12}{'ready p99':>12}"]
+        for trial in self.trials:
+            available = f"{trial.available_seconds:.1f}s" if trial.available_seconds is not None else "timeout"
+            ready = f"{trial.ready_p99_seconds:.1f}s" if trial.ready_p99_seconds is not None else "-"
+            lines.append(f"{trial.replicas:>10}{'pass' if trial.passed else 'fail':>8}{available:>12}{ready:>12}")
+        capacity = self.capacity if self.capacity is not None else "none"
+        lines.append(f"capacity: {capacity} replicas (ready p99 <= {self.slo_seconds:.0f}s)")
+        return "\n".join(lines)
+
+    def metrics(self):
+        """
+        Results-store metrics: the capacity (a drop is a regression) and the number of trials.
+        """
+        return {"capacity_max_replicas": self.capacity, "capacity_trials_count": len(self.trials)}
+
+    def write_report(self, output_dir):
+        """
+        Write the summary and a CSV of the trials into `output_dir`.
+
+        Args:
+            output_dir (str): Directory for this scenario's results.
+
+        Returns:
+            str: The formatted summary.
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        text = self.format_summary()
+        with open(os.path.join(output_dir, "capacity_search_summary.txt"), "w") as file:
+            file.write(text + "\n")
+        with open(os.path.join(output_dir, "capacity_search.csv"), "w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(CapacityTrial._fields)
+            for trial in self.trials:
+                writer.writerow(["" if value is None else value for value in trial])
+        return text
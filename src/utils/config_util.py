@@ -1,25 +1,238 @@
-import tomli
+import dataclasses
+import functools
 import logging
-from src.utils.logging_util import get_logger
+import os
+import tomli
+
+# get_logger reads its level from these settings, so this module logs through the standard logger.
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONFIG_FILE = "config/settings.toml"
+CONFIG_FILE_ENV = "SCALE_TEST_CONFIG"  # Overrides the settings file path
+ENV_PREFIX = "SCALE_TEST_"  # SCALE_TEST_<SECTION>__<KEY>=value overrides a single setting
+
+
+@dataclasses.dataclass(frozen=True)
+class K8sSettings:
+    config_mode: str = "local"
+    namespace: str = "default"
+    deployment_name: str = "scale-test"
+    node_selector: str = ""
+    pod_selector: str = ""
+    fast_decode: bool = False
+    connection_pool_size: int = 100
+
+
+@dataclasses.dataclass(frozen=True)
+class ScalingSettings:
+    timeout: float = 600
+    interval: float = 10
+    capacity_resolution: int = 100
+    capacity_baseline: int = 1
+    stall_window: float = 120
+    rate_window: float = 10
+
+
+@dataclasses.dataclass(frozen=True)
+class RateLimitSettings:
+    qps: float = 20
+    burst: int = 40
+    max_retries: int = 5
+    backoff_base: float = 0.5
+    backoff_max: float = 30.0
+
+
+@dataclasses.dataclass(frozen=True)
+class MetricsSettings:
+    output_dir: str = "results"
+    results_db: str = "results/results.db"
+    regression_threshold: float = 0.2
+    regression_min_delta: float = 1.0
+    thresholds: dict = dataclasses.field(default_factory=dict)
+
+
+@dataclasses.dataclass(frozen=True)
+class EventsSettings:
+    capacity: int = 10000
+    timeline_horizon: float = 86400.0
+    node_namespace: str = "default"
+
+
+@dataclasses.dataclass(frozen=True)
+class LogsSettings:
+    max_workers: int = 64
+    idle_timeout: float = 5.0
+    chunk_size: int = 65536
 
-logger = get_logger(__name__)
 
-def load_config(config_file="config/settings.toml"):
+@dataclasses.dataclass(frozen=True)
+class ManifestsSettings:
+    enabled: bool = True
+    directory: str = "k8s_manifests"
+    field_manager: str = "scale-test-harness"
+    max_workers: int = 8
+    ready_timeout: float = 600
+    teardown: bool = True
+
+
+@dataclasses.dataclass(frozen=True)
+class LoadSettings:
+    workers: int = 4
+    replicas: int = 250
+    stagger: float = 0.0
+    namespace_prefix: str = "scale-test-shard"
+    manifest: str = "k8s_manifests/scale-test.yaml"
+    teardown: bool = True
+
+
+@dataclasses.dataclass(frozen=True)
+class RecordingSettings:
+    record: bool = False
+    path: str = "results/api-recording.k8srec"
+    speed: float = 1.0
+    block_size: int = 1048576
+
+
+@dataclasses.dataclass(frozen=True)
+class SamplerSettings:
+    enabled: bool = True
+    interval: float = 5.0
+    capacity: int = 8640
+
+
+@dataclasses.dataclass(frozen=True)
+class LoggingSettings:
+    log_level: str = "INFO"
+    format: str = "text"
+
+
+@dataclasses.dataclass(frozen=True)
+class ProxySettings:
+    http_proxy: str = ""
+    https_proxy: str = ""
+    no_proxy: str = ""
+    verify_ssl: bool = True
+
+
+@dataclasses.dataclass(frozen=True)
+class Settings:
+    """
+    Typed view of config/settings.toml. Each section is a frozen dataclass whose fields
+    default to the values the harness used before the section or key existed; `fake`
+    is passed through as a dict (defaults live in `fake_api_server.DEFAULT_SETTINGS`).
     """
-    Load configuration from a TOML file.
 
-    Args:
-        config_file (str): Path to the configuration file.
+    k8s: K8sSettings = dataclasses.field(default_factory=K8sSettings)
+    scaling: ScalingSettings = dataclasses.field(default_factory=ScalingSettings)
+    rate_limit: RateLimitSettings = dataclasses.field(default_factory=RateLimitSettings)
+    metrics: MetricsSettings = dataclasses.field(default_factory=MetricsSettings)
+    events: EventsSettings = dataclasses.field(default_factory=EventsSettings)
+    logs: LogsSettings = dataclasses.field(default_factory=LogsSettings)
+    manifests: ManifestsSettings = dataclasses.field(default_factory=ManifestsSettings)
+    load: LoadSettings = dataclasses.field(default_factory=LoadSettings)
+    recording: RecordingSettings = dataclasses.field(default_factory=RecordingSettings)
+    sampler: SamplerSettings = dataclasses.field(default_factory=SamplerSettings)
+    logging: LoggingSettings = dataclasses.field(default_factory=LoggingSettings)
+    proxy: ProxySettings = dataclasses.field(default_factory=ProxySettings)
+    fake: dict = dataclasses.field(default_factory=dict)
 
-    Returns:
-        dict: Parsed configuration data.
+    def as_dict(self):
+        return dataclasses.asdict(self)
+
+
+def _parse_value(value, field_type):
+    """
+    Convert an environment variable string to the type of the setting it overrides.
     """
-    logger.info(f"Loading configuration from {config_file}...")
+    if field_type is bool:
+        return value.strip().lower() in ("1", "true", "yes", "on")
+    if field_type in (int, float, str):
+        return field_type(value)
+    # Untyped entries (e.g. [fake] or metrics thresholds): accept any TOML literal, else a string.
+    try:
+        return tomli.loads(f"value = {value}")["value"]
+    except tomli.TOMLDecodeError:
+        return value
+
+
+def _apply_env_overrides(data, environ):
+    """
+    Apply SCALE_TEST_<SECTION>__<KEY> variables (e.g. SCALE_TEST_K8S__CONFIG_MODE=fake)
+    to the parsed TOML data, in place.
+    """
+    sections = {field.name: field.type for field in dataclasses.fields(Settings)}
+    for name, value in environ.items():
+        if not name.startswith(ENV_PREFIX) or "__" not in name:
+            continue
+        section, key = name[len(ENV_PREFIX):].lower().split("__", 1)
+        if section not in sections:
+            logger.warning("Ignoring %s: unknown settings section [%s].", name, section)
+            continue
+        section_type = sections[section]
+        if dataclasses.is_dataclass(section_type):
+            field_types = {field.name: field.type for field in dataclasses.fields(section_type)}
+            if key not in field_types:
+                logger.warning("Ignoring %s: unknown setting %s.%s.", name, section, key)
+                continue
+            parsed = _parse_value(value, field_types[key])
+        else:
+            parsed = _parse_value(value, None)
+        data.setdefault(section, {})[key] = parsed
+        logger.info("Setting %s.%s overridden by %s.", section, key, name)
+
+
+def _build(data):
+    sections = {}
+    for field in dataclasses.fields(Settings):
+        values = data.get(field.name, {})
+        if dataclasses.is_dataclass(field.type):
+            known = {f.name for f in dataclasses.fields(field.type)}
+            unknown = set(values) - known
+            if unknown:
+                logger.warning("Ignoring unknown settings in [%s]: %s.", field.name, ", ".join(sorted(unknown)))
+            sections[field.name] = field.type(**{key: value for key, value in values.items() if key in known})
+        else:
+            sections[field.name] = dict(values)
+    return Settings(**sections)
+
+
+@functools.lru_cache(maxsize=None)
+def _load_settings(config_file):
+    logger.info("Loading configuration from %s...", config_file)
     try:
         with open(config_file, "rb") as file:
-            config = tomli.load(file)
-        logger.info("Configuration loaded successfully.")
-        return config
+            data = tomli.load(file)
     except Exception as e:
-        logger.error(f"Failed to load configuration: {e}")
+        logger.error("Failed to load configuration: %s", e)
         raise
+    _apply_env_overrides(data, os.environ)
+    settings = _build(data)
+    logger.info("Configuration loaded successfully.")
+    return settings
+
+
+def get_settings(config_file=None):
+    """
+    Return the settings, parsing the TOML file and environment overrides only on first use.
+
+    Args:
+        config_file (str): Path to the configuration file. Defaults to `$SCALE_TEST_CONFIG`
+            or config/settings.toml.
+
+    Returns:
+        Settings: The cached, immutable settings.
+    """
+    return _load_settings(config_file or os.environ.get(CONFIG_FILE_ENV, DEFAULT_CONFIG_FILE))
+
+
+def load_config(config_file=None):
+    """
+    Return the settings as a plain dict of sections (kept for callers indexing by key).
+
+    Args:
+        config_file (str): Path to the configuration file.
+
+    Returns:
+        dict: Configuration data, with environment overrides applied.
+    """
+    return get_settings(config_file).as_dict()
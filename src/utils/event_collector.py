@@ -0,0 +1,277 @@
+import collections
+import csv
+import os
+import socket
+import threading
+import time
+import orjson
+from kubernetes.client.rest import ApiException
+from kubernetes.watch.watch import iter_resp_lines
+from src.utils.logging_util import get_logger
+from src.utils.records import parse_time
+
+logger = get_logger(__name__)
+
+HTTP_STATUS_GONE = 410
+NODE_EVENTS_SELECTOR = "involvedObject.kind=Node"
+
+# One retained event: (epoch seconds, type, reason, involved kind, involved name, message, occurrences).
+EventEntry = collections.namedtuple("EventEntry", "time type reason kind name message count")
+
+
+def _event_time(event):
+    """
+    Return the time of the latest occurrence of a core/v1 Event as epoch seconds.
+    """
+    series = event.get("series") or {}
+    for value in (
+        series.get("lastObservedTime"),
+        event.get("lastTimestamp"),
+        event.get("eventTime"),
+        event["metadata"].get("creationTimestamp"),
+    ):
+        if value:
+            return parse_time(value)
+    return time.time()
+
+
+class EventCollector:
+    """
+    Background collector of Kubernetes Events: those of the test namespace and the node
+    events (recorded in `node_namespace` with involvedObject.kind=Node).
+
+    Only events emitted after `start()` are collected. The newest `capacity` events are
+    kept in a ring buffer and occurrences are aggregated per reason per second for the
+    last `timeline_horizon` seconds, so memory stays bounded on long runs while the
+    timeline still covers far more than the retained events.
+    """
+
+    def __init__(self, core_api, namespace, node_namespace="default", capacity=10000, timeline_horizon=86400.0,
+                 watch_timeout=300):
+        """
+        Initializes the collector.
+
+        Args:
+            core_api (CoreV1Api): API client used to list and watch events.
+            namespace (str): Namespace of the workload under test.
+            node_namespace (str): Namespace holding node events ("default" on GKE).
+            capacity (int): Number of most recent events kept in full.
+            timeline_horizon (float): Seconds of per-second reason counts kept.
+            watch_timeout (int): Server-side timeout in seconds of each watch request.
+        """
+        self.core_api = core_api
+        self.sources = [(namespace, None)]
+        if node_namespace:
+            self.sources.append((node_namespace, NODE_EVENTS_SELECTOR))
+        self.watch_timeout = watch_timeout
+        self.events = collections.deque(maxlen=capacity)
+        self.per_second = {}  # epoch second -> Counter of reason -> occurrences, oldest second first
+        self.totals = collections.Counter()
+        self._seen_counts = collections.OrderedDict()  # uid -> last seen count, bounded like the ring buffer
+        self._capacity = capacity
+        self._timeline_horizon = timeline_horizon
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._threads = []
+        self._responses = set()  # Open watch responses, closed on stop() to unblock their threads
+
+    def start(self):
+        """
+        Start one watch thread per event source.
+        """
+        for namespace, field_selector in self.sources:
+            resource_version = self._current_version(namespace, field_selector)
+            thread = threading.Thread(
+                target=self._run,
+                args=(namespace, field_selector, resource_version),
+                name=f"events-{namespace}",
+                daemon=True,
+            )
+            thread.start()
+            self._threads.append(thread)
+        logger.info("Collecting events of %s.", ", ".join(namespace for namespace, _ in self.sources))
+        return self
+
+    def stop(self):
+        self._stop_event.set()
+        with self._lock:
+            responses = list(self._responses)
+        for response in responses:
+            # Shut the socket down rather than closing the response, whose reader the watch thread holds.
+            sock = getattr(getattr(response, "connection", None), "sock", None)
+            if sock is not None:
+                try:
+                    sock.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+        for thread in self._threads:
+            thread.join(timeout=1)
+
+    def _current_version(self, namespace, field_selector):
+        kwargs = {"field_selector": field_selector} if field_selector else {}
+        response = self.core_api.list_namespaced_event(namespace, limit=1, _preload_content=False, **kwargs)
+        try:
+            return orjson.loads(response.data)["metadata"].get("resourceVersion")
+        finally:
+            response.release_conn()
+
+    def _run(self, namespace, field_selector, resource_version):
+        kwargs = {"field_selector": field_selector} if field_selector else {}
+        while not self._stop_event.is_set():
+            try:
+                response = self.core_api.list_namespaced_event(
+                    namespace,
+                    watch=True,
+                    resource_version=resource_version,
+                    allow_watch_bookmarks=True,
+                    timeout_seconds=self.watch_timeout,
+                    _request_timeout=self.watch_timeout + 5,
+                    _preload_content=False,
+                    **kwargs,
+                )
+                with self._lock:
+                    self._responses.add(response)
+                try:
+                    for line in iter_resp_lines(response):
+                        if self._stop_event.is_set():
+                            break
+                        event = orjson.loads(line)
+                        raw_object = event["object"]
+                        if event["type"] == "ERROR":
+                            raise ApiException(status=raw_object.get("code"), reason=raw_object.get("message"))
+                        resource_version = raw_object["metadata"]["resourceVersion"]
+                        if event["type"] in ("ADDED", "MODIFIED"):
+                            self._add(event["type"], raw_object)
+                finally:
+                    with self._lock:
+                        self._responses.discard(response)
+                    response.close()
+                    response.release_conn()
+            except ApiException as e:
+                if e.status == HTTP_STATUS_GONE:
+                    # Events are not cached, so nothing is relisted; occurrences while disconnected are lost.
+                    logger.info("Event watch for %s expired (410 Gone); resuming from now.", namespace)
+                    try:
+                        resource_version = self._current_version(namespace, field_selector)
+                    except Exception as list_error:
+                        logger.warning("Event list for %s failed: %s", namespace, list_error)
+                        self._stop_event.wait(1)
+                else:
+                    logger.warning("Event watch for %s failed: %s", namespace, e)
+                    self._stop_event.wait(1)
+            except Exception as e:
+                if self._stop_event.is_set():
+                    break  # stop() shut the connection down
+                logger.warning("Event watch for %s interrupted: %s", namespace, e)
+                self._stop_event.wait(1)
+
+    def _add(self, event_type, event):
+        uid = event["metadata"].get("uid")
+        count = (event.get("series") or {}).get("count") or event.get("count") or 1
+        involved = event.get("involvedObject") or {}
+        reason = event.get("reason") or "Unknown"
+        timestamp = _event_time(event)
+        with self._lock:
+            # Repeated occurrences update the same Event; only count what is new since the last update.
+            # An Event first seen MODIFIED predates start() (or was evicted), so only its latest occurrence is new.
+            previous = self._seen_counts.pop(uid, None)
+            if previous is None:
+                occurrences = count if event_type == "ADDED" else 1
+            else:
+                occurrences = max(1, count - previous)
+            self._seen_counts[uid] = count
+            if len(self._seen_counts) > self._capacity:
+                self._seen_counts.popitem(last=False)
+            self.events.append(
+                EventEntry(
+                    timestamp,
+                    event.get("type"),
+                    reason,
+                    involved.get("kind"),
+                    involved.get("name"),
+                    event.get("message"),
+                    occurrences,
+                )
+            )
+            second = int(timestamp)
+            counts = self.per_second.get(second)
+            if counts is None:
+                counts = self.per_second[second] = collections.Counter()
+                # Seconds arrive nearly in order, so the oldest ones are at the front of the dict.
+                horizon = second - self._timeline_horizon
+                while next(iter(self.per_second)) < horizon:
+                    del self.per_second[next(iter(self.per_second))]
+            counts[reason] += occurrences
+            self.totals[reason] += occurrences
+
+    def timeline(self, since=None, until=None):
+        """
+        Return the per-second reason counts in a time window.
+
+        Args:
+            since (float): Epoch seconds of the window start (default: first event).
+            until (float): Epoch seconds of the window end (default: now).
+
+        Returns:
+            list: (epoch second, Counter of reason -> occurrences), oldest first.
+        """
+        with self._lock:
+            return [
+                (second, collections.Counter(counts))
+                for second, counts in sorted(self.per_second.items())
+                if (since is None or second >= int(since)) and (until is None or second <= until)
+            ]
+
+    def format_timeline(self, since=None, until=None, warnings=5):
+        """
+        Render a compact timeline: one line per second with events, offsets relative to
+        `since`, followed by the totals and the most recent Warning messages.
+        """
+        rows = self.timeline(since, until)
+        if not rows:
+            return "No events."
+        origin = int(since) if since is not None else rows[0][0]
+        totals = collections.Counter()
+        lines = []
+        for second, counts in rows:
+            totals.update(counts)
+            lines.append(
+                f"+{second - origin:>5}s  " + "  ".join(f"{reason}x{count}" for reason, count in counts.most_common())
+            )
+        lines.append("total   " + "  ".join(f"{reason}x{count}" for reason, count in totals.most_common()))
+        with self._lock:
+            recent = [
+                entry for entry in self.events
+                if entry.type == "Warning" and (since is None or entry.time >= since)
+            ][-warnings:]
+        for entry in recent:
+            lines.append(f"warning {entry.reason} {entry.kind}/{entry.name}: {entry.message}")
+        return "\n".join(lines)
+
+    def write_report(self, output_dir, since=None, until=None):
+        """
+        Write the timeline and the retained events of a time window into `output_dir`.
+
+        Args:
+            output_dir (str): Directory for this scenario's results.
+            since (float): Epoch seconds of the window start.
+            until (float): Epoch seconds of the window end.
+
+        Returns:
+            str: The formatted timeline.
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        timeline = self.format_timeline(since, until)
+        with open(os.path.join(output_dir, "event_timeline.txt"), "w") as file:
+            file.write(timeline + "\n")
+        with self._lock:
+            entries = [
+                entry for entry in self.events
+                if (since is None or entry.time >= since) and (until is None or entry.time <= until)
+            ]
+        with open(os.path.join(output_dir, "events.csv"), "w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(EventEntry._fields)
+            for entry in entries:
+                writer.writerow([f"{entry.time:.3f}"] + list(entry[1:]))
+        return timeline
@@ -0,0 +1,1195 @@
+import copy
+import glob
+import hashlib
+import itertools
+import json
+import math
+import os
+import queue
+import re
+import threading
+import time
+from collections import defaultdict, deque
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+import yaml
+from src.utils.logging_util import get_logger
+from src.utils.records import SCALE_DOWN_TAINT
+
+logger = get_logger(__name__)
+
+COMPUTE_CLASS_LABEL = "cloud.google.com/compute-class"
+MACHINE_FAMILY_LABEL = "cloud.google.com/machine-family"
+NODEPOOL_LABEL = "cloud.google.com/gke-nodepool"
+SPOT_LABEL = "cloud.google.com/gke-spot"
+POD_GRACE_PERIOD = 30
+NODE_SYSTEM_USAGE = 0.05  # Fraction of a node's CPU and memory used by system daemons
+
+DEFAULT_SETTINGS = {
+    "pods_per_second": 500,  # Pod creation rate of the simulated ReplicaSet controller
+    "schedule_latency": 0.05,  # Seconds from pod creation until it can be bound
+    "pod_start_latency": 0.2,  # Seconds from binding until the pod is Ready
+    "termination_latency": 0.1,  # Seconds from the delete request until the pod is gone
+    "node_provision_latency": 1.0,  # Seconds from autoscaler scale-up until the node is Ready
+    "fallback_latency": 0.5,  # Extra provisioning seconds per compute-class priority fallback
+    "nodes_per_priority": 0,  # Capacity of each compute-class priority (0 = unlimited)
+    "node_scale_down_delay": 2.0,  # Seconds a node must be empty before the autoscaler removes it
+    "pods_per_node": 32,
+    "node_cpu": 8,  # Allocatable cores of each node, reported by metrics.k8s.io utilization
+    "node_memory": 32 * 2**30,  # Allocatable memory bytes of each node
+    "pod_cpu_usage": 0.05,  # Cores used by each running pod
+    "pod_memory_usage": 16 * 2**20,  # Memory bytes used by each running pod
+    "initial_nodes": 3,
+    "tick_interval": 0.02,
+    "history_size": 100000,  # Watch events kept for resourceVersion resume
+    "max_events": 10000,  # core/v1 Events kept by the server
+    "log_burst_lines": 10000,  # Lines each container logs per burst (like k8s_manifests/alot-of-logs.yaml)
+    "log_burst_interval": 600,  # Seconds between log bursts of a followed stream
+    "log_bytes_per_second": 20_000_000,  # Per-stream bandwidth of the simulated kubelet
+    "manifests_dir": "k8s_manifests",
+}
+
+
+def _timestamp(epoch):
+    return datetime.fromtimestamp(epoch, tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+
+def _get_path(obj, path):
+    for part in path.split("."):
+        if not isinstance(obj, dict):
+            return None
+        obj = obj.get(part)
+    return obj
+
+
+def parse_selector(selector):
+    """
+    Parse a label or field selector into a list of (key, operator, values) requirements.
+
+    Supports `k=v`, `k==v`, `k!=v`, `k`, `!k`, `k in (a,b)` and `k notin (a,b)`.
+    """
+    requirements = []
+    if not selector:
+        return requirements
+    for term in re.findall(r"[^,(]+(?:\([^)]*\))?", selector):
+        term = term.strip()
+        if not term:
+            continue
+        match = re.match(r"^(\S+)\s+(in|notin)\s+\(([^)]*)\)$", term)
+        if match:
+            values = {value.strip() for value in match.group(3).split(",")}
+            requirements.append((match.group(1), match.group(2), values))
+        elif "!=" in term:
+            key, value = term.split("!=", 1)
+            requirements.append((key.strip(), "!=", {value.strip()}))
+        elif "=" in term:
+            key, value = re.split(r"==?", term, maxsplit=1)
+            requirements.append((key.strip(), "=", {value.strip()}))
+        elif term.startswith("!"):
+            requirements.append((term[1:], "!", set()))
+        else:
+            requirements.append((term, "exists", set()))
+    return requirements
+
+
+def _matches(requirements, lookup):
+    for key, operator, values in requirements:
+        value = lookup(key)
+        if operator in ("=", "in") and value not in values:
+            return False
+        if operator in ("!=", "notin") and value in values:
+            return False
+        if operator == "exists" and value is None:
+            return False
+        if operator == "!" and value is not None:
+            return False
+    return True
+
+
+class ObjectFilter:
+    """
+    Namespace, label selector and field selector filter applied to list and watch requests.
+    """
+
+    def __init__(self, namespace=None, label_selector=None, field_selector=None):
+        self.namespace = namespace
+        self.labels = parse_selector(label_selector)
+        self.fields = parse_selector(field_selector)
+
+    def __call__(self, obj):
+        metadata = obj["metadata"]
+        if self.namespace and metadata.get("namespace") != self.namespace:
+            return False
+        labels = metadata.get("labels") or {}
+        if not _matches(self.labels, labels.get):
+            return False
+        return _matches(self.fields, lambda path: _as_field(_get_path(obj, path)))
+
+
+def _as_field(value):
+    return value if value is None or isinstance(value, str) else str(value)
+
+
+class FakeCluster:
+    """
+    In-memory cluster state with a simulated ReplicaSet controller, scheduler, kubelet
+    and cluster autoscaler.
+
+    Every mutation bumps a global resourceVersion and is appended to a bounded watch
+    history, so clients can list, watch, resume and receive 410 Gone like against a
+    real API server.
+    """
+
+    KINDS = ("deployments", "pods", "nodes", "events", "namespaces", "computeclasses")
+
+    def __init__(self, settings=None):
+        """
+        Initializes the fake cluster.
+
+        Args:
+            settings (dict): Overrides for DEFAULT_SETTINGS (the `[fake]` config section).
+        """
+        self.settings = {**DEFAULT_SETTINGS, **(settings or {})}
+        self.lock = threading.RLock()
+        self.objects = {kind: {} for kind in self.KINDS}
+        self.history = deque(maxlen=self.settings["history_size"])
+        self.subscribers = {kind: set() for kind in self.KINDS}
+        self.resource_version = 0
+        self.compacted_version = 0
+        self.priorities = [{"machineFamily": "e2", "spot": False}]
+        self.compute_classes = {}
+        self._uids = itertools.count(1)
+        self._names = itertools.count(1)
+        self._creation_budget = {}
+        self._active = defaultdict(set)  # deployment key -> keys of non-terminating pods
+        self._ready = defaultdict(set)  # deployment key -> keys of ready pods
+        self._pending = deque()  # keys of unbound pods, oldest first
+        self._unschedulable = {}  # ordered set of pod keys that did not fit on any node
+        self._starting = {}  # pod key -> ready at
+        self._terminating = {}  # pod key -> gone at
+        self._provisioning = {}  # node name -> ready at
+        self._provisioning_group = {}  # node name -> node selector the node was created for
+        self._free_nodes = {}  # ordered set of ready nodes that may have free pod slots
+        self._empty_since = {}  # node name -> time the node became empty
+        self._node_pods = {}  # node name -> set of pod keys
+        self._priority_usage = {}  # (machine family, spot) -> nodes created for that priority
+        self._stop_event = threading.Event()
+        self._thread = None
+        self.initial_node_names = set()
+
+    def seed(self):
+        """
+        Create the initial nodes and load Deployments and ComputeClasses from the manifests directory.
+        """
+        with self.lock:
+            for _ in range(self.settings["initial_nodes"]):
+                node = self._new_node("default-pool", "e2", spot=False, labels={}, ready=True)
+                self.initial_node_names.add(node["metadata"]["name"])
+            self._create("namespaces", {"apiVersion": "v1", "kind": "Namespace", "metadata": {"name": "default"}})
+            pattern = os.path.join(self.settings["manifests_dir"], "*.yaml")
+            for path in sorted(glob.glob(pattern)):
+                with open(path) as file:
+                    for manifest in yaml.safe_load_all(file):
+                        if manifest:
+                            self.load_manifest(manifest)
+
+    def load_manifest(self, manifest):
+        """
+        Add a Deployment or ComputeClass manifest to the cluster. Other kinds are ignored.
+        """
+        kind = manifest.get("kind")
+        if kind == "Deployment":
+            self.create_deployment(manifest)
+        elif kind == "ComputeClass":
+            self._create("computeclasses", manifest)
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="fake-cluster-controller", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+        with self.lock:
+            for subscribers in self.subscribers.values():
+                for subscriber in subscribers:
+                    subscriber.put(None)
+
+    def wait_stopped(self, timeout):
+        """
+        Block for up to `timeout` seconds or until the cluster is stopped.
+
+        Returns:
+            bool: True if the cluster was stopped.
+        """
+        return self._stop_event.wait(timeout)
+
+    def _run(self):
+        last = time.time()
+        while not self._stop_event.wait(self.settings["tick_interval"]):
+            now = time.time()
+            try:
+                self.tick(now, now - last)
+            except Exception:
+                logger.exception("Fake cluster controller tick failed.")
+            last = now
+
+    def _key(self, obj):
+        metadata = obj["metadata"]
+        namespace = metadata.get("namespace")
+        return f"{namespace}/{metadata['name']}" if namespace else metadata["name"]
+
+    def _emit(self, kind, event_type, obj):
+        # Caller holds self.lock.
+        self.resource_version += 1
+        obj["metadata"]["resourceVersion"] = str(self.resource_version)
+        key = self._key(obj)
+        if event_type == "DELETED":
+            self.objects[kind].pop(key, None)
+        else:
+            self.objects[kind][key] = obj
+        if len(self.history) == self.history.maxlen:
+            self.compacted_version = self.history[0][0]
+        line = _event_line(event_type, obj)
+        entry = (self.resource_version, kind, obj, line)
+        self.history.append(entry)
+        for subscriber in self.subscribers[kind]:
+            subscriber.put(entry)
+
+    def list(self, kind, object_filter):
+        """
+        Return a snapshot of matching objects (sorted by key) and the current resourceVersion.
+        """
+        with self.lock:
+            items = [copy.deepcopy(obj) for key, obj in sorted(self.objects[kind].items()) if object_filter(obj)]
+            return items, str(self.resource_version)
+
+    def subscribe(self, kind, object_filter, resource_version):
+        """
+        Register a watch subscriber.
+
+        Returns:
+            tuple: (initial entries, subscriber queue), or (None, None) if the
+            requested resourceVersion has been compacted (410 Gone).
+        """
+        subscriber = queue.Queue()
+        with self.lock:
+            if resource_version in (None, "", "0"):
+                initial = [
+                    (self.resource_version, kind, obj, _event_line("ADDED", obj))
+                    for obj in self.objects[kind].values()
+                    if object_filter(obj)
+                ]
+            else:
+                since = int(resource_version)
+                if since < self.compacted_version:
+                    return None, None
+                initial = [entry for entry in self.history if entry[0] > since and entry[1] == kind]
+            self.subscribers[kind].add(subscriber)
+        return initial, subscriber
+
+    def unsubscribe(self, kind, subscriber):
+        with self.lock:
+            self.subscribers[kind].discard(subscriber)
+
+    def compact(self):
+        """
+        Drop the watch history, so any watch resuming from an older resourceVersion gets 410 Gone.
+        """
+        with self.lock:
+            self.history.clear()
+            self.compacted_version = self.resource_version
+
+    def create_deployment(self, manifest):
+        with self.lock:
+            deployment = copy.deepcopy(manifest)
+            metadata = deployment["metadata"]
+            metadata.setdefault("namespace", "default")
+            metadata["uid"] = self._uid()
+            metadata["generation"] = 1
+            metadata["creationTimestamp"] = _timestamp(time.time())
+            deployment["spec"].setdefault("replicas", 1)
+            deployment["status"] = {"observedGeneration": 1, "replicas": 0, "availableReplicas": 0, "readyReplicas": 0}
+            template_hash = hashlib.sha256(metadata["name"].encode()).hexdigest()[:10]
+            deployment["_templateHash"] = template_hash
+            if metadata["namespace"] not in self.objects["namespaces"]:
+                namespace = {"apiVersion": "v1", "kind": "Namespace", "metadata": {"name": metadata["namespace"]}}
+                self._create("namespaces", namespace)
+            self._emit("deployments", "ADDED", deployment)
+            return deployment
+
+    def _create(self, kind, manifest):
+        # Caller holds self.lock. Deployments are created with create_deployment().
+        obj = copy.deepcopy(manifest)
+        metadata = obj["metadata"]
+        metadata["uid"] = self._uid()
+        metadata["generation"] = 1
+        metadata["creationTimestamp"] = _timestamp(time.time())
+        if kind == "computeclasses":
+            self.compute_classes[metadata["name"]] = obj.get("spec", {}).get("priorities") or self.priorities
+        self._emit(kind, "ADDED", obj)
+        return obj
+
+    def apply(self, kind, key, manifest):
+        """
+        Simplified server-side apply: create the object, or merge the applied labels and
+        annotations and replace its spec. Running pods keep their template.
+
+        Returns:
+            tuple: The object and whether it was created.
+        """
+        with self.lock:
+            obj = self.objects[kind].get(key)
+            if obj is None:
+                if kind == "deployments":
+                    return self.create_deployment(manifest), True
+                return self._create(kind, manifest), True
+            metadata = obj["metadata"]
+            for field in ("labels", "annotations"):
+                if manifest["metadata"].get(field):
+                    metadata.setdefault(field, {}).update(manifest["metadata"][field])
+            if "spec" in manifest and manifest["spec"] != obj.get("spec"):
+                obj["spec"] = copy.deepcopy(manifest["spec"])
+                metadata["generation"] += 1
+                if kind == "deployments":
+                    obj["spec"].setdefault("replicas", 1)
+                    obj["status"]["observedGeneration"] = metadata["generation"]
+                elif kind == "computeclasses":
+                    self.compute_classes[metadata["name"]] = obj["spec"].get("priorities") or self.priorities
+            self._emit(kind, "MODIFIED", obj)
+            return obj, False
+
+    def delete_collection(self, kind, object_filter):
+        """
+        Delete all matching objects. Deleting a deployment terminates its pods.
+
+        Returns:
+            list: The deleted objects.
+        """
+        with self.lock:
+            now = time.time()
+            deleted = [obj for _, obj in sorted(self.objects[kind].items()) if object_filter(obj)]
+            for obj in deleted:
+                self._delete(kind, obj, now)
+            return deleted
+
+    def delete(self, kind, key):
+        """
+        Delete one object. Deleting a deployment terminates its pods.
+
+        Returns:
+            dict: The deleted object, or None if it does not exist.
+        """
+        with self.lock:
+            obj = self.objects[kind].get(key)
+            if obj is not None:
+                self._delete(kind, obj, time.time())
+            return obj
+
+    def _delete(self, kind, obj, now):
+        # Caller holds self.lock.
+        key = self._key(obj)
+        if kind == "deployments":
+            for pod_key in self._active.pop(key, ()):
+                self._terminate(pod_key, self.objects["pods"][pod_key], now)
+            self._ready.pop(key, None)
+            self._creation_budget.pop(key, None)
+        elif kind == "computeclasses":
+            self.compute_classes.pop(obj["metadata"]["name"], None)
+        self._emit(kind, "DELETED", obj)
+
+    def get(self, kind, key):
+        with self.lock:
+            obj = self.objects[kind].get(key)
+            return copy.deepcopy(obj) if obj is not None else None
+
+    def scale(self, key, replicas):
+        with self.lock:
+            deployment = self.objects["deployments"].get(key)
+            if deployment is None:
+                return None
+            deployment["spec"]["replicas"] = replicas
+            deployment["metadata"]["generation"] += 1
+            deployment["status"]["observedGeneration"] = deployment["metadata"]["generation"]
+            self._emit("deployments", "MODIFIED", deployment)
+            self._event(deployment, "ScalingReplicaSet", f"Scaled replica set to {replicas}", "deployment-controller")
+            return self.scale_subresource(deployment)
+
+    def scale_subresource(self, deployment):
+        metadata = deployment["metadata"]
+        labels = deployment["spec"]["selector"].get("matchLabels", {})
+        return {
+            "apiVersion": "autoscaling/v1",
+            "kind": "Scale",
+            "metadata": {
+                "name": metadata["name"],
+                "namespace": metadata["namespace"],
+                "uid": metadata["uid"],
+                "resourceVersion": metadata["resourceVersion"],
+                "creationTimestamp": metadata["creationTimestamp"],
+            },
+            "spec": {"replicas": deployment["spec"]["replicas"]},
+            "status": {
+                "replicas": deployment["status"]["replicas"],
+                "selector": ",".join(f"{k}={v}" for k, v in labels.items()),
+            },
+        }
+
+    def resource_metrics(self, kind, object_filter):
+        """
+        Return metrics.k8s.io NodeMetrics or PodMetrics of the matching nodes or running pods.
+
+        Every running pod uses `pod_cpu_usage` cores and `pod_memory_usage` bytes, split over
+        its containers. A node
+        uses a fixed share for its system daemons plus the usage of the pods bound to it.
+        """
+        now = time.time()
+        cpu, memory = self.settings["pod_cpu_usage"], self.settings["pod_memory_usage"]
+        items = []
+        with self.lock:
+            if kind == "nodes":
+                for name, node in self.objects["nodes"].items():
+                    if not object_filter(node):
+                        continue
+                    running = sum(
+                        1 for key in self._node_pods.get(name, ())
+                        if self.objects["pods"][key]["status"]["phase"] == "Running"
+                    )
+                    usage = {
+                        "cpu": _cpu_quantity(NODE_SYSTEM_USAGE * self.settings["node_cpu"] + running * cpu),
+                        "memory": _memory_quantity(NODE_SYSTEM_USAGE * self.settings["node_memory"] + running * memory),
+                    }
+                    items.append({"metadata": {"name": name, "labels": node["metadata"]["labels"]},
+                                  "timestamp": _timestamp(now), "window": "10s", "usage": usage})
+            else:
+                for pod in self.objects["pods"].values():
+                    if pod["status"]["phase"] != "Running" or not object_filter(pod):
+                        continue
+                    metadata = pod["metadata"]
+                    count = len(pod["spec"]["containers"])
+                    containers = [
+                        {"name": container["name"],
+                         "usage": {"cpu": _cpu_quantity(cpu / count), "memory": _memory_quantity(memory / count)}}
+                        for container in pod["spec"]["containers"]
+                    ]
+                    items.append({"metadata": {"name": metadata["name"], "namespace": metadata["namespace"],
+                                               "labels": metadata.get("labels", {})},
+                                  "timestamp": _timestamp(now), "window": "10s", "containers": containers})
+        return items
+
+    def _uid(self):
+        return f"00000000-0000-0000-0000-{next(self._uids):012d}"
+
+    def _suffix(self):
+        return hashlib.sha1(str(next(self._names)).encode()).hexdigest()[:5]
+
+    def _event(self, obj, reason, message, component, event_type="Normal"):
+        now = _timestamp(time.time())
+        metadata = obj["metadata"]
+        namespace = metadata.get("namespace") or "default"
+        event = {
+            "apiVersion": "v1",
+            "kind": "Event",
+            "metadata": {
+                "name": f"{metadata['name']}.{self._suffix()}",
+                "namespace": namespace,
+                "uid": self._uid(),
+                "creationTimestamp": now,
+            },
+            "involvedObject": {
+                "kind": obj.get("kind") or "Pod",
+                "name": metadata["name"],
+                "namespace": metadata.get("namespace"),
+                "uid": metadata.get("uid"),
+            },
+            "reason": reason,
+            "message": message,
+            "type": event_type,
+            "source": {"component": component},
+            "reportingComponent": component,
+            "firstTimestamp": now,
+            "lastTimestamp": now,
+            "count": 1,
+        }
+        self._emit("events", "ADDED", event)
+        events = self.objects["events"]
+        while len(events) > self.settings["max_events"]:
+            oldest = next(iter(events))
+            self._emit("events", "DELETED", events[oldest])
+
+    def _new_node(self, pool, family, spot, labels, ready):
+        now = time.time()
+        name = f"gke-fake-{pool}-{self._suffix()}"
+        node_labels = {
+            **labels,
+            NODEPOOL_LABEL: pool,
+            MACHINE_FAMILY_LABEL: family,
+            "kubernetes.io/hostname": name,
+        }
+        if spot:
+            node_labels[SPOT_LABEL] = "true"
+        resources = {
+            "cpu": str(self.settings["node_cpu"]),
+            "memory": f"{self.settings['node_memory'] // 1024}Ki",
+            "pods": str(self.settings["pods_per_node"]),
+        }
+        node = {
+            "apiVersion": "v1",
+            "kind": "Node",
+            "metadata": {"name": name, "uid": self._uid(), "labels": node_labels, "creationTimestamp": _timestamp(now)},
+            "spec": {},
+            "status": {
+                "capacity": dict(resources),
+                "allocatable": dict(resources),
+                "conditions": [
+                    {
+                        "type": "Ready",
+                        "status": "True" if ready else "False",
+                        "reason": "KubeletReady" if ready else "KubeletNotReady",
+                        "lastTransitionTime": _timestamp(now),
+                        "lastHeartbeatTime": _timestamp(now),
+                    }
+                ],
+            },
+        }
+        self._node_pods[name] = set()
+        if ready:
+            self._free_nodes[name] = None
+            self._empty_since[name] = now
+        self._emit("nodes", "ADDED", node)
+        return node
+
+    def _new_pod(self, deployment_key, deployment, now):
+        metadata = deployment["metadata"]
+        template = copy.deepcopy(deployment["spec"]["template"])
+        template_hash = deployment["_templateHash"]
+        replica_set = f"{metadata['name']}-{template_hash}"
+        labels = {**template.get("metadata", {}).get("labels", {}), "pod-template-hash": template_hash}
+        pod = {
+            "apiVersion": "v1",
+            "kind": "Pod",
+            "metadata": {
+                "name": f"{replica_set}-{self._suffix()}",
+                "namespace": metadata["namespace"],
+                "uid": self._uid(),
+                "labels": labels,
+                "creationTimestamp": _timestamp(now),
+                "ownerReferences": [
+                    {"apiVersion": "apps/v1", "kind": "ReplicaSet", "name": replica_set, "uid": metadata["uid"], "controller": True}
+                ],
+            },
+            "spec": template["spec"],
+            "status": {"phase": "Pending", "conditions": []},
+            "_created": now,
+            "_deployment": deployment_key,
+        }
+        key = self._key(pod)
+        self._emit("pods", "ADDED", pod)
+        self._active[deployment_key].add(key)
+        self._pending.append(key)
+
+    def _set_condition(self, obj, condition_type, status, now, reason=None):
+        conditions = obj["status"].setdefault("conditions", [])
+        for condition in conditions:
+            if condition["type"] == condition_type:
+                if condition["status"] != status:
+                    condition["status"] = status
+                    condition["lastTransitionTime"] = _timestamp(now)
+                if reason:
+                    condition["reason"] = reason
+                return
+        condition = {"type": condition_type, "status": status, "lastTransitionTime": _timestamp(now)}
+        if reason:
+            condition["reason"] = reason
+        conditions.append(condition)
+
+    def tick(self, now, elapsed):
+        """
+        Advance the simulation by one controller step.
+
+        Args:
+            now (float): Current epoch time.
+            elapsed (float): Seconds since the previous tick.
+        """
+        with self.lock:
+            self._reconcile_deployments(now, elapsed)
+            self._finish_terminations(now)
+            self._provision_nodes(now)
+            self._schedule_pods(now)
+            self._start_pods(now)
+            self._scale_down_nodes(now)
+            self._update_deployment_status()
+
+    def _reconcile_deployments(self, now, elapsed):
+        for key, deployment in list(self.objects["deployments"].items()):
+            active = self._active[key]
+            desired = deployment["spec"]["replicas"]
+            if len(active) < desired:
+                budget = self._creation_budget.get(key, 0.0) + elapsed * self.settings["pods_per_second"]
+                create = min(desired - len(active), int(budget))
+                self._creation_budget[key] = min(budget - create, float(self.settings["pods_per_second"]))
+                for _ in range(create):
+                    self._new_pod(key, deployment, now)
+            elif len(active) > desired:
+                # Like the ReplicaSet controller, delete unscheduled and not-ready pods first.
+                pods = sorted(
+                    (self.objects["pods"][pod_key] for pod_key in active),
+                    key=lambda pod: (bool(pod["spec"].get("nodeName")), pod["status"]["phase"] == "Running"),
+                )
+                for pod in pods[: len(active) - desired]:
+                    pod_key = self._key(pod)
+                    active.discard(pod_key)
+                    self._ready[key].discard(pod_key)
+                    self._terminate(pod_key, pod, now)
+
+    def _terminate(self, key, pod, now):
+        # Like the API server: deletionTimestamp is the end of the grace period, not the request time.
+        pod["metadata"]["deletionTimestamp"] = _timestamp(now + POD_GRACE_PERIOD)
+        pod["metadata"]["deletionGracePeriodSeconds"] = POD_GRACE_PERIOD
+        self._terminating[key] = now + self.settings["termination_latency"]
+        self._emit("pods", "MODIFIED", pod)
+
+    def _finish_terminations(self, now):
+        for key, gone_at in list(self._terminating.items()):
+            if gone_at > now:
+                continue
+            del self._terminating[key]
+            self._starting.pop(key, None)
+            self._unschedulable.pop(key, None)
+            pod = self.objects["pods"].get(key)
+            if pod is None:
+                continue
+            node_name = pod["spec"].get("nodeName")
+            if node_name in self._node_pods:
+                self._node_pods[node_name].discard(key)
+                self._free_nodes[node_name] = None
+                if not self._node_pods[node_name]:
+                    self._empty_since[node_name] = now
+            self._emit("pods", "DELETED", pod)
+
+    def _find_node(self, pod):
+        node_selector = (pod["spec"].get("nodeSelector") or {}).items()
+        for name in list(self._free_nodes):
+            if len(self._node_pods[name]) >= self.settings["pods_per_node"]:
+                del self._free_nodes[name]
+                continue
+            labels = self.objects["nodes"][name]["metadata"]["labels"]
+            if all(labels.get(k) == v for k, v in node_selector):
+                return name
+        return None
+
+    def _schedule_pods(self, now):
+        newly_unschedulable = []
+        failed = False
+        while self._pending:
+            key = self._pending[0]
+            pod = self.objects["pods"].get(key)
+            if pod is None or "deletionTimestamp" in pod["metadata"]:
+                self._pending.popleft()
+                continue
+            if pod["_created"] + self.settings["schedule_latency"] > now:
+                break
+            self._pending.popleft()
+            node_name = self._find_node(pod)
+            if node_name is None:
+                failed = True
+                if key not in self._unschedulable:
+                    self._unschedulable[key] = None
+                    newly_unschedulable.append(pod)
+                continue
+            self._unschedulable.pop(key, None)
+            pod["spec"]["nodeName"] = node_name
+            self._node_pods[node_name].add(key)
+            self._empty_since.pop(node_name, None)
+            self._set_condition(pod, "PodScheduled", "True", now)
+            self._starting[key] = now + self.settings["pod_start_latency"]
+            self._emit("pods", "MODIFIED", pod)
+
+        for pod in newly_unschedulable:
+            self._set_condition(pod, "PodScheduled", "False", now, reason="Unschedulable")
+            self._emit("pods", "MODIFIED", pod)
+            self._event(pod, "FailedScheduling", f"0/{len(self.objects['nodes'])} nodes are available.",
+                        "default-scheduler", event_type="Warning")
+        if failed:
+            self._trigger_scale_up(now)
+
+    def _trigger_scale_up(self, now):
+        # Group unschedulable pods by node selector; pods already covered by nodes
+        # being provisioned for the same selector do not trigger another scale-up.
+        groups = {}
+        for key in self._unschedulable:
+            pod = self.objects["pods"].get(key)
+            if pod is not None and "deletionTimestamp" not in pod["metadata"]:
+                selector = tuple(sorted((pod["spec"].get("nodeSelector") or {}).items()))
+                groups.setdefault(selector, []).append(pod)
+        provisioning = {}
+        for selector in self._provisioning_group.values():
+            provisioning[selector] = provisioning.get(selector, 0) + 1
+
+        for selector, pods in groups.items():
+            needed = math.ceil(len(pods) / self.settings["pods_per_node"]) - provisioning.get(selector, 0)
+            if needed <= 0:
+                continue
+            node_selector = dict(selector)
+            priorities = self.compute_classes.get(node_selector.get(COMPUTE_CLASS_LABEL), self.priorities)
+            created = []
+            for _ in range(needed):
+                rank, priority = self._pick_priority(priorities)
+                spot = bool(priority.get("spot", False))
+                family = priority.get("machineFamily", "e2")
+                pool = f"nap-{family}-{'spot' if spot else 'ondemand'}"
+                node = self._new_node(pool, family, spot, labels=node_selector, ready=False)
+                name = node["metadata"]["name"]
+                self._provisioning[name] = (
+                    now + self.settings["node_provision_latency"] + rank * self.settings["fallback_latency"]
+                )
+                self._provisioning_group[name] = selector
+                created.append(name)
+            self._event(pods[0], "TriggeredScaleUp", f"pod triggered scale-up: {len(created)} node(s) {created[:5]}",
+                        "cluster-autoscaler")
+
+    def _pick_priority(self, priorities):
+        capacity = self.settings["nodes_per_priority"]
+        if capacity:
+            for rank, priority in enumerate(priorities):
+                group = (priority.get("machineFamily", "e2"), bool(priority.get("spot")))
+                if self._priority_usage.get(group, 0) < capacity:
+                    self._priority_usage[group] = self._priority_usage.get(group, 0) + 1
+                    return rank, priority
+            return len(priorities) - 1, priorities[-1]
+        return 0, priorities[0]
+
+    def _provision_nodes(self, now):
+        became_ready = False
+        for name, ready_at in list(self._provisioning.items()):
+            if ready_at > now:
+                continue
+            del self._provisioning[name]
+            self._provisioning_group.pop(name, None)
+            node = self.objects["nodes"].get(name)
+            if node is None:
+                continue
+            self._set_condition(node, "Ready", "True", now, reason="KubeletReady")
+            self._free_nodes[name] = None
+            self._empty_since[name] = now
+            self._emit("nodes", "MODIFIED", node)
+            self._event(node, "NodeReady", f"Node {name} status is now: NodeReady", "kubelet")
+            became_ready = True
+        if became_ready and self._unschedulable:
+            # Retry unschedulable pods first, in their original order.
+            self._pending.extendleft(reversed(list(self._unschedulable)))
+
+    def _start_pods(self, now):
+        for key, ready_at in list(self._starting.items()):
+            if ready_at > now:
+                continue
+            del self._starting[key]
+            pod = self.objects["pods"].get(key)
+            if pod is None or "deletionTimestamp" in pod["metadata"]:
+                continue
+            pod["status"]["phase"] = "Running"
+            pod["status"]["startTime"] = _timestamp(now)
+            self._set_condition(pod, "Initialized", "True", now)
+            self._set_condition(pod, "ContainersReady", "True", now)
+            self._set_condition(pod, "Ready", "True", now)
+            self._ready[pod["_deployment"]].add(key)
+            self._emit("pods", "MODIFIED", pod)
+
+    def _scale_down_nodes(self, now):
+        delay = self.settings["node_scale_down_delay"]
+        for name, empty_since in list(self._empty_since.items()):
+            if name in self.initial_node_names or name in self._provisioning or empty_since + delay > now:
+                continue
+            del self._empty_since[name]
+            self._free_nodes.pop(name, None)
+            self._node_pods.pop(name, None)
+            node = self.objects["nodes"].get(name)
+            if node is None:
+                continue
+            labels = node["metadata"]["labels"]
+            group = (labels.get(MACHINE_FAMILY_LABEL), labels.get(SPOT_LABEL) == "true")
+            if self._priority_usage.get(group):
+                self._priority_usage[group] -= 1
+            node["spec"]["taints"] = [{"key": SCALE_DOWN_TAINT, "value": str(int(now)), "effect": "NoSchedule"}]
+            self._emit("nodes", "MODIFIED", node)
+            self._event(node, "ScaleDown", f"node removed by cluster autoscaler: {name}", "cluster-autoscaler")
+            self._emit("nodes", "DELETED", node)
+
+    def _update_deployment_status(self):
+        for key, deployment in self.objects["deployments"].items():
+            replicas, ready = len(self._active[key]), len(self._ready[key])
+            status = deployment["status"]
+            if status["replicas"] != replicas or status["availableReplicas"] != ready:
+                status["replicas"] = replicas
+                status["updatedReplicas"] = replicas
+                status["readyReplicas"] = ready
+                status["availableReplicas"] = ready
+                self._emit("deployments", "MODIFIED", deployment)
+
+
+def _public(obj):
+    # Simulator-internal fields start with "_" and never leave the server.
+    return {key: value for key, value in obj.items() if not key.startswith("_")}
+
+
+LOG_LINE = (
+    "This is a log entry %d. Repeating to generate some volume of log data to test logging. "
+    "Each Entry around 100 Bytes\n"
+)
+LOG_CHUNK_LINES = 500
+
+
+# Discovery documents of the served group versions: path -> (groupVersion, [(resource, kind, namespaced)]).
+API_RESOURCES = {
+    "/api/v1": ("v1", [
+        ("namespaces", "Namespace", False),
+        ("nodes", "Node", False),
+        ("pods", "Pod", True),
+        ("pods/log", "Pod", True),
+        ("events", "Event", True),
+    ]),
+    "/apis/apps/v1": ("apps/v1", [("deployments", "Deployment", True), ("deployments/scale", "Scale", True)]),
+    "/apis/cloud.google.com/v1": ("cloud.google.com/v1", [("computeclasses", "ComputeClass", False)]),
+    "/apis/metrics.k8s.io/v1beta1": ("metrics.k8s.io/v1beta1", [("nodes", "NodeMetrics", False),
+                                                                 ("pods", "PodMetrics", True)]),
+}
+
+
+def _discovery(path):
+    if path == "/version":
+        return {"major": "1", "minor": "30", "gitVersion": "v1.30.0-fake", "platform": "linux/amd64"}
+    if path == "/apis":
+        groups = []
+        for group_version, _ in API_RESOURCES.values():
+            if "/" in group_version:
+                name, version = group_version.split("/")
+                entry = {"groupVersion": group_version, "version": version}
+                groups.append({"name": name, "versions": [entry], "preferredVersion": entry})
+        return {"kind": "APIGroupList", "apiVersion": "v1", "groups": groups}
+    if path == "/api":
+        return {"kind": "APIVersions", "versions": ["v1"]}
+    if path in API_RESOURCES:
+        group_version, resources = API_RESOURCES[path]
+        return {
+            "kind": "APIResourceList",
+            "apiVersion": "v1",
+            "groupVersion": group_version,
+            "resources": [
+                {"name": name, "singularName": "", "namespaced": namespaced, "kind": kind,
+                 "verbs": ["get", "list", "watch", "patch", "delete", "deletecollection"]}
+                for name, kind, namespaced in resources
+            ],
+        }
+    return None
+
+
+def _cpu_quantity(cores):
+    return f"{int(cores * 1e9)}n"
+
+
+def _memory_quantity(size):
+    return f"{int(size) // 1024}Ki"
+
+
+def _event_line(event_type, obj):
+    return (json.dumps({"type": event_type, "object": _public(obj)}) + "\n").encode()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    ROUTES = [
+        (re.compile(r"^/apis/apps/v1/namespaces/(?P<namespace>[^/]+)/deployments/(?P<name>[^/]+)/scale$"), "scale"),
+        (re.compile(r"^/apis/apps/v1/namespaces/(?P<namespace>[^/]+)/deployments/(?P<name>[^/]+)$"), "deployment"),
+        (re.compile(r"^/apis/apps/v1/namespaces/(?P<namespace>[^/]+)/deployments$"), "deployments"),
+        (re.compile(r"^/apis/apps/v1/deployments$"), "deployments"),
+        (re.compile(r"^/api/v1/nodes/(?P<name>[^/]+)$"), "node"),
+        (re.compile(r"^/api/v1/nodes$"), "nodes"),
+        (re.compile(r"^/api/v1/namespaces/(?P<namespace>[^/]+)/pods/(?P<name>[^/]+)/log$"), "log"),
+        (re.compile(r"^/api/v1/namespaces/(?P<namespace>[^/]+)/pods/(?P<name>[^/]+)$"), "pod"),
+        (re.compile(r"^/api/v1/namespaces/(?P<namespace>[^/]+)/pods$"), "pods"),
+        (re.compile(r"^/api/v1/pods$"), "pods"),
+        (re.compile(r"^/api/v1/namespaces/(?P<namespace>[^/]+)/events$"), "events"),
+        (re.compile(r"^/api/v1/events$"), "events"),
+        (re.compile(r"^/api/v1/namespaces/(?P<name>[^/]+)$"), "namespace"),
+        (re.compile(r"^/api/v1/namespaces$"), "namespaces"),
+        (re.compile(r"^/apis/cloud.google.com/v1/computeclasses/(?P<name>[^/]+)$"), "computeclass"),
+        (re.compile(r"^/apis/cloud.google.com/v1/computeclasses$"), "computeclasses"),
+        (re.compile(r"^/apis/metrics.k8s.io/v1beta1/nodes$"), "nodemetrics"),
+        (re.compile(r"^/apis/metrics.k8s.io/v1beta1/namespaces/(?P<namespace>[^/]+)/pods$"), "podmetrics"),
+        (re.compile(r"^/apis/metrics.k8s.io/v1beta1/pods$"), "podmetrics"),
+    ]
+    # Routes of single objects that support server-side apply, and their kind.
+    APPLY_ROUTES = {"deployment": "deployments", "namespace": "namespaces", "computeclass": "computeclasses"}
+
+    def log_message(self, format, *args):
+        logger.debug("fake-apiserver: " + format, *args)
+
+    @property
+    def cluster(self):
+        return self.server.cluster
+
+    def _route(self):
+        url = urlparse(self.path)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        for pattern, route in self.ROUTES:
+            match = pattern.match(url.path)
+            if match:
+                return route, match.groupdict(), query
+        return None, {}, query
+
+    def _send_json(self, status, body):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _send_status(self, code, reason, message):
+        self._send_json(code, {"kind": "Status", "apiVersion": "v1", "status": "Failure",
+                               "reason": reason, "message": message, "code": code})
+
+    def do_GET(self):
+        route, params, query = self._route()
+        discovery = _discovery(urlparse(self.path).path)
+        if discovery is not None:
+            self._send_json(200, discovery)
+        elif route in ("deployments", "nodes", "pods", "events", "namespaces", "computeclasses"):
+            object_filter = ObjectFilter(params.get("namespace"), query.get("labelSelector"), query.get("fieldSelector"))
+            if (query.get("watch") or "").lower() in ("true", "1"):
+                self._watch(route, object_filter, query)
+            else:
+                self._list(route, object_filter, query)
+        elif route in ("nodemetrics", "podmetrics"):
+            object_filter = ObjectFilter(params.get("namespace"), query.get("labelSelector"), query.get("fieldSelector"))
+            kind = "nodes" if route == "nodemetrics" else "pods"
+            list_kind = "NodeMetricsList" if route == "nodemetrics" else "PodMetricsList"
+            self._send_json(200, {"kind": list_kind, "apiVersion": "metrics.k8s.io/v1beta1", "metadata": {},
+                                  "items": self.cluster.resource_metrics(kind, object_filter)})
+        elif route in ("deployment", "node", "pod", "scale", "log", "namespace", "computeclass"):
+            kind = {"scale": "deployments", "node": "nodes", "pod": "pods", "log": "pods", **self.APPLY_ROUTES}[route]
+            key = f"{params['namespace']}/{params['name']}" if "namespace" in params else params["name"]
+            obj = self.cluster.get(kind, key)
+            if obj is None:
+                self._send_status(404, "NotFound", f"{kind} \"{params['name']}\" not found")
+            elif route == "scale":
+                self._send_json(200, self.cluster.scale_subresource(obj))
+            elif route == "log":
+                self._pod_log(obj, query)
+            else:
+                self._send_json(200, _public(obj))
+        else:
+            self._send_status(404, "NotFound", f"the server could not find the requested resource ({self.path})")
+
+    def do_PATCH(self):
+        route, params, _ = self._route()
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+        if route in self.APPLY_ROUTES and self.headers.get("Content-Type") == "application/apply-patch+yaml":
+            self._apply(self.APPLY_ROUTES[route], params, body)
+            return
+        if route != "scale":
+            self._send_status(405, "MethodNotAllowed", f"PATCH is not supported on {self.path}")
+            return
+        if isinstance(body, list):
+            # JSON patch: [{"op": "replace", "path": "/spec/replicas", "value": N}]
+            replicas = next((op["value"] for op in body if op.get("path") == "/spec/replicas"), None)
+        else:
+            replicas = body.get("spec", {}).get("replicas")
+        if replicas is None:
+            self._send_status(422, "Invalid", "spec.replicas is required")
+            return
+        scale = self.cluster.scale(f"{params['namespace']}/{params['name']}", int(replicas))
+        if scale is None:
+            self._send_status(404, "NotFound", f"deployments.apps \"{params['name']}\" not found")
+        else:
+            self._send_json(200, scale)
+
+    def _apply(self, kind, params, body):
+        metadata = body.setdefault("metadata", {})
+        if metadata.get("name") != params["name"]:
+            self._send_status(400, "BadRequest", "the name of the object does not match the name in the URL")
+            return
+        if "namespace" in params:
+            metadata["namespace"] = params["namespace"]
+        key = f"{params['namespace']}/{params['name']}" if "namespace" in params else params["name"]
+        obj, created = self.cluster.apply(kind, key, body)
+        self._send_json(201 if created else 200, _public(obj))
+
+    def do_DELETE(self):
+        route, params, query = self._route()
+        length = int(self.headers.get("Content-Length", 0))
+        self.rfile.read(length)
+        if route in ("deployment", "computeclass"):
+            kind = self.APPLY_ROUTES[route]
+            key = f"{params['namespace']}/{params['name']}" if "namespace" in params else params["name"]
+            obj = self.cluster.delete(kind, key)
+            if obj is None:
+                self._send_status(404, "NotFound", f"{kind} \"{params['name']}\" not found")
+            else:
+                self._send_json(200, _public(obj))
+            return
+        if route not in ("deployments", "computeclasses"):
+            self._send_status(405, "MethodNotAllowed", f"DELETE is not supported on {self.path}")
+            return
+        object_filter = ObjectFilter(params.get("namespace"), query.get("labelSelector"), query.get("fieldSelector"))
+        deleted = self.cluster.delete_collection(route, object_filter)
+        list_kind = {"deployments": "DeploymentList", "computeclasses": "ComputeClassList"}[route]
+        api_version = {"deployments": "apps/v1", "computeclasses": "cloud.google.com/v1"}[route]
+        self._send_json(200, {"kind": list_kind, "apiVersion": api_version, "metadata": {},
+                              "items": [_public(obj) for obj in deleted]})
+
+    def _list(self, kind, object_filter, query):
+        items, resource_version = self.cluster.list(kind, object_filter)
+        offset = int(query.get("continue") or 0)
+        limit = int(query.get("limit") or 0)
+        metadata = {"resourceVersion": resource_version}
+        if limit:
+            page = items[offset:offset + limit]
+            if offset + limit < len(items):
+                metadata["continue"] = str(offset + limit)
+                metadata["remainingItemCount"] = len(items) - offset - limit
+        else:
+            page = items[offset:]
+        list_kind = {"deployments": "DeploymentList", "nodes": "NodeList", "pods": "PodList", "events": "EventList",
+                     "namespaces": "NamespaceList", "computeclasses": "ComputeClassList"}[kind]
+        api_version = {"deployments": "apps/v1", "computeclasses": "cloud.google.com/v1"}.get(kind, "v1")
+        self._send_json(200, {"kind": list_kind, "apiVersion": api_version, "metadata": metadata,
+                              "items": [_public(item) for item in page]})
+
+    def _write_chunk(self, data):
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+        self.wfile.flush()
+
+    def _watch(self, kind, object_filter, query):
+        initial, subscriber = self.cluster.subscribe(kind, object_filter, query.get("resourceVersion"))
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        try:
+            if subscriber is None:
+                status = {"kind": "Status", "apiVersion": "v1", "status": "Failure", "code": 410,
+                          "reason": "Expired", "message": "too old resource version"}
+                self._write_chunk((json.dumps({"type": "ERROR", "object": status}) + "\n").encode())
+                return
+            deadline = time.time() + int(query.get("timeoutSeconds") or 1800)
+            for _, _, obj, line in initial:
+                if object_filter(obj):
+                    self._write_chunk(line)
+            while True:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                try:
+                    entry = subscriber.get(timeout=min(remaining, 1.0))
+                except queue.Empty:
+                    continue
+                if entry is None:
+                    break
+                if object_filter(entry[2]):
+                    self._write_chunk(entry[3])
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            if subscriber is not None:
+                self.cluster.unsubscribe(kind, subscriber)
+            try:
+                self.wfile.write(b"0\r\n\r\n")
+                self.wfile.flush()
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+
+    def _pod_log(self, pod, query):
+        """
+        Stream a simulated container log: bursts of `log_burst_lines` lines at up to
+        `log_bytes_per_second`, repeated every `log_burst_interval` while following.
+        """
+        if pod["status"].get("phase") != "Running":
+            container = pod["spec"]["containers"][0]["name"]
+            self._send_status(
+                400, "BadRequest", f"container \"{container}\" in pod \"{pod['metadata']['name']}\" is waiting to start"
+            )
+            return
+        settings = self.cluster.settings
+        follow = (query.get("follow") or "").lower() in ("true", "1")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        try:
+            while True:
+                burst_start = time.monotonic()
+                sent = 0
+                self._write_chunk(f"{datetime.now(timezone.utc):%a %b %d %H:%M:%S UTC %Y}\n".encode())
+                for first in range(1, settings["log_burst_lines"] + 1, LOG_CHUNK_LINES):
+                    last = min(first + LOG_CHUNK_LINES, settings["log_burst_lines"] + 1)
+                    chunk = "".join(LOG_LINE % i for i in range(first, last)).encode()
+                    self._write_chunk(chunk)
+                    sent += len(chunk)
+                    # Throttle to the simulated kubelet bandwidth.
+                    ahead = sent / settings["log_bytes_per_second"] - (time.monotonic() - burst_start)
+                    if ahead > 0 and self.cluster.wait_stopped(ahead):
+                        return
+                if not follow or self.cluster.wait_stopped(settings["log_burst_interval"]):
+                    return
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            try:
+                self.wfile.write(b"0\r\n\r\n")
+                self.wfile.flush()
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+
+
+class FakeApiServer:
+    """
+    Localhost stand-in for the Kubernetes API server backed by a FakeCluster.
+
+    Serves the AppsV1/CoreV1 endpoints used by the harness (deployment read, scale
+    patch, list/watch of deployments, nodes, pods and events, pod logs), API discovery,
+    server-side apply and deletion of manifests, so the feature files
+    can run offline and the harness can be benchmarked at 10k-100k pods.
+    """
+
+    def __init__(self, settings=None, host="127.0.0.1", port=0):
+        """
+        Initializes the fake API server.
+
+        Args:
+            settings (dict): The `[fake]` configuration section.
+            host (str): Interface to bind.
+            port (int): Port to bind (0 picks a free port).
+        """
+        self.cluster = FakeCluster(settings)
+        self.httpd = ThreadingHTTPServer((host, port), _Handler)
+        self.httpd.daemon_threads = True
+        self.httpd.cluster = self.cluster
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        """
+        Seed the cluster, start the simulated controllers and serve requests in a background thread.
+        """
+        self.cluster.seed()
+        self.cluster.start()
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="fake-apiserver", daemon=True)
+        self._thread.start()
+        logger.info("Fake Kubernetes API server listening on %s", self.url)
+        return self
+
+    def stop(self):
+        self.cluster.stop()
+        self.httpd.shutdown()
+        self.httpd.server_close()
@@ -0,0 +1,362 @@
+import threading
+import time
+import orjson
+from kubernetes import watch
+from kubernetes.client.rest import ApiException
+from kubernetes.watch.watch import iter_resp_lines
+from src.utils.list_util import DEFAULT_PAGE_SIZE, iter_pages
+from src.utils.records import iter_raw_pages
+from src.utils.logging_util import get_logger
+
+logger = get_logger(__name__)
+
+HTTP_STATUS_GONE = 410
+GKE_NODEPOOL_LABEL = "cloud.google.com/gke-nodepool"
+
+
+def object_key(obj):
+    """
+    Return the cache key ("namespace/name" or "name") of a Kubernetes object.
+    """
+    metadata = obj.metadata
+    if metadata.namespace:
+        return f"{metadata.namespace}/{metadata.name}"
+    return metadata.name
+
+
+def is_ready(obj):
+    """
+    Return True if the node or pod has a Ready condition with status "True".
+    """
+    conditions = (obj.status.conditions if obj.status else None) or []
+    return any(condition.type == "Ready" and condition.status == "True" for condition in conditions)
+
+
+def index_by_ready(obj):
+    return [is_ready(obj)]
+
+
+def index_by_namespace(obj):
+    return [obj.metadata.namespace]
+
+
+def index_by_node_pool(obj):
+    return [(obj.metadata.labels or {}).get(GKE_NODEPOOL_LABEL)]
+
+
+def index_by_owner_deployment(obj):
+    """
+    Index pods by the deployment owning their ReplicaSet.
+
+    The ReplicaSet name is "<deployment>-<pod-template-hash>", so the deployment
+    name is recovered without an extra API call.
+    """
+    template_hash = (obj.metadata.labels or {}).get("pod-template-hash")
+    for owner in obj.metadata.owner_references or []:
+        if owner.kind == "ReplicaSet" and template_hash and owner.name.endswith(f"-{template_hash}"):
+            return [owner.name[: -len(template_hash) - 1]]
+    return []
+
+
+def index_by_ready_owner_deployment(obj):
+    """
+    Index Ready pods that are not terminating by the deployment owning them, so the
+    serving replicas of a deployment are counted in O(1).
+    """
+    if obj.metadata.deletion_timestamp is not None or not is_ready(obj):
+        return []
+    return index_by_owner_deployment(obj)
+
+
+def index_by_node_name(obj):
+    return [obj.spec.node_name] if obj.spec and obj.spec.node_name else []
+
+
+NODE_INDEXES = {
+    "ready": index_by_ready,
+    "node_pool": index_by_node_pool,
+}
+
+POD_INDEXES = {
+    "ready": index_by_ready,
+    "namespace": index_by_namespace,
+    "owner_deployment": index_by_owner_deployment,
+    "ready_owner_deployment": index_by_ready_owner_deployment,
+    "node": index_by_node_name,
+}
+
+
+class Informer:
+    """
+    Local cache of a Kubernetes resource kept up to date by a list followed by watch deltas.
+
+    Secondary indexes map an index value to the set of object keys, so counts such as
+    "how many Ready nodes" are answered in O(1) without another API call.
+    """
+
+    def __init__(
+        self,
+        list_func,
+        *args,
+        indexers=None,
+        watch_timeout=300,
+        page_size=DEFAULT_PAGE_SIZE,
+        decoder=None,
+        key_func=object_key,
+        **kwargs,
+    ):
+        """
+        Initializes the informer.
+
+        Args:
+            list_func (callable): List function of a Kubernetes API client (e.g. `CoreV1Api.list_node`).
+            *args: Positional arguments passed to `list_func`.
+            indexers (dict): Mapping of index name to a function returning the index values of an object.
+            watch_timeout (int): Server-side timeout in seconds of each watch request.
+            page_size (int): Maximum number of objects per page of the initial list.
+            decoder (callable): Optional fast path: objects are fetched as raw JSON
+                (`_preload_content=False`), parsed with orjson and converted with this
+                function (e.g. `PodRecord.from_dict`) instead of client models.
+            key_func (callable): Returns the cache key of an object (e.g. `record_key` for records).
+            **kwargs: Keyword arguments passed to `list_func` (e.g. label_selector).
+        """
+        self.list_func = list_func
+        self.args = args
+        self.kwargs = kwargs
+        self.indexers = indexers or {}
+        self.watch_timeout = watch_timeout
+        self.page_size = page_size
+        self.decoder = decoder
+        self.key_func = key_func
+        self.resource_version = None
+        self._store = {}
+        self._indexes = {name: {} for name in self.indexers}
+        self._index_values = {}  # key -> {index name: values}, used to unindex on update/delete
+        self._handlers = []
+        self._condition = threading.Condition(threading.RLock())
+        self._stop_event = threading.Event()
+        self._synced = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """
+        Perform the initial list and start the background watch thread.
+        """
+        if self._thread is not None:
+            return self
+        self._relist()
+        self._thread = threading.Thread(
+            target=self._run, name=f"informer-{self.list_func.__name__}", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """
+        Stop the background watch thread.
+        """
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+
+    def add_handler(self, handler):
+        """
+        Register a callback invoked as `handler(event_type, obj)` for every applied delta.
+        """
+        with self._condition:
+            self._handlers.append(handler)
+
+    def remove_handler(self, handler):
+        """
+        Unregister a callback added with `add_handler` (no-op if it is not registered).
+        """
+        with self._condition:
+            if handler in self._handlers:
+                self._handlers.remove(handler)
+
+    def has_synced(self):
+        return self._synced.is_set()
+
+    def get(self, key):
+        with self._condition:
+            return self._store.get(key)
+
+    def list(self):
+        with self._condition:
+            return list(self._store.values())
+
+    def by_index(self, index_name, value):
+        """
+        Return the cached objects whose index `index_name` contains `value`.
+        """
+        with self._condition:
+            keys = self._indexes[index_name].get(value, ())
+            return [self._store[key] for key in keys]
+
+    def count(self, index_name, value):
+        """
+        Return the number of cached objects whose index `index_name` contains `value`.
+        """
+        with self._condition:
+            return len(self._indexes[index_name].get(value, ()))
+
+    def __len__(self):
+        with self._condition:
+            return len(self._store)
+
+    def wait_until(self, predicate, timeout):
+        """
+        Block until `predicate(informer)` holds, re-evaluating it after every applied delta.
+
+        Args:
+            predicate (callable): Function receiving this informer.
+            timeout (float): Maximum time to wait in seconds.
+
+        Returns:
+            float: Elapsed time in seconds, or None if the timeout expired.
+        """
+        start_time = time.monotonic()
+        deadline = start_time + timeout
+        with self._condition:
+            while not predicate(self):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                self._condition.wait(remaining)
+        return time.monotonic() - start_time
+
+    def _pages(self):
+        """
+        Yield (objects, resourceVersion) for every page of the list call.
+        """
+        if self.decoder is None:
+            for page in iter_pages(self.list_func, *self.args, page_size=self.page_size, **self.kwargs):
+                yield page.items, page.metadata.resource_version
+        else:
+            for page in iter_raw_pages(self.list_func, *self.args, page_size=self.page_size, **self.kwargs):
+                yield [self.decoder(item) for item in page["items"]], page["metadata"].get("resourceVersion")
+
+    def _relist(self):
+        live_keys = set()
+        resource_version = None
+        for objects, page_version in self._pages():
+            with self._condition:
+                for obj in objects:
+                    key = self.key_func(obj)
+                    live_keys.add(key)
+                    self._apply("ADDED" if key not in self._store else "MODIFIED", key, obj)
+            if resource_version is None:
+                # Watch from the snapshot the first page was served from.
+                resource_version = page_version
+        with self._condition:
+            for key in [key for key in self._store if key not in live_keys]:
+                self._apply("DELETED", key, self._store[key])
+            self.resource_version = resource_version
+            self._synced.set()
+            self._condition.notify_all()
+        logger.debug("Informer for %s listed %s objects.", self.list_func.__name__, len(live_keys))
+
+    def _events(self):
+        """
+        Yield (event type, object, resourceVersion) for one watch request, resuming from
+        `self.resource_version`. BOOKMARK events yield a None object.
+        """
+        watch_kwargs = dict(
+            resource_version=self.resource_version,
+            allow_watch_bookmarks=True,
+            timeout_seconds=self.watch_timeout,
+            _request_timeout=self.watch_timeout + 5,
+            **self.kwargs,
+        )
+        if self.decoder is None:
+            w = watch.Watch()
+            try:
+                for event in w.stream(self.list_func, *self.args, **watch_kwargs):
+                    if event["type"] == "BOOKMARK":
+                        yield "BOOKMARK", None, event["raw_object"]["metadata"]["resourceVersion"]
+                    else:
+                        yield event["type"], event["object"], event["object"].metadata.resource_version
+            finally:
+                w.stop()
+            return
+
+        response = self.list_func(*self.args, watch=True, _preload_content=False, **watch_kwargs)
+        try:
+            for line in iter_resp_lines(response):
+                event = orjson.loads(line)
+                raw_object = event["object"]
+                if event["type"] == "ERROR":
+                    raise ApiException(
+                        status=raw_object.get("code"), reason=f"{raw_object.get('reason')}: {raw_object.get('message')}"
+                    )
+                resource_version = raw_object["metadata"]["resourceVersion"]
+                if event["type"] == "BOOKMARK":
+                    yield "BOOKMARK", None, resource_version
+                else:
+                    yield event["type"], self.decoder(raw_object), resource_version
+        finally:
+            response.close()
+            response.release_conn()
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            try:
+                for event_type, obj, resource_version in self._events():
+                    if self._stop_event.is_set():
+                        break
+                    if obj is not None:
+                        with self._condition:
+                            self._apply(event_type, self.key_func(obj), obj)
+                            self.resource_version = resource_version
+                            self._condition.notify_all()
+                    else:
+                        self.resource_version = resource_version
+            except ApiException as e:
+                if e.status == HTTP_STATUS_GONE:
+                    logger.info("Informer for %s expired (410 Gone); relisting.", self.list_func.__name__)
+                    self._relist_with_retry()
+                else:
+                    logger.warning("Informer watch for %s failed: %s", self.list_func.__name__, e)
+                    self._stop_event.wait(1)
+            except Exception as e:
+                logger.warning("Informer watch for %s interrupted: %s", self.list_func.__name__, e)
+                self._stop_event.wait(1)
+
+    def _relist_with_retry(self):
+        while not self._stop_event.is_set():
+            try:
+                self._relist()
+                return
+            except Exception as e:
+                logger.warning("Informer relist for %s failed: %s", self.list_func.__name__, e)
+                self._stop_event.wait(1)
+
+    def _apply(self, event_type, key, obj):
+        # Caller holds self._condition.
+        for index_name, values in self._index_values.pop(key, {}).items():
+            index = self._indexes[index_name]
+            for value in values:
+                keys = index.get(value)
+                if keys is not None:
+                    keys.discard(key)
+                    if not keys:
+                        del index[value]
+
+        if event_type == "DELETED":
+            self._store.pop(key, None)
+        else:
+            self._store[key] = obj
+            index_values = {}
+            for index_name, indexer in self.indexers.items():
+                values = indexer(obj)
+                index_values[index_name] = values
+                index = self._indexes[index_name]
+                for value in values:
+                    index.setdefault(value, set()).add(key)
+            self._index_values[key] = index_values
+
+        for handler in self._handlers:
+            try:
+                handler(event_type, obj)
+            except Exception as e:
+                logger.warning("Informer handler failed: %s", e)
@@ -1,9 +1,22 @@
 import os
-import tomli
+import tempfile
 from kubernetes import client, config
 from kubernetes.client.api_client import ApiClient
+from kubernetes.dynamic import DynamicClient
 from urllib3 import ProxyManager
+from src.utils.api_recording import RecordingPoolManager, shared_recorder, shared_replay
+from src.utils.config_util import get_settings
+from src.utils.fake_api_server import FakeApiServer
+from src.utils.informer import Informer, NODE_INDEXES, POD_INDEXES
 from src.utils.logging_util import get_logger
+from src.utils.rate_limiter import RateLimitedApi, ThrottleStats, TokenBucket
+from src.utils.records import (
+    NODE_RECORD_INDEXES,
+    POD_RECORD_INDEXES,
+    NodeRecord,
+    PodRecord,
+    record_key,
+)
 
 logger = get_logger(__name__)
 
@@ -12,41 +25,44 @@ class KubernetesClient:
     Utility class to set up and provide Kubernetes API clients.
     """
 
-    def __init__(self, config_file="config/settings.toml"):
+    def __init__(self, config_file=None, fast_decode=None, fake_url=None, record=None, replay=None):
         """
         Initializes the Kubernetes client based on configuration.
 
         Args:
-            config_file (str): Path to the configuration file.
+            config_file (str): Path to the configuration file (defaults to the shared settings).
+            fast_decode (bool): Cache slim records (PodRecord, NodeRecord) decoded from raw
+                JSON in informers instead of client models. Defaults to `[k8s].fast_decode`.
+            fake_url (str): URL of a running FakeApiServer to use instead of starting one
+                when config_mode is "fake" (e.g. the parent's server in a load driver worker).
+            record (str): File to record every API request and response to. Defaults to
+                `[recording].path` when `[recording].record` is set; "" disables recording.
+            replay (str): Recording to serve the API responses from instead of a cluster.
+                Defaults to `[recording].path` when config_mode is "replay".
         """
-        self.config = self._load_config(config_file)
+        self.settings = get_settings(config_file)
+        if fast_decode is None:
+            fast_decode = self.settings.k8s.fast_decode
+        self.fast_decode = fast_decode
         self.api_clients = {}  # Cache for API clients
+        self.dynamic_client = None  # DynamicClient for arbitrary kinds, created on first use
+        self.informers = {}  # Cache for shared informers
         self.proxy_manager = None  # ProxyManager instance
+        self.fake_server = None  # Local FakeApiServer when config_mode is "fake"
+        self.fake_url = fake_url
+        recording = self.settings.recording
+        if record is None:
+            record = recording.path if recording.record else ""
+        if replay is None and self.settings.k8s.config_mode == "replay":
+            replay = recording.path
+        self.recorder = shared_recorder(record, recording.block_size) if record and not replay else None
+        self.replay = shared_replay(replay, recording.speed) if replay else None
+        self._discovery_dir = None  # Fresh discovery cache while recording or replaying
+        rate_limit = self.settings.rate_limit
+        self.rate_limiter = TokenBucket(rate_limit.qps, rate_limit.burst)
+        self.throttle_stats = ThrottleStats()  # Shared by every API client handed out
         self._initialize_client()
 
-    def _load_config(self, config_file):
-        """
-        Load the configuration from the given TOML file.
-
-        Args:
-            config_file (str): Path to the configuration file.
-
-        Returns:
-            dict: Parsed configuration data.
-        """
-        logger.info(f"Loading configuration from {config_file}...")
-        try:
-            with open(config_file, "rb") as file:
-                config_data = tomli.load(file)
-                logger.info("Configuration loaded successfully.")
-                return config_data
-        except FileNotFoundError:
-            logger.error(f"Configuration file not found: {config_file}.")
-            raise
-        except Exception as e:
-            logger.exception(f"Failed to load configuration: {e}")
-            raise
-
     def _initialize_client(self):
         """
         Initializes the Kubernetes client based on the configuration.
@@ -55,8 +71,13 @@ class KubernetesClient:
             logger.info("Initializing Kubernetes client...")
 
             # Load Kubernetes configuration
-            config_mode = self.config.get("k8s", {}).get("config_mode", "local")
-            if config_mode == "local":
+            config_mode = self.settings.k8s.config_mode
+            if self.replay is not None:
+                logger.debug("Serving API responses from %s.", self.replay.recording.path)
+                configuration = client.Configuration()
+                configuration.host = "http://replay.invalid"
+                client.Configuration.set_default(configuration)
+            elif config_mode == "local":
                 logger.debug("Loading kubeconfig for local setup.")
                 config.load_kube_config()
                 self._configure_proxy()
@@ -65,26 +86,39 @@ class KubernetesClient:
                 logger.debug("Loading in-cluster Kubernetes configuration.")
                 config.load_incluster_config()
                 self._configure_ssl_settings()
+            elif config_mode == "fake":
+                configuration = client.Configuration()
+                if self.fake_url:
+                    logger.debug("Using fake Kubernetes API server at %s.", self.fake_url)
+                    configuration.host = self.fake_url
+                else:
+                    logger.debug("Starting local fake Kubernetes API server.")
+                    self.fake_server = FakeApiServer(self.settings.fake).start()
+                    configuration.host = self.fake_server.url
+                client.Configuration.set_default(configuration)
             else:
-                logger.error(f"Invalid config_mode: {config_mode}")
-                raise ValueError(f"Invalid config_mode: {config_mode}. Use 'local' or 'in-cluster'.")
+                logger.error("Invalid config_mode: %s", config_mode)
+                raise ValueError(
+                    f"Invalid config_mode: {config_mode}. Use 'local', 'in-cluster', 'fake' or 'replay'."
+                )
+            self._configure_connection_pool()
 
             logger.info("Kubernetes configuration initialized successfully.")
         except Exception as e:
-            logger.exception(f"Failed to initialize Kubernetes client: {e}")
+            logger.exception("Failed to initialize Kubernetes client: %s", e)
             raise
 
     def _configure_proxy(self):
         """
         Configure HTTP and HTTPS proxy settings using ProxyManager.
         """
-        http_proxy = self.config.get("local", {}).get("http_proxy")
-        https_proxy = self.config.get("local", {}).get("https_proxy")
-        no_proxy = self.config.get("local", {}).get("no_proxy")
+        http_proxy = self.settings.proxy.http_proxy
+        https_proxy = self.settings.proxy.https_proxy
+        no_proxy = self.settings.proxy.no_proxy
 
         if http_proxy or https_proxy:
             proxy_url = https_proxy or http_proxy
-            logger.info(f"Configuring proxy: {proxy_url}, NO_PROXY: {no_proxy}")
+            logger.info("Configuring proxy: %s, NO_PROXY: %s", proxy_url, no_proxy)
             self.proxy_manager = ProxyManager(
                 proxy_url=proxy_url,
                 proxy_headers=None,  # Add custom headers if necessary
@@ -106,31 +140,165 @@ class KubernetesClient:
         else:
             logger.info("No proxy settings provided. Skipping proxy configuration.")
 
+    def _configure_connection_pool(self):
+        """
+        Size the connection pool for concurrent watches and log streams, which each hold
+        a connection (the client default is 5 per CPU).
+        """
+        pool_size = self.settings.k8s.connection_pool_size
+        if pool_size:
+            configuration = client.Configuration.get_default_copy()
+            configuration.connection_pool_maxsize = pool_size
+            client.Configuration.set_default(configuration)
+            logger.debug("Connection pool size set to: %s", pool_size)
+
     def _configure_ssl_settings(self):
         """
         Configure SSL verification settings for the Kubernetes client.
         """
-        verify_ssl = self.config.get("local", {}).get("verify_ssl", True)
-        client.Configuration.get_default_copy().verify_ssl = verify_ssl
-        logger.info(f"SSL verification set to: {verify_ssl}")
+        verify_ssl = self.settings.proxy.verify_ssl
+        configuration = client.Configuration.get_default_copy()
+        configuration.verify_ssl = verify_ssl
+        client.Configuration.set_default(configuration)
+        logger.info("SSL verification set to: %s", verify_ssl)
+
+    def _install_transport(self, api_client):
+        """
+        Route the requests of an ApiClient through the recorder or the replay, if enabled.
+        """
+        rest_client = api_client.rest_client
+        if self.replay is not None:
+            rest_client.pool_manager = self.replay
+        elif self.recorder is not None:
+            rest_client.pool_manager = RecordingPoolManager(rest_client.pool_manager, self.recorder)
+        return api_client
 
     def get_client(self, api_type):
         """
         Retrieve the specified Kubernetes API client.
 
         Args:
-            api_type (str): Type of Kubernetes API client (e.g., "AppsV1Api", "CoreV1Api").
+            api_type (str): Type of Kubernetes API client ("AppsV1Api", "CoreV1Api" or "CustomObjectsApi").
 
         Returns:
-            object: The requested Kubernetes API client instance.
+            object: The requested Kubernetes API client, rate limited and retrying 429/5xx responses.
         """
         if api_type not in self.api_clients:
-            logger.info(f"Initializing API client for: {api_type}")
+            logger.info("Initializing API client for: %s", api_type)
             if api_type == "AppsV1Api":
-                self.api_clients[api_type] = client.AppsV1Api()
+                api = client.AppsV1Api()
             elif api_type == "CoreV1Api":
-                self.api_clients[api_type] = client.CoreV1Api()
+                api = client.CoreV1Api()
+            elif api_type == "CustomObjectsApi":
+                api = client.CustomObjectsApi()
             else:
-                logger.error(f"Unsupported API client type: {api_type}")
+                logger.error("Unsupported API client type: %s", api_type)
                 raise ValueError(f"Unsupported API client type: {api_type}")
+            self._install_transport(api.api_client)
+            rate_limit = self.settings.rate_limit
+            self.api_clients[api_type] = RateLimitedApi(
+                api,
+                self.rate_limiter,
+                self.throttle_stats,
+                max_retries=rate_limit.max_retries,
+                backoff_base=rate_limit.backoff_base,
+                backoff_max=rate_limit.backoff_max,
+            )
         return self.api_clients[api_type]
+
+    def get_dynamic_client(self):
+        """
+        Retrieve the DynamicClient used for kinds without a typed API (e.g. manifests).
+
+        Returns:
+            DynamicClient: A client whose requests share the rate limiter and API call stats.
+        """
+        if self.dynamic_client is None:
+            logger.info("Initializing dynamic API client.")
+            rate_limit = self.settings.rate_limit
+            api_client = RateLimitedApi(
+                self._install_transport(ApiClient()),
+                self.rate_limiter,
+                self.throttle_stats,
+                max_retries=rate_limit.max_retries,
+                backoff_base=rate_limit.backoff_base,
+                backoff_max=rate_limit.backoff_max,
+                methods=("call_api",),
+            )
+            cache_file = None
+            if self.recorder is not None or self.replay is not None:
+                # A cached discovery would skip the discovery requests, leaving them out of the recording.
+                self._discovery_dir = tempfile.TemporaryDirectory(prefix="scale-test-discovery-")
+                cache_file = os.path.join(self._discovery_dir.name, "discovery.json")
+            self.dynamic_client = DynamicClient(api_client, cache_file=cache_file)
+        return self.dynamic_client
+
+    def get_informer(self, resource):
+        """
+        Retrieve the shared, started informer cache for the specified resource.
+
+        Nodes are cached cluster-wide and pods for the configured namespace, both
+        restricted to the `node_selector`/`pod_selector` labels of the `[k8s]` section.
+
+        Args:
+            resource (str): Resource to cache ("nodes" or "pods").
+
+        Returns:
+            Informer: The started informer for the resource. It caches client models,
+            or PodRecord/NodeRecord objects when `fast_decode` is enabled.
+        """
+        if resource not in self.informers:
+            logger.info("Starting informer for: %s", resource)
+            core_api = self.get_client("CoreV1Api")
+            k8s_settings = self.settings.k8s
+            selectors = {}
+            if resource == "nodes":
+                if k8s_settings.node_selector:
+                    selectors["label_selector"] = k8s_settings.node_selector
+                if self.fast_decode:
+                    informer = Informer(
+                        core_api.list_node,
+                        indexers=NODE_RECORD_INDEXES,
+                        decoder=NodeRecord.from_dict,
+                        key_func=record_key,
+                        **selectors,
+                    )
+                else:
+                    informer = Informer(core_api.list_node, indexers=NODE_INDEXES, **selectors)
+            elif resource == "pods":
+                namespace = k8s_settings.namespace
+                if k8s_settings.pod_selector:
+                    selectors["label_selector"] = k8s_settings.pod_selector
+                if self.fast_decode:
+                    informer = Informer(
+                        core_api.list_namespaced_pod,
+                        namespace,
+                        indexers=POD_RECORD_INDEXES,
+                        decoder=PodRecord.from_dict,
+                        key_func=record_key,
+                        **selectors,
+                    )
+                else:
+                    informer = Informer(core_api.list_namespaced_pod, namespace, indexers=POD_INDEXES, **selectors)
+            else:
+                logger.error("Unsupported informer resource: %s", resource)
+                raise ValueError(f"Unsupported informer resource: {resource}")
+            self.informers[resource] = informer.start()
+        return self.informers[resource]
+
+    def close(self):
+        """
+        Stop all informers started by this client and the fake API server, if any, and
+        write the buffered part of the recording.
+        """
+        for informer in self.informers.values():
+            informer.stop()
+        self.informers.clear()
+        if self.fake_server is not None:
+            self.fake_server.stop()
+            self.fake_server = None
+        if self.recorder is not None:
+            self.recorder.flush()
+        if self._discovery_dir is not None:
+            self._discovery_dir.cleanup()
+            self._discovery_dir = None
@@ -0,0 +1,77 @@
+from src.utils.logging_util import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_PAGE_SIZE = 500
+
+
+def iter_pages(list_func, *args, page_size=DEFAULT_PAGE_SIZE, **kwargs):
+    """
+    Yield the pages of a list call, following `continue` tokens.
+
+    Only one page of objects is held in memory at a time. All pages are served
+    from the same consistent snapshot (the resourceVersion of the first page).
+
+    Args:
+        list_func (callable): List function of a Kubernetes API client (e.g. `CoreV1Api.list_node`).
+        *args: Positional arguments passed to `list_func`.
+        page_size (int): Maximum number of objects per page.
+        **kwargs: Keyword arguments passed to `list_func` (e.g. label_selector).
+
+    Yields:
+        object: Each list response (e.g. V1NodeList).
+    """
+    continue_token = None
+    pages = 0
+    while True:
+        if continue_token:
+            kwargs["_continue"] = continue_token
+        page = list_func(*args, limit=page_size, **kwargs)
+        pages += 1
+        yield page
+        continue_token = page.metadata._continue
+        if not continue_token:
+            break
+    logger.debug("%s returned %s page(s).", list_func.__name__, pages)
+
+
+def iter_items(list_func, *args, page_size=DEFAULT_PAGE_SIZE, **kwargs):
+    """
+    Yield the objects of a list call one at a time, paging with limit/continue.
+
+    Args:
+        list_func (callable): List function of a Kubernetes API client.
+        *args: Positional arguments passed to `list_func`.
+        page_size (int): Maximum number of objects per page.
+        **kwargs: Keyword arguments passed to `list_func`.
+
+    Yields:
+        object: Each listed object.
+    """
+    for page in iter_pages(list_func, *args, page_size=page_size, **kwargs):
+        yield from page.items
+
+
+def iter_pods(core_api, namespace=None, label_selector=None, field_selector=None, page_size=DEFAULT_PAGE_SIZE):
+    """
+    Yield pods matching the selectors one at a time.
+
+    Args:
+        core_api (CoreV1Api): CoreV1Api client.
+        namespace (str): Namespace to list; all namespaces if None.
+        label_selector (str): Label selector (e.g. "app=date-logger").
+        field_selector (str): Field selector (e.g. "status.phase=Running").
+        page_size (int): Maximum number of pods per page.
+
+    Yields:
+        V1Pod: Each matching pod.
+    """
+    kwargs = {}
+    if label_selector:
+        kwargs["label_selector"] = label_selector
+    if field_selector:
+        kwargs["field_selector"] = field_selector
+    if namespace:
+        yield from iter_items(core_api.list_namespaced_pod, namespace, page_size=page_size, **kwargs)
+    else:
+        yield from iter_items(core_api.list_pod_for_all_namespaces, page_size=page_size, **kwargs)
@@ -0,0 +1,352 @@
+import argparse
+import copy
+import csv
+import multiprocessing
+import os
+import queue
+import sys
+import time
+import numpy as np
+import yaml
+from src.utils.config_util import get_settings
+from src.utils.k8s_client import KubernetesClient
+from src.utils.list_util import iter_pods
+from src.utils.logging_util import get_logger
+from src.utils.manifests import ManifestApplier
+from src.utils.pod_lifecycle import PodLifecycleCollector
+from src.utils.results_store import ResultsStore, cluster_name, git_sha
+from src.utils.waiter import deployment_scaled_to, wait_for_deployment
+
+logger = get_logger(__name__)
+
+PERCENTILES = (50, 90, 99)
+LATENCY_STAGES = ("scheduled", "ready")
+
+
+def shard_manifests(manifest, shards, namespace_prefix):
+    """
+    Clone a Deployment manifest into one copy per shard namespace.
+
+    Args:
+        manifest (dict): The Deployment manifest (e.g. from k8s_manifests/scale-test.yaml).
+        shards (int): Number of shards.
+        namespace_prefix (str): Shard i is placed in namespace "<prefix>-<i>".
+
+    Returns:
+        list: One manifest per shard.
+    """
+    clones = []
+    for shard in range(shards):
+        clone = copy.deepcopy(manifest)
+        clone["metadata"]["namespace"] = f"{namespace_prefix}-{shard}"
+        clones.append(clone)
+    return clones
+
+
+def load_deployment(path):
+    """
+    Return the first Deployment of a manifest file.
+
+    Args:
+        path (str): YAML file, e.g. k8s_manifests/scale-test.yaml.
+
+    Returns:
+        dict: The Deployment manifest.
+
+    Raises:
+        ValueError: If the file holds no Deployment.
+    """
+    with open(path) as file:
+        for manifest in yaml.safe_load_all(file):
+            if manifest and manifest.get("kind") == "Deployment":
+                return manifest
+    raise ValueError(f"No Deployment in {path}.")
+
+
+def _run_shard(shard, manifest, replicas, start_barrier, start_delay, timeout, fake_url, teardown, results):
+    """
+    Worker process: create the shard, wait for every other worker, scale up and report.
+    """
+    metadata = manifest["metadata"]
+    name, namespace = metadata["name"], metadata["namespace"]
+    result = {"shard": shard, "namespace": namespace, "replicas": replicas, "error": None}
+    k8s = None
+    applier = None
+    try:
+        k8s = KubernetesClient(fake_url=fake_url, record="")
+        settings = k8s.settings
+        apps_api = k8s.get_client("AppsV1Api")
+        core_api = k8s.get_client("CoreV1Api")
+        applier = ManifestApplier(
+            k8s.get_dynamic_client(), apps_api, [manifest], field_manager=settings.manifests.field_manager
+        )
+        applier.apply()
+        applier.wait_ready(timeout)
+        selector = ",".join(f"{key}={value}" for key, value in manifest["spec"]["selector"]["matchLabels"].items())
+        existing = {pod.metadata.name for pod in iter_pods(core_api, namespace, label_selector=selector)}
+        result["existing"] = len(existing)
+
+        start_barrier.wait(timeout)
+        time.sleep(start_delay)
+        result["started"] = time.time()
+        apps_api.patch_namespaced_deployment_scale(name=name, namespace=namespace, body={"spec": {"replicas": replicas}})
+        _, result["scale_up_seconds"] = wait_for_deployment(
+            apps_api, name, namespace, deployment_scaled_to(replicas), timeout, fast_decode=k8s.fast_decode
+        )
+        result["finished"] = time.time()
+
+        pods = [pod for pod in iter_pods(core_api, namespace, label_selector=selector) if pod.metadata.name not in existing]
+        collector = PodLifecycleCollector(pods)
+        result["pods"] = len(collector)
+        for stage in LATENCY_STAGES:
+            result[stage] = collector.latencies(stage)
+        result["api"] = k8s.throttle_stats.as_dict()
+    except Exception as e:
+        logger.exception("Load shard %s failed: %s", namespace, e)
+        result["error"] = f"{type(e).__name__}: {e}"
+        # Release the other workers instead of letting them wait for this one.
+        start_barrier.abort()
+    finally:
+        results.put(result)
+        try:
+            if applier is not None and teardown:
+                applier.delete()
+        finally:
+            if k8s is not None:
+                k8s.close()
+
+
+class LoadDriver:
+    """
+    Namespace-sharded load generator: one worker process per shard, each with its own
+    KubernetesClient (and rate limiter), namespace and clone of the deployment manifest.
+
+    Workers create their shard, wait until all shards exist and then scale up together
+    (or `stagger` seconds apart). Their per-pod latencies are sent back and merged, so
+    the percentiles describe the control plane under concurrent scaling.
+    """
+
+    def __init__(self, manifest, workers, replicas, stagger=0.0, timeout=600, namespace_prefix="scale-test-shard",
+                 fake_url=None, teardown=True):
+        """
+        Initializes the driver.
+
+        Args:
+            manifest (dict): Deployment manifest cloned into every shard.
+            workers (int): Number of worker processes (and shards).
+            replicas (int): Replica count every shard scales to.
+            stagger (float): Seconds between the start of consecutive workers (0 = all at once).
+            timeout (float): Maximum time for each wait in seconds.
+            namespace_prefix (str): Shard namespaces are "<prefix>-<i>".
+            fake_url (str): URL of the parent's FakeApiServer when config_mode is "fake".
+            teardown (bool): Delete the shard deployments when the workers finish.
+        """
+        self.manifests = shard_manifests(manifest, workers, namespace_prefix)
+        self.replicas = replicas
+        self.stagger = stagger
+        self.timeout = timeout
+        self.fake_url = fake_url
+        self.teardown = teardown
+        self.shards = []
+
+    def run(self):
+        """
+        Start the workers, wait for all of them and collect their results.
+
+        Returns:
+            list: One result dict per shard, ordered by shard index.
+        """
+        # Spawned workers start without the parent's threads (informers, fake server, logging).
+        context = multiprocessing.get_context("spawn")
+        start_barrier = context.Barrier(len(self.manifests))
+        results = context.Queue()
+        processes = [
+            context.Process(
+                target=_run_shard,
+                args=(shard, manifest, self.replicas, start_barrier, shard * self.stagger, self.timeout,
+                      self.fake_url, self.teardown, results),
+                name=f"load-shard-{shard}",
+            )
+            for shard, manifest in enumerate(self.manifests)
+        ]
+        logger.info(
+            "Starting %s load workers scaling to %s replicas each (stagger %.1fs).",
+            len(processes), self.replicas, self.stagger,
+        )
+        for process in processes:
+            process.start()
+        shards = []
+        # Drain the queue before joining: a worker exits only once its result has been read.
+        while len(shards) < len(processes):
+            try:
+                shards.append(results.get(timeout=1))
+            except queue.Empty:
+                if not any(process.is_alive() for process in processes):
+                    break
+        for process in processes:
+            process.join()
+        reported = {result["shard"] for result in shards}
+        for shard, process in enumerate(processes):
+            if shard not in reported:
+                shards.append({
+                    "shard": shard,
+                    "namespace": self.manifests[shard]["metadata"]["namespace"],
+                    "replicas": self.replicas,
+                    "error": f"worker exited with code {process.exitcode} without a result",
+                })
+        self.shards = sorted(shards, key=lambda result: result["shard"])
+        return self.shards
+
+    def summary(self):
+        """
+        Merge the shards' results.
+
+        Returns:
+            dict: Shard, error and pod counts, aggregate pods per second from the first
+            scale request to the last shard becoming available, the slowest shard's
+            scale-up time, and p50/p90/p99/max of the merged per-pod latencies.
+        """
+        done = [result for result in self.shards if not result["error"]]
+        pods = sum(result["pods"] for result in done)
+        elapsed = max(r["finished"] for r in done) - min(r["started"] for r in done) if done else 0.0
+        summary = {
+            "shards": len(self.shards),
+            "errors": len(self.shards) - len(done),
+            "pods": pods,
+            "elapsed_seconds": elapsed,
+            "pods_per_second": pods / elapsed if elapsed else None,
+            "scale_up_max_seconds": max((result["scale_up_seconds"] for result in done), default=None),
+        }
+        for stage in LATENCY_STAGES:
+            latencies = np.concatenate([result[stage] for result in done]) if done else np.empty(0)
+            latencies = latencies[~np.isnan(latencies)]
+            if latencies.size:
+                values = np.percentile(latencies, PERCENTILES)
+                summary.update({f"{stage}_p{p}": float(v) for p, v in zip(PERCENTILES, values)})
+                summary[f"{stage}_max"] = float(latencies.max())
+            else:
+                summary.update({f"{stage}_p{p}": None for p in PERCENTILES})
+                summary[f"{stage}_max"] = None
+        for name in ("requests", "retries", "throttled_responses", "throttled_seconds"):
+            summary[f"api_{name}"] = sum(result["api"][name] for result in done)
+        return summary
+
+    def format_summary(self):
+        """
+        Render the merged summary and one line per shard as text.
+        """
+        summary = self.summary()
+
+        def seconds(value):
+            return f"{value:.1f}s" if value is not None else "-"
+
+        lines = [
+            f"shards: {summary['shards']} (errors: {summary['errors']}), {summary['pods']} pods "
+            f"in {summary['elapsed_seconds']:.1f}s ({summary['pods_per_second'] or 0:.1f} pods/s)",
+            f"api: {summary['api_requests']} requests, {summary['api_throttled_responses']} throttled, "
+            f"{summary['api_throttled_seconds']:.1f}s waiting",
+        ]
+        for stage in LATENCY_STAGES:
+            lines.append(
+                f"{stage}: "
+                + ", ".join(f"p{p} {seconds(summary[f'{stage}_p{p}'])}" for p in PERCENTILES)
+                + f", max {seconds(summary[f'{stage}_max'])}"
+            )
+        for result in self.shards:
+            if result["error"]:
+                lines.append(f"{result['namespace']}: {result['error']}")
+            else:
+                lines.append(
+                    f"{result['namespace']}: {result['pods']} pods available in {result['scale_up_seconds']:.1f}s"
+                )
+        return "\n".join(lines)
+
+    def metrics(self):
+        """
+        Results-store metrics of the merged distributions and the aggregate pod rate.
+        """
+        summary = self.summary()
+        metrics = {
+            "load_shards_count": summary["shards"],
+            "load_shard_errors": summary["errors"],
+            "load_pods_count": summary["pods"],
+            "load_pods_per_second": summary["pods_per_second"],
+            "load_scale_up_max_seconds": summary["scale_up_max_seconds"],
+        }
+        for stage in LATENCY_STAGES:
+            for p in PERCENTILES:
+                metrics[f"load_pod_{stage}_p{p}_seconds"] = summary[f"{stage}_p{p}"]
+        for name in ("requests", "retries", "throttled_responses", "throttled_seconds"):
+            metrics[f"load_api_{name}"] = summary[f"api_{name}"]
+        return metrics
+
+    def write_report(self, output_dir):
+        """
+        Write the summary and a per-shard CSV into `output_dir`.
+
+        Args:
+            output_dir (str): Directory for this run's results.
+
+        Returns:
+            str: The formatted summary.
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        text = self.format_summary()
+        with open(os.path.join(output_dir, "load_summary.txt"), "w") as file:
+            file.write(text + "\n")
+        with open(os.path.join(output_dir, "load_shards.csv"), "w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(["shard", "namespace", "pods", "started", "scale_up_seconds", "ready_p99_seconds", "error"])
+            for result in self.shards:
+                ready = result.get("ready")
+                ready = ready[~np.isnan(ready)] if ready is not None else np.empty(0)
+                writer.writerow([
+                    result["shard"],
+                    result["namespace"],
+                    result.get("pods", ""),
+                    f"{result['started']:.3f}" if "started" in result else "",
+                    f"{result['scale_up_seconds']:.3f}" if "scale_up_seconds" in result else "",
+                    f"{np.percentile(ready, 99):.3f}" if ready.size else "",
+                    result["error"] or "",
+                ])
+        return text
+
+
+def main(argv=None):
+    settings = get_settings()
+    load = settings.load
+    parser = argparse.ArgumentParser(prog="python -m src.utils.load_driver")
+    parser.add_argument("--workers", type=int, default=load.workers, help="Worker processes (one shard each).")
+    parser.add_argument("--replicas", type=int, default=load.replicas, help="Replicas per shard.")
+    parser.add_argument("--stagger", type=float, default=load.stagger, help="Seconds between worker starts.")
+    parser.add_argument("--timeout", type=float, default=settings.scaling.timeout)
+    parser.add_argument("--manifest", default=load.manifest, help="Deployment manifest cloned into every shard.")
+    parser.add_argument("--record", action="store_true", help="Record the metrics as a run in the results store.")
+    args = parser.parse_args(argv)
+
+    # The parent only serves the fake cluster (if any) and merges results; workers bring their own clients.
+    k8s = KubernetesClient()
+    try:
+        fake_url = k8s.fake_server.url if k8s.fake_server is not None else None
+        manifest = load_deployment(args.manifest)
+        driver = LoadDriver(
+            manifest, args.workers, args.replicas, stagger=args.stagger, timeout=args.timeout,
+            namespace_prefix=load.namespace_prefix, fake_url=fake_url, teardown=load.teardown,
+        )
+        driver.run()
+        print(driver.write_report(os.path.join(settings.metrics.output_dir, "load_driver")))
+        if args.record:
+            store = ResultsStore(settings.metrics.results_db)
+            try:
+                run_id = store.start_run(cluster_name(settings), git_sha(), settings.k8s.config_mode)
+                store.record(run_id, f"load_driver[{args.workers}x{args.replicas}]", driver.metrics())
+                print(f"Recorded as run {run_id}.")
+            finally:
+                store.close()
+        return 1 if driver.summary()["errors"] else 0
+    finally:
+        k8s.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,279 @@
+import csv
+import os
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from urllib3.exceptions import ProtocolError, ReadTimeoutError
+from src.utils.logging_util import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+PERCENTILES = (50, 90, 99)
+
+
+class PodLogStats:
+    """
+    Ingest counters of one followed pod log stream. Times are epoch seconds.
+    """
+
+    __slots__ = ("pod", "bytes", "lines", "started", "first_byte", "last_byte", "finished", "error")
+
+    def __init__(self, pod):
+        self.pod = pod
+        self.bytes = 0
+        self.lines = 0
+        self.started = None
+        self.first_byte = None
+        self.last_byte = None
+        self.finished = None
+        self.error = None
+
+    @property
+    def first_byte_latency(self):
+        return self.first_byte - self.started if self.first_byte is not None else None
+
+    @property
+    def throughput(self):
+        """
+        Bytes per second from the first to the last byte received (idle time is not counted).
+        """
+        if self.first_byte is None or self.last_byte <= self.first_byte:
+            return None
+        return self.bytes / (self.last_byte - self.first_byte)
+
+
+def _shutdown(response):
+    # Unblock a read in another thread; closing the response would wait for that thread's lock.
+    sock = getattr(getattr(response, "connection", None), "sock", None)
+    if sock is not None:
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+
+def stream_pod_log(core_api, name, namespace, duration, idle_timeout, container=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Follow a pod's log and count its bytes and lines chunk by chunk, without buffering it.
+
+    The stream ends after `duration` seconds, after `idle_timeout` seconds without
+    data, or when the server closes it.
+
+    Args:
+        core_api (CoreV1Api): API client used to read the log.
+        name (str): Pod name.
+        namespace (str): Pod namespace.
+        duration (float): Maximum time to follow the log in seconds.
+        idle_timeout (float): End the stream after this many seconds without data.
+        container (str): Container to read (required for multi-container pods).
+        chunk_size (int): Maximum bytes read per chunk.
+
+    Returns:
+        PodLogStats: The ingest counters of the stream.
+    """
+    stats = PodLogStats(name)
+    kwargs = {"container": container} if container else {}
+    stats.started = time.time()
+    deadline = time.monotonic() + duration
+    response = None
+    timer = None
+    try:
+        response = core_api.read_namespaced_pod_log(
+            name,
+            namespace,
+            follow=True,
+            _preload_content=False,
+            _request_timeout=(10, min(idle_timeout, duration)),
+            **kwargs,
+        )
+        # A busy stream never hits the read timeout, so end it at the deadline from outside.
+        timer = threading.Timer(duration, _shutdown, args=(response,))
+        timer.daemon = True
+        timer.start()
+        for chunk in response.stream(chunk_size, decode_content=False):
+            stats.last_byte = time.time()
+            if stats.first_byte is None:
+                stats.first_byte = stats.last_byte
+            stats.bytes += len(chunk)
+            stats.lines += chunk.count(b"\n")
+            if time.monotonic() >= deadline:
+                break
+    except ReadTimeoutError:
+        pass  # Idle past idle_timeout.
+    except ProtocolError as e:
+        # The deadline timer shuts the socket down, which surfaces as a broken stream; any
+        # other broken stream is a real reset.
+        if time.monotonic() < deadline:
+            stats.error = str(e)
+            logger.warning("Log stream of pod %s/%s was reset: %s", namespace, name, e)
+    except Exception as e:
+        stats.error = str(e)
+        logger.warning("Log stream of pod %s/%s failed: %s", namespace, name, e)
+    finally:
+        stats.finished = time.time()
+        if timer is not None:
+            timer.cancel()
+        if response is not None:
+            response.release_conn()
+    return stats
+
+
+class LogThroughputCollector:
+    """
+    Streams the logs of many pods concurrently and summarizes per-pod and total ingest
+    throughput, line rate and first-byte latency.
+    """
+
+    def __init__(self, core_api, namespace, max_workers=64, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Initializes the collector.
+
+        Args:
+            core_api (CoreV1Api): API client used to read the logs.
+            namespace (str): Namespace of the pods.
+            max_workers (int): Maximum number of concurrent log streams.
+            chunk_size (int): Maximum bytes read per chunk.
+        """
+        self.core_api = core_api
+        self.namespace = namespace
+        self.max_workers = max_workers
+        self.chunk_size = chunk_size
+        self.stats = []
+        self.started = None
+        self.finished = None
+
+    def run(self, pod_names, duration, idle_timeout, container=None):
+        """
+        Follow the logs of all pods at once.
+
+        Args:
+            pod_names (list): Names of the pods to stream.
+            duration (float): Maximum time to follow each log in seconds.
+            idle_timeout (float): End a stream after this many seconds without data.
+            container (str): Container to read (required for multi-container pods).
+
+        Returns:
+            list: PodLogStats of every pod.
+        """
+        workers = max(1, min(self.max_workers, len(pod_names)))
+        logger.info("Streaming logs of %s pods with %s concurrent readers.", len(pod_names), workers)
+        self.started = time.time()
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pod-log") as executor:
+            futures = [
+                executor.submit(
+                    stream_pod_log, self.core_api, name, self.namespace, duration, idle_timeout, container, self.chunk_size
+                )
+                for name in pod_names
+            ]
+            self.stats = [future.result() for future in futures]
+        self.finished = time.time()
+        return self.stats
+
+    def summary(self):
+        """
+        Summarize the streams.
+
+        Returns:
+            dict: Pod and error counts, total bytes and lines, aggregate bytes/lines per
+            second from the first to the last byte of any stream, and p50/p90/p99/max of
+            per-pod throughput and first-byte latency.
+        """
+        total_bytes = sum(stats.bytes for stats in self.stats)
+        total_lines = sum(stats.lines for stats in self.stats)
+        received = [stats for stats in self.stats if stats.first_byte is not None]
+        elapsed = (
+            max(stats.last_byte for stats in received) - min(stats.first_byte for stats in received) if received else 0.0
+        )
+        summary = {
+            "pods": len(self.stats),
+            "errors": sum(1 for stats in self.stats if stats.error),
+            "bytes": total_bytes,
+            "lines": total_lines,
+            "elapsed_seconds": elapsed,
+            "bytes_per_second": total_bytes / elapsed if elapsed else None,
+            "lines_per_second": total_lines / elapsed if elapsed else None,
+        }
+        for name, values in (
+            ("pod_bytes_per_second", [stats.throughput for stats in self.stats]),
+            ("first_byte_seconds", [stats.first_byte_latency for stats in self.stats]),
+        ):
+            values = np.array([value for value in values if value is not None], dtype=np.float64)
+            if values.size:
+                summary.update(
+                    {f"{name}_p{p}": float(v) for p, v in zip(PERCENTILES, np.percentile(values, PERCENTILES))}
+                )
+                summary[f"{name}_max"] = float(values.max())
+            else:
+                summary.update({f"{name}_p{p}": None for p in PERCENTILES})
+                summary[f"{name}_max"] = None
+        return summary
+
+    def format_summary(self):
+        """
+        Render the totals and per-pod distributions as text.
+        """
+        summary = self.summary()
+        mib = 1024 * 1024
+
+        def seconds(value):
+            return f"{value:.3f}s" if value is not None else "-"
+
+        def rate(value):
+            return f"{value / mib:.2f} MiB/s" if value is not None else "-"
+
+        lines = [
+            f"pods: {summary['pods']} (errors: {summary['errors']}), ingest window {summary['elapsed_seconds']:.1f}s",
+            f"total: {summary['bytes'] / mib:.1f} MiB, {summary['lines']} lines, "
+            f"{rate(summary['bytes_per_second'])}, "
+            f"{summary['lines_per_second'] or 0:.0f} lines/s",
+            "per pod throughput: "
+            + ", ".join(f"p{p} {rate(summary[f'pod_bytes_per_second_p{p}'])}" for p in PERCENTILES)
+            + f", max {rate(summary['pod_bytes_per_second_max'])}",
+            "first byte latency: "
+            + ", ".join(f"p{p} {seconds(summary[f'first_byte_seconds_p{p}'])}" for p in PERCENTILES)
+            + f", max {seconds(summary['first_byte_seconds_max'])}",
+        ]
+        return "\n".join(lines)
+
+    def metrics(self):
+        """
+        Results-store metrics: first-byte latency percentiles and aggregate throughput.
+        """
+        summary = self.summary()
+        metrics = {"log_streams_count": summary["pods"], "log_stream_errors": summary["errors"]}
+        metrics.update({f"log_first_byte_p{p}_seconds": summary[f"first_byte_seconds_p{p}"] for p in PERCENTILES})
+        metrics["log_bytes_per_second"] = summary["bytes_per_second"]
+        metrics["log_lines_per_second"] = summary["lines_per_second"]
+        return metrics
+
+    def write_report(self, output_dir):
+        """
+        Write the summary and a per-pod CSV into `output_dir`.
+
+        Args:
+            output_dir (str): Directory for this scenario's results.
+
+        Returns:
+            str: The formatted summary.
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        text = self.format_summary()
+        with open(os.path.join(output_dir, "log_throughput_summary.txt"), "w") as file:
+            file.write(text + "\n")
+        with open(os.path.join(output_dir, "log_throughput.csv"), "w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(["pod", "bytes", "lines", "first_byte_seconds", "bytes_per_second", "error"])
+            for stats in self.stats:
+                writer.writerow([
+                    stats.pod,
+                    stats.bytes,
+                    stats.lines,
+                    f"{stats.first_byte_latency:.3f}" if stats.first_byte_latency is not None else "",
+                    f"{stats.throughput:.0f}" if stats.throughput is not None else "",
+                    stats.error or "",
+                ])
+        logger.info("Log throughput of %s pods written to %s.", len(self.stats), output_dir)
+        return text
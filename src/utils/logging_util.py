@@ -1,49 +1,168 @@
+import atexit
+import copy
+import json
 import logging
-import tomli  # For parsing TOML configuration files
+import logging.handlers
+import queue
+import threading
+from src.utils.config_util import get_settings
 
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+# Fields describing the current run and scenario, attached to every record (see set_log_context).
+CONTEXT_FIELDS = ("run_id", "scenario")
 
-def load_logging_config(config_file="config/settings.toml"):
+_log_context = dict.fromkeys(CONTEXT_FIELDS)
+_listener = None
+_queue_handler = None
+_log_level = logging.INFO
+_configure_lock = threading.Lock()
+
+
+def load_logging_config(config_file=None):
     """
-    Load the logging configuration from a TOML file.
+    Return the log level configured in the `[logging]` section of the settings.
 
     Args:
-        config_file (str): Path to the configuration file.
+        config_file (str): Path to the configuration file (defaults to the shared settings).
 
     Returns:
         str: The log level specified in the configuration file.
     """
     try:
-        with open(config_file, "rb") as file:
-            config = tomli.load(file)
-        return config.get("logging", {}).get("level", "INFO")  # Default to INFO
+        return get_settings(config_file).logging.log_level
     except Exception as e:
         print(f"Failed to load logging configuration: {e}")
         return "INFO"  # Fallback to INFO if config fails
 
 
-def get_logger(name: str, config_file="config/settings.toml"):
+def set_log_context(**fields):
+    """
+    Set the run/scenario identifiers attached to every subsequent log record
+    (e.g. `set_log_context(scenario=None)` clears the scenario).
+    """
+    unknown = set(fields) - set(CONTEXT_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown log context fields: {', '.join(sorted(unknown))}")
+    _log_context.update(fields)
+
+
+class _ContextFilter(logging.Filter):
+    """
+    Stamp records with the current log context when they are enqueued.
+    """
+
+    def filter(self, record):
+        for name, value in _log_context.items():
+            setattr(record, name, value)
+        return True
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that enqueues records with their message resolved but not formatted.
+
+    `msg % args` and the traceback are rendered in the calling thread, so a mutable
+    argument is logged as it was at the call and no traceback frames are kept alive in
+    the queue. Unlike the stock handler, the formatter (text or JSON) still runs on the
+    listener thread, so the caller does not pay for timestamps and layout.
+    """
+
+    _exception_formatter = logging.Formatter()
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = self._exception_formatter.formatException(record.exc_info)
+        record.exc_info = None
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Format records as one JSON object per line, including the run and scenario IDs.
     """
-    Returns a logger instance with a consistent format.
+
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "thread": record.threadName,
+        }
+        for name in CONTEXT_FIELDS:
+            entry[name] = getattr(record, name, None)
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+def configure_logging(config_file=None):
+    """
+    Install the logging pipeline once per process: a single QueueHandler on the root
+    logger feeding a QueueListener thread that owns the only StreamHandler. Callers
+    never block on terminal or file I/O. Repeated calls are no-ops.
+
+    Args:
+        config_file (str): Path to the configuration file (defaults to the shared settings).
+    """
+    global _listener, _queue_handler, _log_level
+    with _configure_lock:
+        if _listener is not None:
+            return
+        settings = get_settings(config_file).logging
+        _log_level = getattr(logging, load_logging_config(config_file).upper(), logging.INFO)
+
+        stream_handler = logging.StreamHandler()
+        if settings.format == "json":
+            stream_handler.setFormatter(JsonFormatter())
+        else:
+            stream_handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+
+        _queue_handler = _DeferredQueueHandler(queue.SimpleQueue())
+        _queue_handler.addFilter(_ContextFilter())
+        logging.getLogger().addHandler(_queue_handler)
+        # Modules under src/ share the configured level, including those not created via get_logger.
+        logging.getLogger("src").setLevel(_log_level)
+
+        _listener = logging.handlers.QueueListener(_queue_handler.queue, stream_handler, respect_handler_level=True)
+        _listener.start()
+        atexit.register(shutdown_logging)
+
+
+def shutdown_logging():
+    """
+    Flush queued records and stop the listener thread.
+    """
+    global _listener, _queue_handler
+    with _configure_lock:
+        if _listener is None:
+            return
+        _listener.stop()
+        logging.getLogger().removeHandler(_queue_handler)
+        _listener = None
+        _queue_handler = None
+
+
+def get_logger(name: str, config_file=None):
+    """
+    Returns a logger at the configured level that propagates to the shared queue handler.
+
+    Log with %-style arguments (`logger.debug("Took %.3fs", elapsed)`) rather than
+    f-strings, so nothing is formatted when the level is disabled.
 
     Args:
         name (str): The name of the logger.
-        config_file (str): Path to the configuration file.
+        config_file (str): Path to the configuration file (defaults to the shared settings).
 
     Returns:
         logging.Logger: Configured logger instance.
     """
+    configure_logging(config_file)
     logger = logging.getLogger(name)
-    if not logger.hasHandlers():
-        # Load log level from configuration
-        log_level_str = load_logging_config(config_file)
-        log_level = getattr(logging, log_level_str.upper(), logging.INFO)
-
-        # Set logging level and format
-        logger.setLevel(log_level)
-        console_handler = logging.StreamHandler()
-        console_formatter = logging.Formatter(
-            '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-        )
-        console_handler.setFormatter(console_formatter)
-        logger.addHandler(console_handler)
+    logger.setLevel(_log_level)
     return logger
@@ -0,0 +1,240 @@
+import csv
+import os
+import threading
+import time
+import numpy as np
+from src.utils.logging_util import get_logger
+from src.utils.records import GKE_NODEPOOL_LABEL, MACHINE_FAMILY_LABEL, SPOT_LABEL, NodeRecord, PodRecord
+
+logger = get_logger(__name__)
+
+PROVISIONING_LABEL = "cloud.google.com/gke-provisioning"
+PERCENTILES = (50, 90, 99)
+
+
+def _node_times(node):
+    """
+    Return (name, labels, created, ready) of a V1Node or NodeRecord, times as epoch seconds.
+    """
+    if isinstance(node, NodeRecord):
+        return node.name, node.labels, node.created, node.ready
+    ready = None
+    for condition in (node.status.conditions if node.status else None) or []:
+        if condition.type == "Ready" and condition.status == "True" and condition.last_transition_time:
+            ready = condition.last_transition_time.timestamp()
+    created = node.metadata.creation_timestamp
+    return node.metadata.name, node.metadata.labels or {}, created.timestamp() if created else None, ready
+
+
+def _is_unscheduled(pod):
+    """
+    Return True if a V1Pod or PodRecord is not bound to a node yet and is not being deleted.
+    """
+    if isinstance(pod, PodRecord):
+        return pod.node_name is None and pod.deleted is None
+    return not (pod.spec and pod.spec.node_name) and pod.metadata.deletion_timestamp is None
+
+
+def _is_spot(labels):
+    return labels.get(SPOT_LABEL) == "true" or labels.get(PROVISIONING_LABEL) == "spot"
+
+
+class NodeProvisioningTracker:
+    """
+    Tracks nodes created after a scale operation and their creation -> Ready latency,
+    grouped by machine family, spot vs on-demand and node pool.
+
+    Nodes present when the tracker is created are recorded as pre-existing and excluded.
+    New nodes are observed through the node informer's event handler, so a node removed
+    by the autoscaler later in the run is still reported. Call `stop` to detach the
+    handlers from the shared informers.
+    """
+
+    def __init__(self, node_informer, pod_informer, deployment_name, replicas):
+        """
+        Snapshot the current nodes and start observing new ones.
+
+        Args:
+            node_informer (Informer): The shared node informer.
+            pod_informer (Informer): The shared pod informer, indexed by owner deployment.
+            deployment_name (str): Deployment being scaled.
+            replicas (int): Replica count the deployment is scaled to.
+        """
+        self.informer = node_informer
+        self.pod_informer = pod_informer
+        self.deployment_name = deployment_name
+        self.replicas = replicas
+        self.started = time.time()
+        self.preexisting = {node_informer.key_func(node) for node in node_informer.list()}
+        self.nodes = {}  # name -> (labels, created, ready)
+        self._lock = threading.Lock()
+        self._changed = threading.Event()
+        node_informer.add_handler(self._observe)
+        pod_informer.add_handler(self._observe_pod)
+        for node in node_informer.list():
+            self._observe("ADDED", node)
+        logger.info("Tracking new nodes; %s nodes existed before the scale operation.", len(self.preexisting))
+
+    def stop(self):
+        """
+        Detach from the informers. The nodes observed so far are kept for the report.
+        """
+        self.informer.remove_handler(self._observe)
+        self.pod_informer.remove_handler(self._observe_pod)
+
+    def _observe(self, event_type, node):
+        name, labels, created, ready = _node_times(node)
+        if name in self.preexisting or event_type == "DELETED":
+            return
+        with self._lock:
+            previous = self.nodes.get(name)
+            # Keep the first Ready time seen; a node flapping later does not reset it.
+            if previous is not None and previous[2] is not None:
+                ready = previous[2]
+            self.nodes[name] = (labels, created, ready)
+        self._changed.set()
+
+    def _observe_pod(self, event_type, pod):
+        self._changed.set()
+
+    def all_new_nodes_ready(self):
+        """
+        Return True once every pod of the deployment is bound to a node and every new node
+        is Ready. No new nodes is a valid outcome when the existing nodes had room.
+        """
+        pods = self.pod_informer.by_index("owner_deployment", self.deployment_name)
+        if len(pods) < self.replicas or any(_is_unscheduled(pod) for pod in pods):
+            return False
+        with self._lock:
+            return all(ready is not None for _, _, ready in self.nodes.values())
+
+    def wait_for_new_nodes_ready(self, timeout):
+        """
+        Block until the scale operation needs no further nodes and all new nodes are Ready.
+
+        Args:
+            timeout (float): Maximum time to wait in seconds.
+
+        Returns:
+            float: Elapsed time in seconds, or None if the timeout expired.
+        """
+        start_time = time.monotonic()
+        deadline = start_time + timeout
+        while True:
+            # Cleared before the check so a delta applied during it wakes the next wait.
+            self._changed.clear()
+            if self.all_new_nodes_ready():
+                return time.monotonic() - start_time
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            self._changed.wait(remaining)
+
+    def groups(self):
+        """
+        Group new nodes by (machine family, "spot"/"on-demand", node pool).
+
+        Returns:
+            dict: Group key mapped to a float64 array of creation -> Ready latencies
+            (NaN for nodes that are not Ready yet).
+        """
+        grouped = {}
+        with self._lock:
+            for labels, created, ready in self.nodes.values():
+                key = (
+                    labels.get(MACHINE_FAMILY_LABEL, "unknown"),
+                    "spot" if _is_spot(labels) else "on-demand",
+                    labels.get(GKE_NODEPOOL_LABEL, "unknown"),
+                )
+                latency = ready - created if ready is not None and created is not None else np.nan
+                grouped.setdefault(key, []).append(latency)
+        return {key: np.array(values, dtype=np.float64) for key, values in grouped.items()}
+
+    def summary(self):
+        """
+        Summarize node provisioning latency per group.
+
+        Returns:
+            list: One dict per group with machine_family, capacity, node_pool, count,
+            ready, p50, p90, p99 and max (seconds, None when no node is Ready).
+        """
+        rows = []
+        for (family, capacity, pool), latencies in sorted(self.groups().items()):
+            ready = latencies[~np.isnan(latencies)]
+            row = {
+                "machine_family": family,
+                "capacity": capacity,
+                "node_pool": pool,
+                "count": int(latencies.size),
+                "ready": int(ready.size),
+            }
+            if ready.size:
+                row.update({f"p{p}": float(v) for p, v in zip(PERCENTILES, np.percentile(ready, PERCENTILES))})
+                row["max"] = float(ready.max())
+            else:
+                row.update({f"p{p}": None for p in PERCENTILES})
+                row["max"] = None
+            rows.append(row)
+        return rows
+
+    def metrics(self):
+        """
+        Results-store metrics over all new nodes: count and creation -> Ready percentiles.
+        """
+        latencies = np.concatenate(list(self.groups().values()) or [np.empty(0)])
+        ready = latencies[~np.isnan(latencies)]
+        metrics = {"new_nodes_count": int(latencies.size), "new_nodes_ready_count": int(ready.size)}
+        if ready.size:
+            values = np.percentile(ready, PERCENTILES)
+            metrics.update({f"node_ready_p{p}_seconds": float(v) for p, v in zip(PERCENTILES, values)})
+            metrics["node_ready_max_seconds"] = float(ready.max())
+        return metrics
+
+    def format_summary(self):
+        """
+        Render the per-group summary as a fixed-width text table.
+        """
+        columns = [f"p{p}" for p in PERCENTILES] + ["max"]
+        lines = [
+            f"{'machine_family':<16}{'capacity':<11}{'node_pool':<32}{'count':>7}{'ready':>7}"
+            + "".join(f"{column:>9}" for column in columns)
+        ]
+        for row in self.summary():
+            cells = "".join(
+                f"{row[column]:>8.1f}s" if row[column] is not None else f"{'-':>9}" for column in columns
+            )
+            lines.append(
+                f"{row['machine_family']:<16}{row['capacity']:<11}{row['node_pool']:<32}"
+                f"{row['count']:>7}{row['ready']:>7}{cells}"
+            )
+        return "\n".join(lines)
+
+    def write_report(self, output_dir):
+        """
+        Write the per-group summary and a raw per-node CSV into `output_dir`.
+
+        Args:
+            output_dir (str): Directory for this scenario's results.
+
+        Returns:
+            str: The formatted summary table.
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        table = self.format_summary()
+        with open(os.path.join(output_dir, "node_provisioning_summary.txt"), "w") as file:
+            file.write(table + "\n")
+        with open(os.path.join(output_dir, "node_provisioning.csv"), "w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(["node", "machine_family", "capacity", "node_pool", "created", "ready_seconds"])
+            with self._lock:
+                for name, (labels, created, ready) in sorted(self.nodes.items()):
+                    writer.writerow([
+                        name,
+                        labels.get(MACHINE_FAMILY_LABEL, "unknown"),
+                        "spot" if _is_spot(labels) else "on-demand",
+                        labels.get(GKE_NODEPOOL_LABEL, "unknown"),
+                        f"{created:.3f}" if created is not None else "",
+                        f"{ready - created:.3f}" if ready is not None and created is not None else "",
+                    ])
+        logger.info("Node provisioning latencies for %s new nodes written to %s.", len(self.nodes), output_dir)
+        return table
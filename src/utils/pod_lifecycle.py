@@ -0,0 +1,190 @@
+import csv
+import os
+import numpy as np
+from src.utils.logging_util import get_logger
+from src.utils.records import PodRecord
+
+logger = get_logger(__name__)
+
+# Lifecycle stages measured from pod creation, keyed by the pod condition that ends them.
+STAGES = (
+    ("scheduled", "PodScheduled"),
+    ("containers_ready", "ContainersReady"),
+    ("ready", "Ready"),
+)
+PERCENTILES = (50, 90, 99)
+
+
+def _epoch(timestamp):
+    return timestamp.timestamp() if timestamp is not None else np.nan
+
+
+def _or_nan(value):
+    return value if value is not None else np.nan
+
+
+def _created(pod):
+    if isinstance(pod, PodRecord):
+        return pod.created
+    timestamp = pod.metadata.creation_timestamp
+    return timestamp.timestamp() if timestamp is not None else None
+
+
+def wait_for_ready_pods(pod_informer, deployment_name, replicas, timeout, since=None):
+    """
+    Block until the pod informer holds exactly `replicas` Ready, non-terminating pods of a
+    deployment, and return them.
+
+    A deployment reports its replicas ready before a lagging informer has observed all of
+    them, so lifecycle latencies collected right after a deployment wait would only cover
+    the pods that happened to be seen already.
+
+    Args:
+        pod_informer (Informer): Started pods informer covering the deployment's pods.
+        deployment_name (str): Deployment name.
+        replicas (int): Replica count the deployment was scaled to.
+        timeout (float): Maximum time to wait in seconds.
+        since (float): Only return pods created at or after these epoch seconds (e.g. the
+            scale request), compared at the one second resolution of creationTimestamp.
+
+    Returns:
+        list: The Ready pods (V1Pod objects or PodRecords), or None if the informer did
+        not hold `replicas` of them within the timeout.
+    """
+    synced = pod_informer.wait_until(
+        lambda informer: informer.count("ready_owner_deployment", deployment_name) == replicas, timeout
+    )
+    if synced is None:
+        return None
+    pods = pod_informer.by_index("ready_owner_deployment", deployment_name)
+    if since is None:
+        return pods
+    return [pod for pod in pods if (_created(pod) or 0) >= int(since)]
+
+
+class PodLifecycleCollector:
+    """
+    Builds per-pod lifecycle timelines (created -> scheduled -> containers ready -> ready)
+    from pod condition timestamps and summarizes them as latency percentiles.
+
+    Timestamps are held in compact float64 arrays (epoch seconds, NaN when a stage has
+    not been reached), so statistics over 10k+ pods are computed in a few vectorized operations.
+    """
+
+    def __init__(self, pods):
+        """
+        Initializes the collector from pod objects.
+
+        Args:
+            pods (list): V1Pod objects or PodRecords (e.g. from the pods informer).
+        """
+        count = len(pods)
+        self.names = [None] * count
+        self.created = np.full(count, np.nan)
+        self.transitions = {stage: np.full(count, np.nan) for stage, _ in STAGES}
+        condition_stages = {condition_type: stage for stage, condition_type in STAGES}
+
+        for i, pod in enumerate(pods):
+            if isinstance(pod, PodRecord):
+                self.names[i] = pod.name
+                self.created[i] = _or_nan(pod.created)
+                for stage, _ in STAGES:
+                    self.transitions[stage][i] = _or_nan(getattr(pod, stage))
+                continue
+            self.names[i] = pod.metadata.name
+            self.created[i] = _epoch(pod.metadata.creation_timestamp)
+            for condition in (pod.status.conditions if pod.status else None) or []:
+                stage = condition_stages.get(condition.type)
+                if stage is not None and condition.status == "True":
+                    self.transitions[stage][i] = _epoch(condition.last_transition_time)
+
+    def __len__(self):
+        return len(self.names)
+
+    def latencies(self, stage):
+        """
+        Return the per-pod latency in seconds from creation to the given stage (NaN if not reached).
+        """
+        return self.transitions[stage] - self.created
+
+    def summary(self):
+        """
+        Summarize the latency distribution of every stage.
+
+        Returns:
+            dict: Stage name mapped to count, p50, p90, p99 and max latency in seconds.
+        """
+        summary = {}
+        for stage, _ in STAGES:
+            latencies = self.latencies(stage)
+            reached = latencies[~np.isnan(latencies)]
+            stats = {"count": int(reached.size)}
+            if reached.size:
+                values = np.percentile(reached, PERCENTILES)
+                stats.update({f"p{p}": float(v) for p, v in zip(PERCENTILES, values)})
+                stats["max"] = float(reached.max())
+            else:
+                stats.update({f"p{p}": None for p in PERCENTILES})
+                stats["max"] = None
+            summary[stage] = stats
+        return summary
+
+    def metrics(self):
+        """
+        Flatten the summary into results-store metrics (e.g. "pod_ready_p99_seconds").
+        """
+        metrics = {}
+        for stage, stats in self.summary().items():
+            metrics[f"pod_{stage}_count"] = stats["count"]
+            for column in [f"p{p}" for p in PERCENTILES] + ["max"]:
+                metrics[f"pod_{stage}_{column}_seconds"] = stats[column]
+        return metrics
+
+    def format_summary(self):
+        """
+        Render the summary as a fixed-width text table.
+        """
+        columns = ["count"] + [f"p{p}" for p in PERCENTILES] + ["max"]
+        lines = [f"{'stage':<18}" + "".join(f"{column:>10}" for column in columns)]
+        for stage, stats in self.summary().items():
+            cells = [f"{stats['count']:>10}"]
+            for column in columns[1:]:
+                value = stats[column]
+                cells.append(f"{value:>9.1f}s" if value is not None else f"{'-':>10}")
+            lines.append(f"{stage:<18}" + "".join(cells))
+        return "\n".join(lines)
+
+    def write_csv(self, path):
+        """
+        Write one row per pod with its creation time and per-stage latencies.
+
+        Args:
+            path (str): Destination CSV file.
+        """
+        latencies = [self.latencies(stage) for stage, _ in STAGES]
+        with open(path, "w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(["pod", "created"] + [f"{stage}_seconds" for stage, _ in STAGES])
+            for i, name in enumerate(self.names):
+                writer.writerow(
+                    [name, f"{self.created[i]:.3f}"]
+                    + ["" if np.isnan(values[i]) else f"{values[i]:.3f}" for values in latencies]
+                )
+
+    def write_report(self, output_dir):
+        """
+        Write the summary table and the raw per-pod CSV into `output_dir`.
+
+        Args:
+            output_dir (str): Directory for this scenario's results.
+
+        Returns:
+            str: The formatted summary table.
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        table = self.format_summary()
+        with open(os.path.join(output_dir, "pod_lifecycle_summary.txt"), "w") as file:
+            file.write(table + "\n")
+        self.write_csv(os.path.join(output_dir, "pod_lifecycle.csv"))
+        logger.info("Pod lifecycle latencies for %s pods written to %s.", len(self), output_dir)
+        return table
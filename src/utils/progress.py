@@ -0,0 +1,263 @@
+import csv
+import os
+import time
+import numpy as np
+from src.utils.logging_util import get_logger
+from src.utils.records import DeploymentStatus
+from src.utils.waiter import WaitTimeoutError
+
+logger = get_logger(__name__)
+
+RATE_AT_PERCENT = (10, 50, 90)  # Progress points at which the smoothed rate is reported
+
+
+class RolloutStalledError(WaitTimeoutError):
+    """
+    Raised when a deployment's ready replicas stop approaching the target for the stall window.
+    """
+
+
+class ProgressTracker:
+    """
+    Time series of a deployment's ready replicas while it scales to a target, with a
+    smoothed rate, an ETA and stall detection.
+
+    Feed it every observed V1Deployment or DeploymentStatus through `update` and call `check` periodically
+    (`watch_until` does both when passed the tracker). Progress is the distance between
+    ready replicas and the target shrinking, so scale-downs are tracked too. `check`
+    raises RolloutStalledError once that distance has not shrunk for `stall_window`
+    seconds, instead of letting the wait run into its timeout.
+    """
+
+    def __init__(self, name, target, stall_window=120.0, rate_window=10.0, check_interval=5.0):
+        """
+        Initializes the tracker. Create it right before the scale request.
+
+        Args:
+            name (str): Name of the deployment (for messages).
+            target (int): Replica count the deployment is scaled to.
+            stall_window (float): Seconds without progress after which `check` fails (0 disables).
+            rate_window (float): Seconds over which the rate of new ready replicas is smoothed.
+            check_interval (float): Seconds between checks (and progress log lines) while waiting.
+        """
+        self.name = name
+        self.target = target
+        self.stall_window = stall_window
+        self.rate_window = rate_window
+        self.check_interval = check_interval
+        self.start = time.time()
+        self.times = []  # Epoch seconds of the observations that changed the ready replicas
+        self.ready = []
+        self.finished = None  # Epoch seconds at which the target was reached
+        self.last_progress = self.start
+        self.longest_stall = 0.0
+        self._deployment = None
+        self._logged = self.start
+
+    @property
+    def remaining(self):
+        return abs(self.target - self.ready[-1]) if self.ready else None
+
+    def update(self, deployment, now=None):
+        """
+        Record the ready replicas of an observed V1Deployment or DeploymentStatus.
+        """
+        now = time.time() if now is None else now
+        if not isinstance(deployment, DeploymentStatus):
+            deployment = DeploymentStatus.from_model(deployment)
+        self._deployment = deployment
+        ready = deployment.ready_replicas
+        if self.ready and ready == self.ready[-1]:
+            return
+        previous = self.remaining
+        self.times.append(now)
+        self.ready.append(ready)
+        if previous is not None and self.remaining < previous:
+            self.longest_stall = max(self.longest_stall, now - self.last_progress)
+            self.last_progress = now
+        if self.remaining == 0 and self.finished is None:
+            self.finished = now
+
+    def check(self, now=None):
+        """
+        Log the progress at most every `check_interval` seconds and fail if the rollout stalled.
+
+        Raises:
+            RolloutStalledError: If the ready replicas did not approach the target for `stall_window` seconds.
+        """
+        now = time.time() if now is None else now
+        if self.finished is not None or not self.ready:
+            return
+        if now - self._logged >= self.check_interval:
+            self._logged = now
+            eta = self.eta(now)
+            logger.info(
+                "Deployment '%s': %s/%s replicas ready, %.1f/s, ETA %s.", self.name, self.ready[-1], self.target,
+                self.rate(now), f"{eta:.0f}s" if eta is not None else "unknown",
+            )
+        if self.stall_window and now - self.last_progress >= self.stall_window:
+            self.longest_stall = max(self.longest_stall, now - self.last_progress)
+            message = self.diagnostic(now)
+            logger.error(message)
+            raise RolloutStalledError(message)
+
+    def _remaining_at(self, times):
+        """
+        Return the distance to the target at the given epoch seconds (a step function of the observations).
+        """
+        remaining = np.abs(self.target - np.array(self.ready, dtype=float))
+        index = np.searchsorted(np.array(self.times), times, side="right") - 1
+        return remaining[np.clip(index, 0, None)]
+
+    def _window(self, times):
+        """
+        Return the rate window ending at the given epoch seconds, shortened to the time since
+        the start so rollouts shorter than `rate_window` are not averaged over idle time.
+        """
+        return np.maximum(np.minimum(self.rate_window, times - self.start), 1e-3)
+
+    def rate(self, now=None):
+        """
+        Return the replicas that became ready (or went away, when scaling down) per second
+        over the last `rate_window` seconds.
+        """
+        if not self.ready:
+            return 0.0
+        now = time.time() if now is None else now
+        window = float(self._window(np.array(now)))
+        before, after = self._remaining_at(np.array([now - window, now]))
+        return max(0.0, float(before - after) / window)
+
+    def eta(self, now=None):
+        """
+        Return the predicted seconds until the target is reached at the current rate (None while the rate is 0).
+        """
+        if self.finished is not None:
+            return 0.0
+        rate = self.rate(now)
+        return self.remaining / rate if rate > 0 and self.remaining is not None else None
+
+    def diagnostic(self, now=None):
+        """
+        Describe where the rollout stands: ready replicas, time since the last progress, and
+        the status counters and conditions of the last observed deployment.
+        """
+        now = time.time() if now is None else now
+        ready = self.ready[-1] if self.ready else 0
+        lines = [
+            f"Deployment '{self.name}' stalled at {ready}/{self.target} ready replicas: no progress for "
+            f"{now - self.last_progress:.0f}s (last progress {self.last_progress - self.start:.1f}s into the rollout, "
+            f"peak rate {self.summary(now)['peak_rate']:.1f}/s)."
+        ]
+        status = self._deployment
+        if status is not None:
+            lines.append(
+                f"Status: replicas={status.replicas}, updated={status.updated_replicas}, "
+                f"ready={status.ready_replicas}, available={status.available_replicas}, "
+                f"unavailable={status.unavailable_replicas}."
+            )
+            for condition_type, condition_status, reason, message in status.conditions:
+                lines.append(f"Condition {condition_type}={condition_status} ({reason}): {message}")
+        return " ".join(lines)
+
+    def curve(self, step=1.0, now=None):
+        """
+        Return the rollout sampled every `step` seconds from the start until it finished (or now).
+
+        Returns:
+            numpy.ndarray: Rows of (seconds since start, ready replicas, rate per second, ETA seconds or NaN).
+        """
+        if not self.ready:
+            return np.empty((0, 4))
+        end = self.finished if self.finished is not None else (time.time() if now is None else now)
+        seconds = np.append(np.arange(0.0, end - self.start, step), end - self.start)
+        times = self.start + seconds
+        index = np.clip(np.searchsorted(np.array(self.times), times, side="right") - 1, 0, None)
+        ready = np.array(self.ready, dtype=float)[index]
+        remaining = self._remaining_at(times)
+        window = self._window(times)
+        rate = np.maximum(0.0, (self._remaining_at(times - window) - remaining) / window)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            eta = np.where(rate > 0, remaining / rate, np.nan)
+        eta[remaining == 0] = 0.0
+        return np.column_stack((seconds, ready, rate, eta))
+
+    def summary(self, now=None):
+        """
+        Return the rollout's duration, mean and peak rate, longest stall, and the smoothed
+        rate when 10%, 50% and 90% of the way to the target.
+        """
+        now = time.time() if now is None else now
+        curve = self.curve(now=now)
+        end = self.finished if self.finished is not None else now
+        summary = {
+            "ready": self.ready[-1] if self.ready else None,
+            "finished": self.finished is not None,
+            "seconds": end - self.start,
+            "longest_stall": max(self.longest_stall, 0.0 if self.finished is not None else now - self.last_progress),
+            "peak_rate": float(curve[:, 2].max()) if len(curve) else 0.0,
+            "mean_rate": None,
+            "rate_at": {},
+        }
+        if not self.ready:
+            return summary
+        initial = abs(self.target - self.ready[0])
+        done = initial - (self.remaining or 0)
+        summary["mean_rate"] = done / summary["seconds"] if summary["seconds"] > 0 else None
+        for percent in RATE_AT_PERCENT:
+            threshold = initial * (1 - percent / 100)
+            reached = next((t for t, r in zip(self.times, self.ready) if abs(self.target - r) <= threshold), None)
+            if reached is not None and initial:
+                summary["rate_at"][percent] = self.rate(reached)
+        return summary
+
+    def format_summary(self, now=None):
+        summary = self.summary(now)
+        state = "reached" if summary["finished"] else "did not reach"
+        lines = [
+            f"Deployment '{self.name}' {state} {self.target} ready replicas ({summary['ready']} ready) "
+            f"after {summary['seconds']:.1f}s.",
+            f"Rate: mean {summary['mean_rate'] or 0:.1f}/s, peak {summary['peak_rate']:.1f}/s "
+            f"(smoothed over {self.rate_window:g}s); longest stall {summary['longest_stall']:.1f}s.",
+        ]
+        if summary["rate_at"]:
+            lines.append("Rate at " + ", ".join(
+                f"{percent}%: {rate:.1f}/s" for percent, rate in summary["rate_at"].items()
+            ))
+        return "\n".join(lines)
+
+    def metrics(self, now=None):
+        """
+        Return the rollout metrics for the results store.
+        """
+        summary = self.summary(now)
+        metrics = {
+            "rollout_peak_rate_per_second": summary["peak_rate"],
+            "rollout_longest_stall_seconds": summary["longest_stall"],
+        }
+        if summary["mean_rate"] is not None:
+            metrics["rollout_mean_rate_per_second"] = summary["mean_rate"]
+        for percent, rate in summary["rate_at"].items():
+            metrics[f"rollout_rate_at_{percent}pct_per_second"] = rate
+        return metrics
+
+    def write_report(self, output_dir, now=None):
+        """
+        Write the summary and the per-second rollout curve into `output_dir`.
+
+        Args:
+            output_dir (str): Directory for this scenario's results.
+
+        Returns:
+            str: The formatted summary.
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        text = self.format_summary(now)
+        with open(os.path.join(output_dir, "rollout_summary.txt"), "w") as file:
+            file.write(text + "\n")
+        with open(os.path.join(output_dir, "rollout_progress.csv"), "w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(["seconds", "ready", "rate_per_second", "eta_seconds"])
+            for seconds, ready, rate, eta in self.curve(now=now):
+                writer.writerow([f"{seconds:.1f}", int(ready), f"{rate:.3f}", "" if np.isnan(eta) else f"{eta:.1f}"])
+        return text
@@ -0,0 +1,155 @@
+import functools
+import random
+import threading
+import time
+from kubernetes.client.rest import ApiException
+from src.utils.logging_util import get_logger
+
+logger = get_logger(__name__)
+
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket allowing `qps` requests per second with bursts of up to `burst`.
+    """
+
+    def __init__(self, qps, burst):
+        """
+        Initializes the token bucket.
+
+        Args:
+            qps (float): Sustained requests per second (0 disables limiting).
+            burst (int): Maximum number of requests allowed back to back.
+        """
+        self.qps = qps
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Take one token, sleeping until it is available.
+
+        Returns:
+            float: Seconds spent waiting for the token.
+        """
+        if not self.qps:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.qps)
+            self.updated = now
+            # Reserve the token even if it is not there yet; later callers queue behind us.
+            self.tokens -= 1
+            wait = -self.tokens / self.qps if self.tokens < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+class ThrottleStats:
+    """
+    Thread-safe counters of API requests and time spent throttled on the client side.
+    """
+
+    def __init__(self):
+        self.requests = 0
+        self.retries = 0
+        self.throttled_responses = 0  # 429 responses from API Priority and Fairness
+        self.throttled_seconds = 0.0  # Time waiting for tokens or backing off
+        self._lock = threading.Lock()
+
+    def record(self, requests=0, retries=0, throttled_responses=0, throttled_seconds=0.0):
+        with self._lock:
+            self.requests += requests
+            self.retries += retries
+            self.throttled_responses += throttled_responses
+            self.throttled_seconds += throttled_seconds
+
+    def as_dict(self):
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "retries": self.retries,
+                "throttled_responses": self.throttled_responses,
+                "throttled_seconds": self.throttled_seconds,
+            }
+
+
+def _retry_after(exception):
+    headers = exception.headers or {}
+    value = headers.get("Retry-After") or headers.get("retry-after")
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+class RateLimitedApi:
+    """
+    Proxy around a Kubernetes API client (e.g. AppsV1Api) that passes every API call
+    through a shared token bucket and retries 429/5xx responses with jittered
+    exponential backoff, honoring Retry-After.
+
+    Wrapped methods keep their name and docstring, so they still work with
+    `kubernetes.watch.Watch.stream`.
+    """
+
+    def __init__(self, api, limiter, stats, max_retries=5, backoff_base=0.5, backoff_max=30.0, methods=None):
+        """
+        Initializes the proxy.
+
+        Args:
+            api (object): The Kubernetes API client to wrap.
+            limiter (TokenBucket): Token bucket shared by all API clients.
+            stats (ThrottleStats): Counters shared by all API clients.
+            max_retries (int): Retries of a 429/5xx response before giving up.
+            backoff_base (float): Initial backoff in seconds.
+            backoff_max (float): Maximum backoff in seconds.
+            methods (tuple): Names of the methods that send requests (default: every public method).
+        """
+        self._api = api
+        self._methods = methods
+        self._limiter = limiter
+        self._stats = stats
+        self._max_retries = max_retries
+        self._backoff_base = backoff_base
+        self._backoff_max = backoff_max
+
+    def __getattr__(self, name):
+        attr = getattr(self._api, name)
+        if name.startswith("_") or not callable(attr) or (self._methods is not None and name not in self._methods):
+            return attr
+
+        @functools.wraps(attr)
+        def call(*args, **kwargs):
+            attempt = 0
+            while True:
+                waited = self._limiter.acquire()
+                self._stats.record(requests=1, throttled_seconds=waited)
+                try:
+                    return attr(*args, **kwargs)
+                except ApiException as e:
+                    if e.status not in RETRYABLE_STATUSES or attempt >= self._max_retries:
+                        raise
+                    backoff = _retry_after(e)
+                    if backoff is None:
+                        backoff = min(self._backoff_max, self._backoff_base * 2 ** attempt)
+                        backoff = random.uniform(backoff / 2, backoff)
+                    attempt += 1
+                    logger.warning(
+                        "%s returned %s; retry %s/%s in %.2fs.", name, e.status, attempt, self._max_retries, backoff
+                    )
+                    self._stats.record(
+                        retries=1,
+                        throttled_responses=1 if e.status == 429 else 0,
+                        throttled_seconds=backoff,
+                    )
+                    time.sleep(backoff)
+
+        # Cache the wrapper so repeated lookups do not rebuild it.
+        self.__dict__[name] = call
+        return call
@@ -0,0 +1,260 @@
+from datetime import datetime
+import orjson
+from kubernetes.utils import parse_quantity
+from src.utils.list_util import DEFAULT_PAGE_SIZE
+from src.utils.logging_util import get_logger
+
+logger = get_logger(__name__)
+
+GKE_NODEPOOL_LABEL = "cloud.google.com/gke-nodepool"
+MACHINE_FAMILY_LABEL = "cloud.google.com/machine-family"
+SPOT_LABEL = "cloud.google.com/gke-spot"
+SCALE_DOWN_TAINT = "ToBeDeletedByClusterAutoscaler"  # Set by the cluster autoscaler on nodes it removes
+
+
+def parse_time(value):
+    """
+    Convert an RFC 3339 timestamp (e.g. "2024-12-01T10:00:00Z") to epoch seconds.
+
+    Returns:
+        float: Epoch seconds, or None if `value` is empty.
+    """
+    if not value:
+        return None
+    return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+
+
+def _condition_times(status):
+    """
+    Return {condition type: (status == "True", lastTransitionTime as epoch seconds)}.
+    """
+    return {
+        condition["type"]: (condition.get("status") == "True", parse_time(condition.get("lastTransitionTime")))
+        for condition in status.get("conditions") or ()
+    }
+
+
+def _true_since(conditions, condition_type):
+    is_true, since = conditions.get(condition_type, (False, None))
+    return since if is_true else None
+
+
+class PodRecord:
+    """
+    Slim pod holding only the fields the harness reads. Timestamps are epoch seconds
+    (None when the condition is not True yet).
+    """
+
+    __slots__ = (
+        "key", "namespace", "name", "uid", "resource_version", "labels", "node_name", "phase",
+        "owner_deployment", "created", "deleted", "deletion_grace_period", "scheduled", "containers_ready", "ready",
+        "is_ready",
+    )
+
+    @classmethod
+    def from_dict(cls, obj):
+        """
+        Build a record from a decoded pod JSON object.
+        """
+        record = cls()
+        metadata = obj["metadata"]
+        status = obj.get("status") or {}
+        labels = metadata.get("labels") or {}
+        conditions = _condition_times(status)
+        record.namespace = metadata.get("namespace")
+        record.name = metadata["name"]
+        record.key = f"{record.namespace}/{record.name}"
+        record.uid = metadata.get("uid")
+        record.resource_version = metadata.get("resourceVersion")
+        record.labels = labels
+        record.node_name = (obj.get("spec") or {}).get("nodeName")
+        record.phase = status.get("phase")
+        record.owner_deployment = None
+        template_hash = labels.get("pod-template-hash")
+        for owner in metadata.get("ownerReferences") or ():
+            owner_name = owner.get("name", "")
+            if owner.get("kind") == "ReplicaSet" and template_hash and owner_name.endswith(f"-{template_hash}"):
+                record.owner_deployment = owner_name[: -len(template_hash) - 1]
+        record.created = parse_time(metadata.get("creationTimestamp"))
+        record.deleted = parse_time(metadata.get("deletionTimestamp"))
+        record.deletion_grace_period = metadata.get("deletionGracePeriodSeconds") or 0
+        record.scheduled = _true_since(conditions, "PodScheduled")
+        record.containers_ready = _true_since(conditions, "ContainersReady")
+        record.ready = _true_since(conditions, "Ready")
+        record.is_ready = record.ready is not None
+        return record
+
+
+class NodeRecord:
+    """
+    Slim node holding only the fields the harness reads. Timestamps are epoch seconds.
+    """
+
+    __slots__ = (
+        "key", "name", "uid", "resource_version", "labels", "node_pool", "machine_family", "spot",
+        "created", "ready", "is_ready", "cordoned", "allocatable_cpu",
+    )
+
+    @classmethod
+    def from_dict(cls, obj):
+        """
+        Build a record from a decoded node JSON object.
+        """
+        record = cls()
+        metadata = obj["metadata"]
+        labels = metadata.get("labels") or {}
+        conditions = _condition_times(obj.get("status") or {})
+        record.name = record.key = metadata["name"]
+        record.uid = metadata.get("uid")
+        record.resource_version = metadata.get("resourceVersion")
+        record.labels = labels
+        record.node_pool = labels.get(GKE_NODEPOOL_LABEL)
+        record.machine_family = labels.get(MACHINE_FAMILY_LABEL)
+        record.spot = labels.get(SPOT_LABEL) == "true"
+        record.created = parse_time(metadata.get("creationTimestamp"))
+        record.ready = _true_since(conditions, "Ready")
+        record.is_ready = record.ready is not None
+        spec = obj.get("spec") or {}
+        record.cordoned = bool(spec.get("unschedulable")) or any(
+            taint.get("key") == SCALE_DOWN_TAINT for taint in spec.get("taints") or ()
+        )
+        allocatable = (obj.get("status") or {}).get("allocatable") or {}
+        record.allocatable_cpu = float(parse_quantity(allocatable["cpu"])) if "cpu" in allocatable else None
+        return record
+
+
+class DeploymentStatus:
+    """
+    Slim deployment holding its desired replicas, status counters (missing counters are 0)
+    and conditions as (type, status, reason, message) tuples.
+    """
+
+    __slots__ = (
+        "key", "namespace", "name", "resource_version", "generation", "observed_generation",
+        "spec_replicas", "replicas", "updated_replicas", "ready_replicas", "available_replicas",
+        "unavailable_replicas", "conditions",
+    )
+
+    @classmethod
+    def from_dict(cls, obj):
+        """
+        Build a record from a decoded deployment JSON object.
+        """
+        record = cls()
+        metadata = obj["metadata"]
+        status = obj.get("status") or {}
+        record.namespace = metadata.get("namespace")
+        record.name = metadata["name"]
+        record.key = f"{record.namespace}/{record.name}"
+        record.resource_version = metadata.get("resourceVersion")
+        record.generation = metadata.get("generation", 0)
+        record.observed_generation = status.get("observedGeneration", 0)
+        record.spec_replicas = (obj.get("spec") or {}).get("replicas", 0)
+        record.replicas = status.get("replicas", 0)
+        record.updated_replicas = status.get("updatedReplicas", 0)
+        record.ready_replicas = status.get("readyReplicas", 0)
+        record.available_replicas = status.get("availableReplicas", 0)
+        record.unavailable_replicas = status.get("unavailableReplicas", 0)
+        record.conditions = tuple(
+            (condition.get("type"), condition.get("status"), condition.get("reason"), condition.get("message"))
+            for condition in status.get("conditions") or ()
+        )
+        return record
+
+    @classmethod
+    def from_model(cls, deployment):
+        """
+        Build a record from a V1Deployment client model.
+        """
+        record = cls()
+        metadata = deployment.metadata
+        status = deployment.status
+        record.namespace = metadata.namespace
+        record.name = metadata.name
+        record.key = f"{record.namespace}/{record.name}"
+        record.resource_version = metadata.resource_version
+        record.generation = metadata.generation or 0
+        record.observed_generation = (status.observed_generation if status else None) or 0
+        record.spec_replicas = (deployment.spec.replicas if deployment.spec else None) or 0
+        record.replicas = (status.replicas if status else None) or 0
+        record.updated_replicas = (status.updated_replicas if status else None) or 0
+        record.ready_replicas = (status.ready_replicas if status else None) or 0
+        record.available_replicas = (status.available_replicas if status else None) or 0
+        record.unavailable_replicas = (status.unavailable_replicas if status else None) or 0
+        record.conditions = tuple(
+            (condition.type, condition.status, condition.reason, condition.message)
+            for condition in (status.conditions if status else None) or ()
+        )
+        return record
+
+
+def record_key(record):
+    return record.key
+
+
+NODE_RECORD_INDEXES = {
+    "ready": lambda record: [record.is_ready],
+    "node_pool": lambda record: [record.node_pool],
+}
+
+POD_RECORD_INDEXES = {
+    "ready": lambda record: [record.is_ready],
+    "namespace": lambda record: [record.namespace],
+    "owner_deployment": lambda record: [record.owner_deployment] if record.owner_deployment else [],
+    "ready_owner_deployment": lambda record: (
+        [record.owner_deployment] if record.owner_deployment and record.is_ready and record.deleted is None else []
+    ),
+    "node": lambda record: [record.node_name] if record.node_name else [],
+}
+
+
+def iter_raw_pages(list_func, *args, page_size=DEFAULT_PAGE_SIZE, **kwargs):
+    """
+    Yield decoded JSON pages of a list call, skipping the client's model deserialization.
+
+    The request is made with `_preload_content=False` and the body is parsed with orjson.
+
+    Args:
+        list_func (callable): List function of a Kubernetes API client.
+        *args: Positional arguments passed to `list_func`.
+        page_size (int): Maximum number of objects per page.
+        **kwargs: Keyword arguments passed to `list_func` (e.g. label_selector).
+
+    Yields:
+        dict: Each list response body ("metadata" and "items").
+    """
+    continue_token = None
+    while True:
+        if continue_token:
+            kwargs["_continue"] = continue_token
+        response = list_func(*args, limit=page_size, _preload_content=False, **kwargs)
+        try:
+            page = orjson.loads(response.data)
+        finally:
+            response.release_conn()
+        yield page
+        continue_token = page["metadata"].get("continue")
+        if not continue_token:
+            break
+
+
+def read_deployment_status(apps_api, name, namespace, fast_decode=True):
+    """
+    Read a deployment and return its DeploymentStatus.
+
+    Args:
+        apps_api (AppsV1Api): API client used to read the deployment.
+        name (str): Name of the deployment.
+        namespace (str): Namespace of the deployment.
+        fast_decode (bool): Parse the raw JSON response instead of building a V1Deployment first.
+
+    Returns:
+        DeploymentStatus: The deployment's replicas, status counters and conditions.
+    """
+    if not fast_decode:
+        return DeploymentStatus.from_model(apps_api.read_namespaced_deployment(name=name, namespace=namespace))
+    response = apps_api.read_namespaced_deployment(name=name, namespace=namespace, _preload_content=False)
+    try:
+        return DeploymentStatus.from_dict(orjson.loads(response.data))
+    finally:
+        response.release_conn()
@@ -0,0 +1,337 @@
+import os
+import resource
+import sys
+import threading
+import time
+import numpy as np
+import orjson
+from kubernetes.client.rest import ApiException
+from kubernetes.utils import parse_quantity
+from src.utils.logging_util import get_logger
+from src.utils.records import NodeRecord
+
+logger = get_logger(__name__)
+
+METRICS_GROUP = "metrics.k8s.io"
+METRICS_VERSION = "v1beta1"
+HTTP_STATUS_FORBIDDEN = 403
+HTTP_STATUS_NOT_FOUND = 404
+FORBIDDEN_LIMIT = 3  # Consecutive 403s after which a metrics source is no longer sampled
+
+# Columns of the sample arrays. Times are epoch seconds, CPU is in cores or percent of one core
+# (like top) and memory in bytes.
+COLUMNS = (
+    "time",
+    "harness_cpu_percent",  # CPU time the harness process used since the previous sample, per wall second
+    "harness_rss_bytes",
+    "harness_threads",
+    "nodes",
+    "node_cpu_cores",  # Summed over the selected nodes
+    "node_cpu_max_percent",  # Highest usage of a single node, in percent of its allocatable CPU
+    "node_cpu_mean_percent",
+    "node_memory_bytes",
+    "pods",
+    "pod_cpu_cores",  # Summed over the selected pods
+    "pod_cpu_max_cores",  # Highest usage of a single pod
+    "pod_memory_bytes",
+)
+COLUMN = {name: index for index, name in enumerate(COLUMNS)}
+
+try:
+    PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+except (AttributeError, ValueError, OSError):
+    PAGE_SIZE = 4096
+
+
+def _rss_bytes():
+    """
+    Return the resident set size of this process. Falls back to the peak RSS where
+    /proc is not available (macOS).
+    """
+    try:
+        with open("/proc/self/statm") as file:
+            return int(file.read().split()[1]) * PAGE_SIZE
+    except OSError:
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+def _allocatable_cpu(node):
+    """
+    Return the allocatable cores of a V1Node or NodeRecord (None if unknown).
+    """
+    if isinstance(node, NodeRecord):
+        return node.allocatable_cpu
+    allocatable = (node.status.allocatable or {}) if node.status else {}
+    return float(parse_quantity(allocatable["cpu"])) if "cpu" in allocatable else None
+
+
+class ResourceSampler:
+    """
+    Background sampler of node and pod usage from the metrics.k8s.io API and of the
+    harness process's own CPU and memory.
+
+    Every `interval` seconds one row of COLUMNS is written into a preallocated array of
+    `capacity` rows, used as a ring buffer, so a long run costs no allocations and a
+    bounded amount of memory. Values that could not be sampled are NaN: a failed
+    metrics request only leaves its own columns empty, and node or pod metrics are no
+    longer requested once the API is not served or keeps answering 403 Forbidden.
+    """
+
+    def __init__(self, custom_api, namespace, interval=5.0, capacity=8640, node_selector="", pod_selector="",
+                 node_informer=None):
+        """
+        Initializes the sampler.
+
+        Args:
+            custom_api (CustomObjectsApi): API client used to read metrics.k8s.io.
+            namespace (str): Namespace of the pods to sample.
+            interval (float): Seconds between samples.
+            capacity (int): Number of most recent samples kept.
+            node_selector (str): Label selector of the nodes to sample ("" = all nodes).
+            pod_selector (str): Label selector of the pods to sample ("" = all pods of the namespace).
+            node_informer (Informer): Node cache providing the allocatable CPU for utilization.
+        """
+        self.custom_api = custom_api
+        self.namespace = namespace
+        self.interval = interval
+        self.capacity = capacity
+        self.node_selector = node_selector
+        self.pod_selector = pod_selector
+        self.node_informer = node_informer
+        self.samples = np.full((capacity, len(COLUMNS)), np.nan)
+        self.count = 0  # Samples taken; the newest is at (count - 1) % capacity
+        self._disabled = set()  # Metrics sources ("nodes", "pods") no longer sampled
+        self._forbidden = {"nodes": 0, "pods": 0}  # Consecutive 403 responses per source
+        self._last_cpu = None  # (wall time, process time) of the previous sample
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """
+        Take a first sample and start the sampling thread.
+        """
+        self.sample()
+        self._thread = threading.Thread(target=self._run, name="resource-sampler", daemon=True)
+        self._thread.start()
+        logger.info("Sampling node, pod and harness resources every %.1fs.", self.interval)
+        return self
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval + 5)
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            try:
+                self.sample()
+            except Exception as e:
+                logger.warning("Resource sample failed: %s", e)
+
+    def sample(self):
+        """
+        Take one sample now. Called by the sampling thread, and may be called at scenario
+        boundaries so short scenarios are covered too.
+        """
+        row = np.full(len(COLUMNS), np.nan)
+        now = time.time()
+        cpu_time = time.process_time()
+        row[COLUMN["time"]] = now
+        row[COLUMN["harness_rss_bytes"]] = _rss_bytes()
+        row[COLUMN["harness_threads"]] = threading.active_count()
+        for source, sample_source in (("nodes", self._sample_nodes), ("pods", self._sample_pods)):
+            if source in self._disabled:
+                continue
+            try:
+                sample_source(row)
+                self._forbidden[source] = 0
+            except ApiException as e:
+                self._api_error(source, e)
+            except Exception as e:
+                logger.warning("Sampling %s metrics failed: %s", source, e)
+        with self._lock:
+            if self._last_cpu is not None and now > self._last_cpu[0]:
+                row[COLUMN["harness_cpu_percent"]] = 100 * (cpu_time - self._last_cpu[1]) / (now - self._last_cpu[0])
+            self._last_cpu = (now, cpu_time)
+            self.samples[self.count % self.capacity] = row
+            self.count += 1
+
+    def _api_error(self, source, e):
+        """
+        Handle a failed metrics request: stop sampling metrics that are not served, or
+        a source that keeps being forbidden, and leave the columns empty otherwise.
+        """
+        if e.status == HTTP_STATUS_NOT_FOUND:
+            logger.warning("The metrics.k8s.io API is not served (is metrics-server installed?); "
+                           "only harness resources are sampled.")
+            self._disabled.update(("nodes", "pods"))
+        elif e.status == HTTP_STATUS_FORBIDDEN:
+            self._forbidden[source] += 1
+            if self._forbidden[source] >= FORBIDDEN_LIMIT:
+                logger.warning("Reading %s metrics is forbidden (%s); no longer sampling them.", source, e.reason)
+                self._disabled.add(source)
+        else:
+            logger.warning("Sampling %s metrics failed: %s %s", source, e.status, e.reason)
+
+    def _list_metrics(self, plural, label_selector, namespace=None):
+        """
+        Return the items of a NodeMetricsList or PodMetricsList.
+
+        Raises:
+            ApiException: If the metrics API request fails.
+        """
+        kwargs = {"label_selector": label_selector} if label_selector else {}
+        if namespace is None:
+            response = self.custom_api.list_cluster_custom_object(
+                METRICS_GROUP, METRICS_VERSION, plural, _preload_content=False, **kwargs
+            )
+        else:
+            response = self.custom_api.list_namespaced_custom_object(
+                METRICS_GROUP, METRICS_VERSION, namespace, plural, _preload_content=False, **kwargs
+            )
+        try:
+            return orjson.loads(response.data)["items"]
+        finally:
+            response.release_conn()
+
+    def _sample_nodes(self, row):
+        items = self._list_metrics("nodes", self.node_selector)
+        cores = np.array([float(parse_quantity(item["usage"]["cpu"])) for item in items])
+        memory = sum(float(parse_quantity(item["usage"]["memory"])) for item in items)
+        row[COLUMN["nodes"]] = len(items)
+        row[COLUMN["node_cpu_cores"]] = cores.sum()
+        row[COLUMN["node_memory_bytes"]] = memory
+        if self.node_informer is not None and items:
+            allocatable = np.array([
+                _allocatable_cpu(node) if node is not None else None
+                for node in (self.node_informer.get(item["metadata"]["name"]) for item in items)
+            ], dtype=float)
+            utilization = 100 * cores / allocatable
+            if not np.isnan(utilization).all():
+                row[COLUMN["node_cpu_max_percent"]] = np.nanmax(utilization)
+                row[COLUMN["node_cpu_mean_percent"]] = np.nanmean(utilization)
+
+    def _sample_pods(self, row):
+        items = self._list_metrics("pods", self.pod_selector, namespace=self.namespace)
+        cores = np.array([
+            sum(float(parse_quantity(container["usage"]["cpu"])) for container in item["containers"])
+            for item in items
+        ])
+        memory = sum(
+            float(parse_quantity(container["usage"]["memory"])) for item in items for container in item["containers"]
+        )
+        row[COLUMN["pods"]] = len(items)
+        row[COLUMN["pod_cpu_cores"]] = cores.sum()
+        row[COLUMN["pod_cpu_max_cores"]] = cores.max() if cores.size else 0.0
+        row[COLUMN["pod_memory_bytes"]] = memory
+
+    def window(self, since=None, until=None):
+        """
+        Return the retained samples of a time window.
+
+        Args:
+            since (float): Epoch seconds of the window start (default: oldest sample).
+            until (float): Epoch seconds of the window end (default: now).
+
+        Returns:
+            numpy.ndarray: A copy of the rows, oldest first, with one column per COLUMNS entry.
+        """
+        with self._lock:
+            if self.count <= self.capacity:
+                rows = self.samples[:self.count].copy()
+            else:
+                start = self.count % self.capacity
+                rows = np.concatenate((self.samples[start:], self.samples[:start]))
+        times = rows[:, COLUMN["time"]]
+        mask = np.ones(len(rows), dtype=bool)
+        if since is not None:
+            mask &= times >= since
+        if until is not None:
+            mask &= times <= until
+        return rows[mask]
+
+    def summary(self, since=None, until=None):
+        """
+        Return the mean and max of every column over a time window.
+
+        Returns:
+            dict: {"samples": count, column: {"mean": value, "max": value}} with None for
+            columns that have no values in the window.
+        """
+        rows = self.window(since, until)
+        summary = {"samples": len(rows)}
+        for index, name in enumerate(COLUMNS[1:], start=1):
+            values = rows[:, index]
+            values = values[~np.isnan(values)]
+            summary[name] = (
+                {"mean": float(values.mean()), "max": float(values.max())} if values.size else {"mean": None, "max": None}
+            )
+        return summary
+
+    def format_summary(self, since=None, until=None):
+        """
+        Format the summary of a time window as a table.
+        """
+        summary = self.summary(since, until)
+        lines = [
+            f"Resource samples: {summary['samples']} (every {self.interval:g}s)",
+            f"{'column':<28}{'mean':>16}{'max':>16}",
+        ]
+        for name in COLUMNS[1:]:
+            stats = summary[name]
+            lines.append(f"{name:<28}" + "".join(
+                f"{'-':>16}" if stats[key] is None else f"{stats[key]:>16.3f}" for key in ("mean", "max")
+            ))
+        return "\n".join(lines)
+
+    def metrics(self, since=None, until=None):
+        """
+        Return the metrics of a time window for the results store.
+
+        Returns:
+            dict: Peak and mean harness CPU, peak harness RSS, peak and mean node CPU
+            utilization and peak pod CPU, plus the number of samples. Columns without values
+            are left out.
+        """
+        summary = self.summary(since, until)
+        metrics = {"resource_samples_count": summary["samples"]}
+        for name, column, stat in (
+            ("harness_cpu_max_percent", "harness_cpu_percent", "max"),
+            ("harness_cpu_mean_percent", "harness_cpu_percent", "mean"),
+            ("harness_rss_max_bytes", "harness_rss_bytes", "max"),
+            ("node_cpu_max_percent", "node_cpu_max_percent", "max"),
+            ("node_cpu_mean_percent", "node_cpu_mean_percent", "mean"),
+            ("pod_cpu_max_cores", "pod_cpu_max_cores", "max"),
+        ):
+            value = summary[column][stat]
+            if value is not None:
+                metrics[name] = value
+        return metrics
+
+    def write_report(self, output_dir, since=None, until=None):
+        """
+        Write the summary and the raw samples of a time window into `output_dir`.
+
+        Args:
+            output_dir (str): Directory for this scenario's results.
+            since (float): Epoch seconds of the window start.
+            until (float): Epoch seconds of the window end.
+
+        Returns:
+            str: The formatted summary.
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        text = self.format_summary(since, until)
+        with open(os.path.join(output_dir, "resources_summary.txt"), "w") as file:
+            file.write(text + "\n")
+        np.savetxt(
+            os.path.join(output_dir, "resources.csv"),
+            self.window(since, until),
+            delimiter=",",
+            fmt=["%.3f"] + ["%.6g"] * (len(COLUMNS) - 1),
+            header=",".join(COLUMNS),
+            comments="",
+        )
+        return text
@@ -0,0 +1,344 @@
+import argparse
+import os
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from src.utils.config_util import get_settings
+from src.utils.logging_util import get_logger
+
+logger = get_logger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    started_at REAL NOT NULL,
+    cluster TEXT NOT NULL,
+    git_sha TEXT NOT NULL,
+    config_mode TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS metrics (
+    run_id TEXT NOT NULL REFERENCES runs(run_id),
+    scenario TEXT NOT NULL,
+    name TEXT NOT NULL,
+    value REAL NOT NULL,
+    recorded_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS metrics_by_run ON metrics (run_id, scenario, name);
+"""
+# Metrics that describe the workload rather than its performance; shown but never gated on.
+INFORMATIONAL_SUFFIX = "_count"
+# Rates and capacities, where a drop is the regression.
+HIGHER_IS_BETTER_SUFFIXES = ("_per_second", "_replicas")
+
+
+def git_sha():
+    """
+    Return the commit SHA of the working tree (suffixed "-dirty" with local changes), or "unknown".
+    """
+    try:
+        sha = subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True, timeout=10
+        ).stdout.strip()
+        dirty = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            capture_output=True, text=True, check=True, timeout=10,
+        ).stdout.strip()
+        return f"{sha}-dirty" if dirty else sha
+    except (OSError, subprocess.SubprocessError):
+        return "unknown"
+
+
+def cluster_name(settings):
+    """
+    Identify the cluster a run targets: the kubeconfig cluster of the active context
+    in "local" mode, `$CLUSTER_NAME` in-cluster and "fake" for the simulated cluster.
+
+    Args:
+        settings (Settings): The harness settings.
+
+    Returns:
+        str: The cluster name.
+    """
+    config_mode = settings.k8s.config_mode
+    if config_mode == "local":
+        from kubernetes import config as kube_config
+
+        try:
+            _, active_context = kube_config.list_kube_config_contexts()
+            return active_context["context"].get("cluster") or active_context["name"]
+        except Exception as e:
+            logger.warning("Could not read the active kubeconfig context: %s", e)
+            return "unknown"
+    if config_mode == "in-cluster":
+        return os.environ.get("CLUSTER_NAME", "in-cluster")
+    return config_mode
+
+
+class ResultsStore:
+    """
+    Append-only SQLite store of scenario metrics, one row per (run, scenario, metric).
+
+    Runs are keyed by a generated run ID and carry the cluster and git SHA they ran
+    against, so runs can be compared across commits and GKE versions.
+    """
+
+    def __init__(self, path):
+        """
+        Open (creating if needed) the results database.
+
+        Args:
+            path (str): Path of the SQLite file.
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+    def start_run(self, cluster, sha, config_mode):
+        """
+        Register a new run.
+
+        Returns:
+            str: The run ID ("<UTC timestamp>-<random suffix>").
+        """
+        run_id = f"{time.strftime('%Y%m%dT%H%M%SZ', time.gmtime())}-{uuid.uuid4().hex[:6]}"
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT INTO runs VALUES (?, ?, ?, ?, ?)", (run_id, time.time(), cluster, sha, config_mode)
+            )
+        logger.info("Recording results of run %s (cluster %s, commit %s) in %s.", run_id, cluster, sha, self.path)
+        return run_id
+
+    def record(self, run_id, scenario, metrics):
+        """
+        Append the metrics of one scenario.
+
+        Args:
+            run_id (str): Run the metrics belong to.
+            scenario (str): Scenario (test) name.
+            metrics (dict): Metric name mapped to a number; None values are skipped.
+        """
+        now = time.time()
+        rows = [
+            (run_id, scenario, name, float(value), now) for name, value in metrics.items() if value is not None
+        ]
+        with self._lock, self._connection:
+            self._connection.executemany("INSERT INTO metrics VALUES (?, ?, ?, ?, ?)", rows)
+
+    def runs(self, cluster=None, limit=20, config_mode=None, before=None):
+        """
+        Return the most recent runs, newest first, as (run_id, started_at, cluster, git_sha, config_mode).
+
+        Args:
+            cluster (str): Only runs against this cluster.
+            limit (int): Maximum number of runs.
+            config_mode (str): Only runs in this config mode.
+            before (float): Only runs started before these epoch seconds.
+        """
+        query = "SELECT run_id, started_at, cluster, git_sha, config_mode FROM runs"
+        conditions = []
+        params = ()
+        for column, operator, value in (
+            ("cluster", "=", cluster), ("config_mode", "=", config_mode), ("started_at", "<", before)
+        ):
+            if value:
+                conditions.append(f"{column} {operator} ?")
+                params += (value,)
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY started_at DESC LIMIT ?"
+        with self._lock:
+            return self._connection.execute(query, params + (limit,)).fetchall()
+
+    def run(self, run_id):
+        """
+        Return a run as (run_id, started_at, cluster, git_sha, config_mode).
+
+        Raises:
+            KeyError: If no such run exists.
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT run_id, started_at, cluster, git_sha, config_mode FROM runs WHERE run_id = ?", (run_id,)
+            ).fetchone()
+        if row is None:
+            raise KeyError(f"Run {run_id} not found in {self.path}.")
+        return row
+
+    def resolve(self, ref, cluster=None, config_mode=None, before=None):
+        """
+        Resolve "latest", "previous" or a run ID to a run ID.
+
+        "latest" is the newest run and "previous" the one before it, among the runs
+        matching `cluster` and `config_mode`. With `before` (a run ID), "previous" is the
+        newest matching run started before that run instead.
+
+        Raises:
+            KeyError: If no such run exists.
+        """
+        if ref in ("latest", "previous"):
+            started_before = self.run(before)[1] if before and ref == "previous" else None
+            runs = self.runs(cluster=cluster, limit=2, config_mode=config_mode, before=started_before)
+            index = 0 if ref == "latest" or started_before is not None else 1
+            if len(runs) <= index:
+                raise KeyError(f"No {ref} run recorded in {self.path}.")
+            return runs[index][0]
+        return self.run(ref)[0]
+
+    def metrics(self, run_id):
+        """
+        Return {(scenario, metric name): value} of a run. A metric recorded more than
+        once in a scenario keeps its last value.
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT scenario, name, value FROM metrics WHERE run_id = ? ORDER BY recorded_at", (run_id,)
+            ).fetchall()
+        return {(scenario, name): value for scenario, name, value in rows}
+
+
+def compare(baseline, candidate, threshold=0.2, min_delta=1.0, thresholds=None):
+    """
+    Diff two runs' metrics. Durations and API call counts are gated on (higher is worse),
+    "*_per_second" rates and "*_replicas" capacities too (lower is worse); "*_count"
+    metrics are only reported.
+
+    A metric regresses when it worsens by more than `threshold` (relative to the baseline)
+    and by more than `min_delta` (absolute), so near-zero baselines do not flap. A metric
+    of the baseline that the candidate did not record (e.g. its scenario failed) is a
+    regression too; a metric only the candidate recorded is reported but not gated on.
+
+    Args:
+        baseline (dict): {(scenario, name): value} of the baseline run.
+        candidate (dict): {(scenario, name): value} of the run under test.
+        threshold (float): Default allowed relative increase (0.2 = +20%).
+        min_delta (float): Increases up to this absolute amount are never regressions.
+        thresholds (dict): Per-metric-name overrides of `threshold`.
+
+    Returns:
+        list: (scenario, name, baseline value, candidate value, relative change, regressed)
+        for every metric present in either run. The value missing from a run and the
+        change are None.
+    """
+    thresholds = thresholds or {}
+    rows = []
+    for key in sorted(baseline.keys() | candidate.keys()):
+        scenario, name = key
+        before, after = baseline.get(key), candidate.get(key)
+        if before is None or after is None:
+            regressed = after is None and not name.endswith(INFORMATIONAL_SUFFIX)
+            rows.append((scenario, name, before, after, None, regressed))
+            continue
+        change = (after - before) / before if before else (0.0 if after == before else float("inf"))
+        allowed = thresholds.get(name, threshold)
+        if name.endswith(INFORMATIONAL_SUFFIX):
+            regressed = False
+        elif name.endswith(HIGHER_IS_BETTER_SUFFIXES):
+            regressed = before - after > min_delta and -change > allowed
+        else:
+            regressed = after - before > min_delta and change > allowed
+        rows.append((scenario, name, before, after, change, regressed))
+    return rows
+
+
+def format_comparison(rows):
+    """
+    Render `compare` rows as a text table, with columns as wide as their longest cell.
+    """
+    header = ("scenario", "metric", "baseline", "run", "change", "")
+    cells = [
+        (
+            scenario,
+            name,
+            "missing" if before is None else f"{before:.3f}",
+            "missing" if after is None else f"{after:.3f}",
+            "-" if change is None else f"{change:+.1%}",
+            "  REGRESSED" if regressed else "",
+        )
+        for scenario, name, before, after, change, regressed in rows
+    ]
+    widths = [max(len(row[column]) for row in [header, *cells]) + 2 for column in range(5)]
+    lines = []
+    for scenario, name, before, after, change, marker in [header, *cells]:
+        lines.append(
+            f"{scenario:<{widths[0]}}{name:<{widths[1]}}"
+            f"{before:>{widths[2]}}{after:>{widths[3]}}{change:>{widths[4]}}{marker}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    """
+    Command line entry point: list recorded runs, or compare a run against a baseline
+    and exit with status 1 if any metric regressed beyond its threshold.
+    """
+    metrics_settings = get_settings().metrics
+    parser = argparse.ArgumentParser(prog="python -m src.utils.results_store")
+    parser.add_argument("--db", default=metrics_settings.results_db)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    list_parser = subparsers.add_parser("list", help="List recorded runs.")
+    list_parser.add_argument("--cluster")
+    list_parser.add_argument("--limit", type=int, default=20)
+    compare_parser = subparsers.add_parser("compare", help="Compare a run against a baseline.")
+    compare_parser.add_argument("--baseline", default="previous", help='Run ID, "latest" or "previous".')
+    compare_parser.add_argument("--run", default="latest", help='Run ID, "latest" or "previous".')
+    compare_parser.add_argument(
+        "--cluster",
+        help="Resolve latest/previous among runs of this cluster (default: the baseline is resolved among "
+             "runs of the run's cluster and config mode).",
+    )
+    compare_parser.add_argument(
+        "--threshold", type=float, default=metrics_settings.regression_threshold
+    )
+    compare_parser.add_argument(
+        "--min-delta", type=float, default=metrics_settings.regression_min_delta
+    )
+    args = parser.parse_args(argv)
+
+    store = ResultsStore(args.db)
+    try:
+        if args.command == "list":
+            for run_id, started_at, cluster, sha, config_mode in store.runs(args.cluster, args.limit):
+                started = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(started_at))
+                print(f"{run_id}  {started}  {cluster:<30} {config_mode:<10} {sha}")
+            return 0
+
+        try:
+            run_id = store.resolve(args.run, args.cluster)
+            # Only compare like with like: a fake run against fake runs, a GKE run against runs of that cluster.
+            _, _, cluster, _, config_mode = store.run(run_id)
+            baseline_id = store.resolve(args.baseline, args.cluster or cluster, config_mode, before=run_id)
+        except KeyError as e:
+            print(e.args[0], file=sys.stderr)
+            return 2
+        rows = compare(
+            store.metrics(baseline_id),
+            store.metrics(run_id),
+            threshold=args.threshold,
+            min_delta=args.min_delta,
+            thresholds=metrics_settings.thresholds,
+        )
+        print(f"Baseline {baseline_id} vs run {run_id}")
+        print(format_comparison(rows))
+        regressions = [row for row in rows if row[-1]]
+        if regressions:
+            missing = sum(1 for row in regressions if row[3] is None)
+            print(f"{len(regressions)} metric(s) regressed, {missing} of them missing from the run.", file=sys.stderr)
+            return 1
+        return 0
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,346 @@
+import csv
+import math
+import os
+import threading
+import time
+import numpy as np
+from src.utils.informer import index_by_owner_deployment, object_key
+from src.utils.logging_util import get_logger
+from src.utils.records import SCALE_DOWN_TAINT, NodeRecord, PodRecord
+
+logger = get_logger(__name__)
+
+PERCENTILES = (50, 90, 99)
+
+
+def _pod_fields(pod):
+    """
+    Return (key, owner deployment, node name, deletion request time) of a V1Pod or PodRecord.
+
+    The API server sets deletionTimestamp to the end of the grace period, so the time the
+    deletion was requested is deletionTimestamp - deletionGracePeriodSeconds (None if the
+    pod is not terminating).
+    """
+    if isinstance(pod, PodRecord):
+        requested = pod.deleted - pod.deletion_grace_period if pod.deleted is not None else None
+        return pod.key, pod.owner_deployment, pod.node_name, requested
+    metadata = pod.metadata
+    requested = None
+    if metadata.deletion_timestamp is not None:
+        requested = metadata.deletion_timestamp.timestamp() - (metadata.deletion_grace_period_seconds or 0)
+    owners = index_by_owner_deployment(pod)
+    node_name = pod.spec.node_name if pod.spec else None
+    return object_key(pod), owners[0] if owners else None, node_name, requested
+
+
+def _node_fields(node):
+    """
+    Return (name, cordoned) of a V1Node or NodeRecord. A node is cordoned once it is
+    unschedulable or carries the cluster autoscaler's scale-down taint.
+    """
+    if isinstance(node, NodeRecord):
+        return node.name, node.cordoned
+    spec = node.spec
+    cordoned = bool(spec and (spec.unschedulable or any(taint.key == SCALE_DOWN_TAINT for taint in spec.taints or ())))
+    return node.metadata.name, cordoned
+
+
+def _percentiles(values):
+    values = values[~np.isnan(values)]
+    if not values.size:
+        return {**{f"p{p}": None for p in PERCENTILES}, "max": None}
+    stats = {f"p{p}": float(v) for p, v in zip(PERCENTILES, np.percentile(values, PERCENTILES))}
+    stats["max"] = float(values.max())
+    return stats
+
+
+class PodTermination:
+    """
+    Termination of one pod. Times are epoch seconds.
+    """
+
+    __slots__ = ("key", "node", "requested", "gone")
+
+    def __init__(self, key, node):
+        self.key = key
+        self.node = node
+        self.requested = None  # Deletion request (server time)
+        self.gone = None  # DELETED event observed (client time)
+
+
+class NodeScaleDown:
+    """
+    Scale-down of one node that hosted pods of the deployment. Times are epoch seconds.
+    """
+
+    __slots__ = ("name", "pods", "drained", "cordoned", "removed")
+
+    def __init__(self, name):
+        self.name = name
+        self.pods = 0  # Pods of the deployment on the node when the scale-down started
+        self.drained = None  # Last of those pods gone
+        self.cordoned = None  # First seen unschedulable or tainted for removal
+        self.removed = None  # DELETED event observed
+
+
+class ScaleDownTracker:
+    """
+    Tracks how fast a deployment scale-down releases capacity: per-pod time from the
+    deletion request to the pod being gone, and for every node that hosted the
+    deployment's pods the time until it was drained, cordoned and removed by the autoscaler.
+
+    The deployment's pods and their nodes are snapshotted when the tracker is created
+    (before the scale-down) and followed through the informers' event handlers.
+    Deletion requests come from the server's deletionTimestamp (1 second resolution on
+    a real API server); the other times are when the client observed the event. Call
+    `stop` to detach the handlers from the shared informers.
+    """
+
+    def __init__(self, pod_informer, node_informer, deployment_name):
+        """
+        Snapshot the deployment's pods and their nodes and start observing them.
+
+        Args:
+            pod_informer (Informer): The shared pod informer.
+            node_informer (Informer): The shared node informer (e.g. the compute-class nodes).
+            deployment_name (str): Deployment being scaled down.
+        """
+        self.pod_informer = pod_informer
+        self.node_informer = node_informer
+        self.deployment_name = deployment_name
+        self.started = time.time()
+        self.pods = {}  # key -> PodTermination
+        self.nodes = {}  # name -> NodeScaleDown
+        self._node_pods = {}  # node name -> keys of its tracked pods that still exist
+        self._lock = threading.Lock()
+        node_names = {_node_fields(node)[0] for node in node_informer.list()}
+        for pod in pod_informer.by_index("owner_deployment", deployment_name):
+            key, _, node_name, _ = _pod_fields(pod)
+            self.pods[key] = PodTermination(key, node_name)
+            if node_name in node_names:
+                node = self.nodes.setdefault(node_name, NodeScaleDown(node_name))
+                node.pods += 1
+                self._node_pods.setdefault(node_name, set()).add(key)
+        pod_informer.add_handler(self._observe_pod)
+        node_informer.add_handler(self._observe_node)
+        logger.info(
+            "Tracking the scale-down of %s '%s' pods on %s nodes.", len(self.pods), deployment_name, len(self.nodes)
+        )
+
+    def stop(self):
+        """
+        Detach from the informers. The observations so far are kept for the report.
+        """
+        self.pod_informer.remove_handler(self._observe_pod)
+        self.node_informer.remove_handler(self._observe_node)
+
+    def _observe_pod(self, event_type, pod):
+        key, _, _, requested = _pod_fields(pod)
+        with self._lock:
+            termination = self.pods.get(key)
+            if termination is None or termination.gone is not None:
+                return
+            if termination.requested is None:
+                termination.requested = requested
+            if event_type != "DELETED":
+                return
+            termination.gone = time.time()
+            if termination.requested is None:
+                # Deleted without a graceful termination phase.
+                termination.requested = termination.gone
+            remaining = self._node_pods.get(termination.node)
+            if remaining is not None:
+                remaining.discard(key)
+                if not remaining:
+                    self.nodes[termination.node].drained = termination.gone
+
+    def _observe_node(self, event_type, node):
+        name, cordoned = _node_fields(node)
+        with self._lock:
+            scale_down = self.nodes.get(name)
+            if scale_down is None or scale_down.removed is not None:
+                return
+            now = time.time()
+            if scale_down.cordoned is None and cordoned:
+                scale_down.cordoned = now
+            if event_type == "DELETED":
+                scale_down.removed = now
+
+    def remaining_pods(self):
+        """
+        Return the number of tracked pods that still exist.
+        """
+        with self._lock:
+            return sum(1 for termination in self.pods.values() if termination.gone is None)
+
+    def drained_nodes_removed(self):
+        """
+        Return True once every node drained of the deployment's pods has been removed.
+        """
+        with self._lock:
+            return all(node.removed is not None for node in self.nodes.values() if node.drained is not None)
+
+    def wait_for_pods_gone(self, replicas, timeout):
+        """
+        Block until at most `replicas` of the tracked pods still exist.
+
+        Args:
+            replicas (int): Replica count the deployment was scaled down to.
+            timeout (float): Maximum time to wait in seconds.
+
+        Returns:
+            float: Elapsed time in seconds, or None if the timeout expired.
+        """
+        return self.pod_informer.wait_until(lambda _: self.remaining_pods() <= replicas, timeout)
+
+    def wait_for_nodes_removed(self, timeout):
+        """
+        Block until the autoscaler has removed every drained node.
+
+        Args:
+            timeout (float): Maximum time to wait in seconds.
+
+        Returns:
+            float: Elapsed time in seconds, or None if the timeout expired.
+        """
+        return self.node_informer.wait_until(lambda _: self.drained_nodes_removed(), timeout)
+
+    def _offsets(self, times):
+        # Seconds after the start of the scale-down (NaN where the event did not happen).
+        return np.array([t - self.started if t is not None else np.nan for t in times], dtype=np.float64)
+
+    def summary(self):
+        """
+        Summarize the scale-down.
+
+        Returns:
+            dict: Pod and node counts; seconds from the start of the scale-down until the
+            last pod was gone and the last node removed; and p50/p90/p99/max of pod
+            termination (deletion request -> gone), node drain (start -> last pod gone)
+            and node removal (drained -> removed) times.
+        """
+        with self._lock:
+            pods = list(self.pods.values())
+            nodes = list(self.nodes.values())
+        terminated = [pod for pod in pods if pod.gone is not None]
+        removed = [node for node in nodes if node.removed is not None]
+        summary = {
+            "pods": len(pods),
+            "pods_gone": len(terminated),
+            "pods_released_seconds": max(pod.gone for pod in terminated) - self.started if terminated else None,
+            "nodes": len(nodes),
+            "nodes_drained": sum(1 for node in nodes if node.drained is not None),
+            "nodes_removed": len(removed),
+            "nodes_released_seconds": max(node.removed for node in removed) - self.started if removed else None,
+        }
+        termination = np.array([pod.gone - pod.requested for pod in terminated], dtype=np.float64)
+        drain = self._offsets([node.drained for node in nodes])
+        removal = np.array(
+            [node.removed - node.drained if node.drained is not None else np.nan for node in removed], dtype=np.float64
+        )
+        for name, values in (("termination", termination), ("drain", drain), ("removal", removal)):
+            summary.update({f"{name}_{column}": value for column, value in _percentiles(values).items()})
+        return summary
+
+    def format_summary(self):
+        """
+        Render the summary as text.
+        """
+        summary = self.summary()
+
+        def seconds(value):
+            return f"{value:.1f}s" if value is not None else "-"
+
+        def distribution(name):
+            return ", ".join(
+                f"{column} {seconds(summary[f'{name}_{column}'])}" for column in [f"p{p}" for p in PERCENTILES] + ["max"]
+            )
+
+        return "\n".join([
+            f"pods: {summary['pods_gone']} of {summary['pods']} gone, "
+            f"last {seconds(summary['pods_released_seconds'])} after the scale-down",
+            f"pod termination (delete -> gone): {distribution('termination')}",
+            f"nodes: {summary['nodes_drained']} of {summary['nodes']} drained, {summary['nodes_removed']} removed, "
+            f"last {seconds(summary['nodes_released_seconds'])} after the scale-down",
+            f"node drain (scale-down -> empty): {distribution('drain')}",
+            f"node removal (empty -> removed): {distribution('removal')}",
+        ])
+
+    def metrics(self):
+        """
+        Results-store metrics: termination, drain and removal percentiles and the time
+        until all capacity was released.
+        """
+        summary = self.summary()
+        metrics = {
+            "scale_down_pods_count": summary["pods_gone"],
+            "scale_down_nodes_count": summary["nodes_removed"],
+            "scale_down_pods_released_seconds": summary["pods_released_seconds"],
+            "scale_down_nodes_released_seconds": summary["nodes_released_seconds"],
+        }
+        for name, metric in (("termination", "pod_termination"), ("drain", "node_drain"), ("removal", "node_removal")):
+            for p in PERCENTILES:
+                metrics[f"{metric}_p{p}_seconds"] = summary[f"{name}_p{p}"]
+        return metrics
+
+    def timeline(self):
+        """
+        Return the capacity still held, per second since the start of the scale-down.
+
+        Returns:
+            list: (second, pods remaining, nodes remaining) rows up to the last pod or node removal.
+        """
+        with self._lock:
+            gone = np.sort(self._offsets([pod.gone for pod in self.pods.values()]))
+            removed = np.sort(self._offsets([node.removed for node in self.nodes.values()]))
+        # NaN sorts last, so counting entries <= t only counts events that happened.
+        finished = np.concatenate([gone[~np.isnan(gone)], removed[~np.isnan(removed)], [0.0]])
+        seconds = np.arange(math.ceil(finished.max()) + 1)
+        pods = gone.size - np.searchsorted(gone, seconds, side="right")
+        nodes = removed.size - np.searchsorted(removed, seconds, side="right")
+        return list(zip(seconds.tolist(), pods.tolist(), nodes.tolist()))
+
+    def write_report(self, output_dir):
+        """
+        Write the summary, per-pod and per-node CSVs and the per-second timeline into `output_dir`.
+
+        Args:
+            output_dir (str): Directory for this scenario's results.
+
+        Returns:
+            str: The formatted summary.
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        text = self.format_summary()
+        with open(os.path.join(output_dir, "scale_down_summary.txt"), "w") as file:
+            file.write(text + "\n")
+
+        def offset(value):
+            return f"{value - self.started:.3f}" if value is not None else ""
+
+        with self._lock:
+            pods = sorted(self.pods.values(), key=lambda pod: pod.key)
+            nodes = sorted(self.nodes.values(), key=lambda node: node.name)
+        with open(os.path.join(output_dir, "pod_termination.csv"), "w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(["pod", "node", "requested_seconds", "gone_seconds", "termination_seconds"])
+            for pod in pods:
+                termination = pod.gone - pod.requested if pod.gone is not None else None
+                writer.writerow([
+                    pod.key,
+                    pod.node or "",
+                    offset(pod.requested),
+                    offset(pod.gone),
+                    f"{termination:.3f}" if termination is not None else "",
+                ])
+        with open(os.path.join(output_dir, "node_scale_down.csv"), "w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(["node", "pods", "drained_seconds", "cordoned_seconds", "removed_seconds"])
+            for node in nodes:
+                writer.writerow([node.name, node.pods, offset(node.drained), offset(node.cordoned), offset(node.removed)])
+        with open(os.path.join(output_dir, "scale_down_timeline.csv"), "w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(["second", "pods_remaining", "nodes_remaining"])
+            writer.writerows(self.timeline())
+        logger.info("Scale-down of %s pods and %s nodes written to %s.", len(pods), len(nodes), output_dir)
+        return text
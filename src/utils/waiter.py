@@ -0,0 +1,208 @@
+import time
+import orjson
+from kubernetes import watch
+from kubernetes.client.rest import ApiException
+from kubernetes.watch.watch import iter_resp_lines
+from src.utils.logging_util import get_logger
+from src.utils.records import DeploymentStatus
+
+logger = get_logger(__name__)
+
+HTTP_STATUS_GONE = 410
+
+
+class WaitTimeoutError(RuntimeError):
+    """
+    Raised when a watched condition does not hold before the timeout expires.
+    """
+
+
+def deployment_scaled_to(replicas):
+    """
+    Build a condition that holds once a deployment reports the given replica counts.
+
+    Args:
+        replicas (int): Desired number of replicas.
+
+    Returns:
+        callable: Predicate accepting a V1Deployment or DeploymentStatus.
+    """
+    def condition(deployment):
+        if isinstance(deployment, DeploymentStatus):
+            return deployment.replicas == replicas and deployment.available_replicas == replicas
+        status = deployment.status
+        return (
+            status is not None
+            and (status.replicas or 0) == replicas
+            and (status.available_replicas or 0) == replicas
+        )
+    return condition
+
+
+def _list(list_func, decoder, *args, **kwargs):
+    """
+    Return the listed objects and the list's resourceVersion, decoded from raw JSON if `decoder` is set.
+    """
+    if decoder is None:
+        listing = list_func(*args, **kwargs)
+        return listing.items, listing.metadata.resource_version
+    response = list_func(*args, _preload_content=False, **kwargs)
+    try:
+        body = orjson.loads(response.data)
+    finally:
+        response.release_conn()
+    return [decoder(item) for item in body["items"]], body["metadata"].get("resourceVersion")
+
+
+def _watch(list_func, decoder, *args, **kwargs):
+    """
+    Yield (event type, object, resourceVersion) for one watch request. BOOKMARK events yield a None object.
+    """
+    if decoder is None:
+        w = watch.Watch()
+        try:
+            for event in w.stream(list_func, *args, **kwargs):
+                if event["type"] == "BOOKMARK":
+                    yield "BOOKMARK", None, event["raw_object"]["metadata"]["resourceVersion"]
+                else:
+                    yield event["type"], event["object"], event["object"].metadata.resource_version
+        finally:
+            w.stop()
+        return
+
+    response = list_func(*args, watch=True, _preload_content=False, **kwargs)
+    try:
+        for line in iter_resp_lines(response):
+            event = orjson.loads(line)
+            raw_object = event["object"]
+            if event["type"] == "ERROR":
+                raise ApiException(
+                    status=raw_object.get("code"), reason=f"{raw_object.get('reason')}: {raw_object.get('message')}"
+                )
+            resource_version = raw_object["metadata"]["resourceVersion"]
+            if event["type"] == "BOOKMARK":
+                yield "BOOKMARK", None, resource_version
+            else:
+                yield event["type"], decoder(raw_object), resource_version
+    finally:
+        response.close()
+        response.release_conn()
+
+
+def watch_until(list_func, condition, timeout, *args, progress=None, decoder=None, **kwargs):
+    """
+    Block until `condition` holds for an object returned by `list_func`.
+
+    The current state is listed once; afterwards only watch events are consumed,
+    resuming from the last seen resourceVersion whenever the server closes the
+    stream. A 410 Gone (resourceVersion too old) triggers a fresh list.
+
+    With a `progress` tracker, every listed or watched object is also passed to
+    `progress.update`, and watch requests last at most `progress.check_interval`
+    seconds so `progress.check` runs (and can fail the wait) even without events.
+
+    Args:
+        list_func (callable): A list function of a Kubernetes API client
+            (e.g. `AppsV1Api.list_namespaced_deployment`).
+        condition (callable): Predicate evaluated on every listed or watched object.
+        timeout (float): Maximum time to wait in seconds.
+        *args: Positional arguments passed to `list_func`.
+        progress (ProgressTracker): Optional tracker of the objects' progress (see `src.utils.progress`).
+        decoder (callable): Optional fast path: objects are fetched as raw JSON and built
+            with this function (e.g. `DeploymentStatus.from_dict`) instead of client models.
+        **kwargs: Keyword arguments passed to `list_func` (e.g. field_selector).
+
+    Returns:
+        tuple: The object satisfying the condition and the elapsed time in seconds.
+
+    Raises:
+        WaitTimeoutError: If the condition does not hold within the timeout.
+        RolloutStalledError: If `progress.check` detects a stall first.
+    """
+    start_time = time.monotonic()
+    deadline = start_time + timeout
+    resource_version = None
+    requests = 0
+
+    while True:
+        if resource_version is None:
+            items, resource_version = _list(list_func, decoder, *args, **kwargs)
+            requests += 1
+            for item in items:
+                if progress is not None:
+                    progress.update(item)
+                if condition(item):
+                    elapsed = time.monotonic() - start_time
+                    logger.debug("Condition already met after list (%s requests, %.3fs).", requests, elapsed)
+                    return item, elapsed
+
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        if progress is not None:
+            progress.check()
+            remaining = min(remaining, progress.check_interval)
+
+        try:
+            requests += 1
+            for event_type, obj, resource_version in _watch(
+                list_func,
+                decoder,
+                *args,
+                resource_version=resource_version,
+                allow_watch_bookmarks=True,
+                timeout_seconds=max(1, int(remaining)),
+                _request_timeout=remaining + 5,
+                **kwargs,
+            ):
+                if obj is not None and event_type != "DELETED":
+                    if progress is not None:
+                        progress.update(obj)
+                    if condition(obj):
+                        elapsed = time.monotonic() - start_time
+                        logger.debug("Condition met via watch (%s requests, %.3fs).", requests, elapsed)
+                        return obj, elapsed
+                    if progress is not None:
+                        progress.check()
+                if time.monotonic() >= deadline:
+                    break
+        except ApiException as e:
+            if e.status != HTTP_STATUS_GONE:
+                raise
+            logger.info("Watch resourceVersion expired (410 Gone); relisting.")
+            resource_version = None
+
+    raise WaitTimeoutError(f"Condition not met within {timeout} seconds.")
+
+
+def wait_for_deployment(apps_api, name, namespace, condition, timeout, progress=None, fast_decode=False):
+    """
+    Block until `condition` holds for the named deployment.
+
+    Args:
+        apps_api (AppsV1Api): AppsV1Api client.
+        name (str): Name of the deployment.
+        namespace (str): Namespace of the deployment.
+        condition (callable): Predicate accepting a V1Deployment (DeploymentStatus with `fast_decode`).
+        timeout (float): Maximum time to wait in seconds.
+        progress (ProgressTracker): Optional tracker of the deployment's ready replicas.
+        fast_decode (bool): Decode the deployment from raw JSON into a DeploymentStatus
+            instead of a V1Deployment.
+
+    Returns:
+        tuple: The matching V1Deployment (DeploymentStatus with `fast_decode`) and the
+        elapsed time in seconds.
+
+    Raises:
+        WaitTimeoutError: If the condition does not hold within the timeout.
+        RolloutStalledError: If `progress` detects that the rollout stalled.
+    """
+    return watch_until(
+        apps_api.list_namespaced_deployment,
+        condition,
+        timeout,
+        namespace,
+        progress=progress,
+        decoder=DeploymentStatus.from_dict if fast_decode else None,
+        field_selector=f"metadata.name={name}",
+    )
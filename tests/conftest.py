@@ -1,34 +1,197 @@
+import os
 import pytest
 import time
-import logging
+from src.utils.config_util import get_settings
+from src.utils.event_collector import EventCollector
 from src.utils.k8s_client import KubernetesClient
+from src.utils.logging_util import get_logger, set_log_context
+from src.utils.manifests import ManifestApplier, load_manifests
+from src.utils.resource_sampler import ResourceSampler
+from src.utils.results_store import ResultsStore, cluster_name, git_sha
 
-# Configure global logging
-logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
-logger = logging.getLogger(__name__)
+logger = get_logger(__name__)
 
 @pytest.hookimpl(tryfirst=True, hookwrapper=True)
 def pytest_runtest_protocol(item):
     """
-    Hook to log the start, end, and duration of each test.
+    Hook to log the start, end, and duration of each test, tagging its log records with the scenario.
     """
-    logger.info(f"Starting test: {item.name}")
+    set_log_context(scenario=item.name)
+    logger.info("Starting test: %s", item.name)
     start_time = time.time()
     yield  # Execute the test
     end_time = time.time()
     duration = end_time - start_time
-    logger.info(f"Finished test: {item.name} in {duration:.3f} seconds.")
+    logger.info("Finished test: %s in %.3f seconds.", item.name, duration)
+    set_log_context(scenario=None)
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    """
+    Hook to keep each phase's report on the test item, so fixtures can tell whether the test passed.
+    """
+    outcome = yield
+    report = outcome.get_result()
+    setattr(item, f"rep_{report.when}", report)
+
+
+@pytest.fixture(scope="session")
+def results_run():
+    """
+    Fixture to open the results store and register this test session as a run.
+
+    Yields:
+        tuple: (ResultsStore, run ID).
+    """
+    settings = get_settings()
+    store = ResultsStore(settings.metrics.results_db)
+    run_id = store.start_run(cluster_name(settings), git_sha(), settings.k8s.config_mode)
+    set_log_context(run_id=run_id)
+    yield store, run_id
+    store.close()
+    logger.info("Results of run %s stored; compare with: python -m src.utils.results_store compare", run_id)
+
+
+@pytest.fixture(autouse=True)
+def scenario_metrics(results_run, kubernetes_client, request):
+    """
+    Fixture collecting the metrics of one scenario. Step functions add entries to the
+    returned dict; the scenario duration and the API calls and throttling it caused are
+    added automatically, and everything is appended to the results store if it passed.
+    """
+    store, run_id = results_run
+    stats_before = kubernetes_client.throttle_stats.as_dict()
+    start_time = time.time()
+    metrics = {}
+    yield metrics
+    report = getattr(request.node, "rep_call", None)
+    if report is None or not report.passed:
+        logger.info("Not storing metrics of %s: the scenario did not pass.", request.node.name)
+        return
+    metrics["scenario_seconds"] = time.time() - start_time
+    stats_after = kubernetes_client.throttle_stats.as_dict()
+    for name, value in stats_after.items():
+        metrics[f"api_{name}"] = value - stats_before[name]
+    store.record(run_id, request.node.name, metrics)
 
 
 @pytest.fixture(scope="module")
-def k8s_client():
+def kubernetes_client():
     """
-    Fixture to provide Kubernetes API clients dynamically.
+    Fixture to provide the shared KubernetesClient instance for a test module.
+    """
+    logger.info("Initializing Kubernetes client in '%s' mode.", get_settings().k8s.config_mode)
+    k8s = KubernetesClient()
+    yield k8s
+    logger.info("API client stats: %s", k8s.throttle_stats.as_dict())
+    k8s.close()
+
+
+@pytest.fixture(scope="module", autouse=True)
+def applied_manifests(request, kubernetes_client):
+    """
+    Fixture to apply the manifests a test module lists in its `MANIFESTS` (file names in
+    `[manifests].directory`) before the module, wait for their deployments, and delete
+    them again after it. Modules without a `MANIFESTS` list apply nothing.
+    """
+    settings = get_settings()
+    files = getattr(request.module, "MANIFESTS", None)
+    if not settings.manifests.enabled or not files:
+        yield None
+        return
+    applier = ManifestApplier(
+        kubernetes_client.get_dynamic_client(),
+        kubernetes_client.get_client("AppsV1Api"),
+        load_manifests(settings.manifests.directory, files),
+        field_manager=settings.manifests.field_manager,
+        max_workers=settings.manifests.max_workers,
+        namespace=settings.k8s.namespace,
+    )
+    applier.apply()
+    applier.wait_ready(settings.manifests.ready_timeout)
+    yield applier
+    if settings.manifests.teardown:
+        applier.delete()
+
+
+@pytest.fixture(scope="module")
+def event_collector(kubernetes_client):
+    """
+    Fixture to collect the Events of the test namespace and of nodes in the background.
+    """
+    settings = get_settings()
+    collector = EventCollector(
+        kubernetes_client.get_client("CoreV1Api"),
+        settings.k8s.namespace,
+        node_namespace=settings.events.node_namespace,
+        capacity=settings.events.capacity,
+        timeline_horizon=settings.events.timeline_horizon,
+    ).start()
+    yield collector
+    collector.stop()
+
+
+@pytest.fixture(autouse=True)
+def scenario_event_timeline(event_collector, request):
     """
-    config_file = "config/settings.toml"
-    logger.info(f"Initializing Kubernetes client with config file: {config_file}")
-    k8s = KubernetesClient(config_file=config_file)
+    Fixture to log and write the per-second event timeline of each scenario when it finishes.
+    """
+    start_time = time.time()
+    yield
+    output_dir = os.path.join(get_settings().metrics.output_dir, request.node.name)
+    timeline = event_collector.write_report(output_dir, since=start_time)
+    logger.info("Event timeline of %s:\n%s", request.node.name, timeline)
+
+
+@pytest.fixture(scope="module")
+def resource_sampler(kubernetes_client):
+    """
+    Fixture to sample node and pod usage (metrics.k8s.io) and the harness's own CPU and
+    memory in the background, or None if `[sampler].enabled` is false.
+    """
+    settings = get_settings()
+    if not settings.sampler.enabled:
+        yield None
+        return
+    sampler = ResourceSampler(
+        kubernetes_client.get_client("CustomObjectsApi"),
+        settings.k8s.namespace,
+        interval=settings.sampler.interval,
+        capacity=settings.sampler.capacity,
+        node_selector=settings.k8s.node_selector,
+        pod_selector=settings.k8s.pod_selector,
+        node_informer=kubernetes_client.get_informer("nodes"),
+    ).start()
+    yield sampler
+    sampler.stop()
 
+
+@pytest.fixture(autouse=True)
+def scenario_resources(resource_sampler, scenario_metrics, request):
+    """
+    Fixture to summarize the resource samples of each scenario when it finishes and add
+    them to its metrics.
+    """
+    if resource_sampler is None:
+        yield
+        return
+    start_time = time.time()
+    resource_sampler.sample()
+    yield
+    # Close the window with a sample so scenarios shorter than the interval are covered too.
+    resource_sampler.sample()
+    output_dir = os.path.join(get_settings().metrics.output_dir, request.node.name)
+    summary = resource_sampler.write_report(output_dir, since=start_time)
+    scenario_metrics.update(resource_sampler.metrics(since=start_time))
+    logger.info("Resource usage during %s:\n%s", request.node.name, summary)
+
+
+@pytest.fixture(scope="module")
+def k8s_client(kubernetes_client):
+    """
+    Fixture to provide Kubernetes API clients dynamically.
+    """
     def get_client(api_type):
         """
         Retrieve the specified Kubernetes API client.
@@ -39,9 +202,28 @@ def k8s_client():
         Returns:
             object: The requested Kubernetes API client instance.
         """
-        logger.debug(f"Fetching client for API type: {api_type}")
-        return k8s.get_client(api_type)
+        logger.debug("Fetching client for API type: %s", api_type)
+        return kubernetes_client.get_client(api_type)
 
     return get_client
 
 
+@pytest.fixture(scope="module")
+def k8s_informer(kubernetes_client):
+    """
+    Fixture to provide shared informer caches (nodes, pods) dynamically.
+    """
+    def get_informer(resource):
+        """
+        Retrieve the shared informer for the specified resource.
+
+        Args:
+            resource (str): Resource to cache ("nodes" or "pods").
+
+        Returns:
+            Informer: The started informer for the resource.
+        """
+        logger.debug("Fetching informer for resource: %s", resource)
+        return kubernetes_client.get_informer(resource)
+
+    return get_informer
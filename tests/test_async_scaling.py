@@ -0,0 +1,148 @@
+import asyncio
+import functools
+from pytest_bdd import given, when, then, scenarios, parsers
+from src.utils.async_k8s_client import AsyncKubernetesClient, scale_deployments, watch_until
+from src.utils.logging_util import get_logger
+from src.utils.config_util import get_settings
+from src.utils.records import read_deployment_status
+from src.utils.waiter import deployment_scaled_to
+
+logger = get_logger(__name__)
+# Shared settings, parsed once per session
+SETTINGS = get_settings()
+# Link the Gherkin feature file
+scenarios("../features/async_scaling.feature")
+# Manifests the applied_manifests fixture creates for this module
+MANIFESTS = ["scale-test-cc.yaml", "scale-test.yaml", "3-containers.yaml"]
+
+
+def run_async(kubernetes_client, coroutine_func):
+    """Run `coroutine_func(k8s)` on a fresh event loop with an async client of this module's cluster."""
+    async def run():
+        # In fake mode the async client shares this module's simulated cluster.
+        async with AsyncKubernetesClient(fake_server=kubernetes_client.fake_server) as k8s:
+            return await coroutine_func(k8s)
+
+    return asyncio.run(run())
+
+
+@given("a Kubernetes cluster is running")
+def verify_cluster_running(k8s_client):
+    """Verify that the Kubernetes cluster is accessible."""
+    logger.info("Verifying Kubernetes cluster is running...")
+    assert k8s_client is not None, "Kubernetes client could not be initialized."
+    logger.info("Kubernetes cluster verification successful.")
+
+
+@given(parsers.parse('deployments named "{first}" and "{second}" exist'), target_fixture="original_replicas")
+def verify_deployments_exist(k8s_client, first, second):
+    """Ensure both deployments exist and remember their replica counts."""
+    namespace = SETTINGS.k8s.namespace
+    apps_api = k8s_client("AppsV1Api")
+    original_replicas = {}
+    for deployment_name in (first, second):
+        status = read_deployment_status(apps_api, deployment_name, namespace, fast_decode=SETTINGS.k8s.fast_decode)
+        assert status is not None, f"Deployment '{deployment_name}' does not exist in namespace '{namespace}'."
+        original_replicas[deployment_name] = status.spec_replicas
+    logger.info("Deployments exist with replicas %s.", original_replicas)
+    return original_replicas
+
+
+@when(
+    parsers.parse(
+        'I scale "{first}" to {first_replicas:d} replicas and "{second}" to {second_replicas:d} replicas '
+        "with the async client"
+    ),
+    target_fixture="scaled",
+)
+def scale_concurrently(kubernetes_client, scenario_metrics, first, first_replicas, second, second_replicas):
+    """Scale both deployments from one event loop and wait for each of them concurrently."""
+    namespace = SETTINGS.k8s.namespace
+    targets = [(namespace, first, first_replicas), (namespace, second, second_replicas)]
+
+    async def scale(k8s):
+        return await scale_deployments(
+            k8s.get_client("AppsV1Api"), targets, deployment_scaled_to, SETTINGS.scaling.timeout
+        )
+
+    elapsed = run_async(kubernetes_client, scale)
+    scenario_metrics["async_scale_up_seconds"] = max(elapsed)
+    return {deployment_name: replicas for _, deployment_name, replicas in targets}
+
+
+@then("both deployments should have all replicas available")
+def verify_scaled(k8s_client, scaled):
+    """Verify that every deployment reports its target replicas as available."""
+    namespace = SETTINGS.k8s.namespace
+    apps_api = k8s_client("AppsV1Api")
+    for deployment_name, replicas in scaled.items():
+        status = read_deployment_status(apps_api, deployment_name, namespace, fast_decode=SETTINGS.k8s.fast_decode)
+        assert status.available_replicas == replicas, (
+            f"Deployment '{deployment_name}' has {status.available_replicas} of {replicas} replicas available."
+        )
+
+
+@when(
+    parsers.parse('I wait with the async client for "{deployment_name}" to scale to {replicas:d} replicas '
+                  "after its watch expired"),
+    target_fixture="expired_wait",
+)
+def wait_after_expired_watch(kubernetes_client, deployment_name, replicas):
+    """Scale the deployment right after the wait's first list and expire that list's resourceVersion."""
+    namespace = SETTINGS.k8s.namespace
+    fake_cluster = kubernetes_client.fake_server.cluster if kubernetes_client.fake_server is not None else None
+    lists = []
+
+    async def wait(k8s):
+        apps_api = k8s.get_client("AppsV1Api")
+
+        @functools.wraps(apps_api.list_namespaced_deployment)
+        async def list_deployments(*args, **kwargs):
+            result = await apps_api.list_namespaced_deployment(*args, **kwargs)
+            if kwargs.get("watch"):
+                return result
+            lists.append(result.metadata.resource_version)
+            if len(lists) == 1:
+                await apps_api.patch_namespaced_deployment_scale(
+                    name=deployment_name, namespace=namespace, body={"spec": {"replicas": replicas}}
+                )
+                if fake_cluster is not None:
+                    # Drop the watch history, so resuming from the listed version gets 410 Gone.
+                    fake_cluster.compact()
+                else:
+                    result.metadata.resource_version = "1"  # Long compacted on a live cluster
+            return result
+
+        return await watch_until(
+            list_deployments,
+            deployment_scaled_to(replicas),
+            SETTINGS.scaling.timeout,
+            namespace,
+            field_selector=f"metadata.name={deployment_name}",
+        )
+
+    deployment, elapsed = run_async(kubernetes_client, wait)
+    logger.info("Async wait for '%s' listed %s times and took %.3f seconds.", deployment_name, len(lists), elapsed)
+    return {"deployment": deployment, "lists": lists}
+
+
+@then(parsers.parse("the async wait should have relisted and seen {replicas:d} available replicas"))
+def verify_relisted(expired_wait, replicas):
+    """Verify that the expired watch was recovered by a relist rather than ending the wait."""
+    assert len(expired_wait["lists"]) >= 2, "The async wait did not relist after its watch expired."
+    available = expired_wait["deployment"].status.available_replicas
+    assert available == replicas, f"The async wait returned {available} available replicas, not {replicas}."
+
+
+@then("I scale both deployments back with the async client")
+def restore_replicas(kubernetes_client, original_replicas):
+    """Scale the deployments back to the replica counts they had before the scenario."""
+    namespace = SETTINGS.k8s.namespace
+    targets = [(namespace, deployment_name, replicas) for deployment_name, replicas in original_replicas.items()]
+
+    async def scale(k8s):
+        return await scale_deployments(
+            k8s.get_client("AppsV1Api"), targets, deployment_scaled_to, SETTINGS.scaling.timeout
+        )
+
+    run_async(kubernetes_client, scale)
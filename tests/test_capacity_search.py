@@ -0,0 +1,85 @@
+import os
+from pytest_bdd import given, when, then, scenarios, parsers
+from src.utils.capacity import CapacitySearch, measure_scale_up
+from src.utils.logging_util import get_logger
+from src.utils.config_util import get_settings
+from src.utils.records import read_deployment_status
+
+logger = get_logger(__name__)
+# Shared settings, parsed once per session
+SETTINGS = get_settings()
+# Link the Gherkin feature file
+scenarios("../features/capacity_search.feature")
+# Manifests the applied_manifests fixture creates for this module
+MANIFESTS = ["scale-test-cc.yaml", "scale-test.yaml"]
+
+
+@given("a Kubernetes cluster is running")
+def verify_cluster_running(k8s_client):
+    """Verify that the Kubernetes cluster is accessible."""
+    logger.info("Verifying Kubernetes cluster is running...")
+    assert k8s_client is not None, "Kubernetes client could not be initialized."
+    logger.info("Kubernetes cluster verification successful.")
+
+
+@given('a deployment named "scale-test" exists in the "scale-test" namespace')
+def verify_deployment_exists(k8s_client):
+    """Ensure the deployment exists."""
+    namespace = SETTINGS.k8s.namespace
+    deployment_name = SETTINGS.k8s.deployment_name
+
+    # Retrieve AppsV1Api client
+    apps_api = k8s_client("AppsV1Api")
+    logger.info("Checking if deployment '%s' exists in namespace '%s'...", deployment_name, namespace)
+    response = read_deployment_status(apps_api, deployment_name, namespace, fast_decode=SETTINGS.k8s.fast_decode)
+    assert response is not None, f"Deployment '{deployment_name}' does not exist in namespace '{namespace}'."
+    logger.info("Deployment '%s' exists.", deployment_name)
+
+
+@when(
+    parsers.parse(
+        "I search for the largest replica count between {low:d} and {high:d} with a ready p99 under {slo:d} seconds"
+    ),
+    target_fixture="capacity_search",
+)
+def search_capacity(k8s_client, k8s_informer, low, high, slo):
+    """Bisect the replica range, scaling up from the baseline once per trial."""
+    namespace = SETTINGS.k8s.namespace
+    deployment_name = SETTINGS.k8s.deployment_name
+    scaling = SETTINGS.scaling
+    apps_api = k8s_client("AppsV1Api")
+    pod_informer = k8s_informer("pods")
+
+    def trial(replicas):
+        return measure_scale_up(
+            apps_api,
+            pod_informer,
+            deployment_name,
+            namespace,
+            replicas,
+            scaling.timeout,
+            scaling.capacity_baseline,
+            stall_window=scaling.stall_window,
+            fast_decode=SETTINGS.k8s.fast_decode,
+        )
+
+    search = CapacitySearch(trial, slo, low, high, resolution=scaling.capacity_resolution)
+    search.run()
+    return search
+
+
+@then(parsers.parse("the deployment should sustain at least {replicas:d} replicas within the SLO"))
+def verify_capacity(capacity_search, replicas):
+    """Verify that the search found a capacity of at least the given replica count."""
+    assert capacity_search.capacity is not None and capacity_search.capacity >= replicas, (
+        f"Capacity within the SLO is {capacity_search.capacity}, expected at least {replicas} replicas."
+    )
+
+
+@then("I log the capacity search trials")
+def log_capacity(capacity_search, scenario_metrics, request):
+    """Log the trials and the capacity, and record the capacity in the results store."""
+    output_dir = os.path.join(SETTINGS.metrics.output_dir, request.node.name)
+    text = capacity_search.write_report(output_dir)
+    scenario_metrics.update(capacity_search.metrics())
+    logger.info("Capacity search for deployment '%s':\n%s", SETTINGS.k8s.deployment_name, text)
@@ -0,0 +1,73 @@
+import os
+from pytest_bdd import given, when, then, scenarios, parsers
+from src.utils.load_driver import LoadDriver, load_deployment
+from src.utils.logging_util import get_logger
+from src.utils.config_util import get_settings
+
+logger = get_logger(__name__)
+# Shared settings, parsed once per session
+SETTINGS = get_settings()
+# Link the Gherkin feature file
+scenarios("../features/concurrent_scaling.feature")
+# Manifests the applied_manifests fixture creates for this module (the load driver applies the Deployment)
+MANIFESTS = ["scale-test-cc.yaml"]
+
+
+@given("a Kubernetes cluster is running")
+def verify_cluster_running(k8s_client):
+    """Verify that the Kubernetes cluster is accessible."""
+    logger.info("Verifying Kubernetes cluster is running...")
+    assert k8s_client is not None, "Kubernetes client could not be initialized."
+    logger.info("Kubernetes cluster verification successful.")
+
+
+@when(
+    parsers.re(
+        r'(?P<workers>\d+) load workers each scale a clone of "(?P<deployment_name>[^"]+)" to (?P<replicas>\d+) '
+        r"replicas (?:at once|staggered by (?P<stagger>\d+(?:\.\d+)?) seconds)"
+    ),
+    converters={"workers": int, "replicas": int, "stagger": lambda value: float(value) if value else 0.0},
+    target_fixture="load_driver",
+)
+def run_load_workers(kubernetes_client, workers, deployment_name, replicas, stagger):
+    """Start one worker process per shard and wait until every shard has scaled up."""
+    load = SETTINGS.load
+    manifest = load_deployment(load.manifest)
+    assert manifest["metadata"]["name"] == deployment_name, (
+        f"{load.manifest} defines deployment '{manifest['metadata']['name']}', not '{deployment_name}'."
+    )
+    # In fake mode the workers share this module's simulated cluster.
+    fake_url = kubernetes_client.fake_server.url if kubernetes_client.fake_server is not None else None
+    driver = LoadDriver(
+        manifest,
+        workers,
+        replicas,
+        stagger=stagger,
+        timeout=SETTINGS.scaling.timeout,
+        namespace_prefix=load.namespace_prefix,
+        fake_url=fake_url,
+        teardown=load.teardown,
+    )
+    driver.run()
+    return driver
+
+
+@then("every load worker should have finished without errors")
+def verify_load_workers(load_driver):
+    """Verify that every shard scaled up and reported its latencies."""
+    failed = [f"{result['namespace']}: {result['error']}" for result in load_driver.shards if result["error"]]
+    assert not failed, f"{len(failed)} load worker(s) failed: {'; '.join(failed)}"
+    for result in load_driver.shards:
+        assert result["existing"] + result["pods"] >= load_driver.replicas, (
+            f"Shard {result['namespace']} reported {result['pods']} new pods on top of {result['existing']} "
+            f"for {load_driver.replicas} replicas."
+        )
+
+
+@then("I log the merged pod latency distributions")
+def log_merged_latencies(load_driver, scenario_metrics, request):
+    """Log the latency percentiles merged across shards and write the per-shard CSV."""
+    output_dir = os.path.join(SETTINGS.metrics.output_dir, request.node.name)
+    text = load_driver.write_report(output_dir)
+    scenario_metrics.update(load_driver.metrics())
+    logger.info("Concurrent scaling across %s shards:\n%s", len(load_driver.shards), text)
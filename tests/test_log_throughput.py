@@ -0,0 +1,96 @@
+import os
+from pytest_bdd import given, when, then, scenarios, parsers
+from src.utils.logging_util import get_logger
+from src.utils.config_util import get_settings
+from src.utils.list_util import iter_pods
+from src.utils.log_throughput import LogThroughputCollector
+from src.utils.waiter import WaitTimeoutError, deployment_scaled_to, wait_for_deployment
+
+logger = get_logger(__name__)
+# Shared settings, parsed once per session
+SETTINGS = get_settings()
+# Link the Gherkin feature file
+scenarios("../features/log_throughput.feature")
+# Manifests the applied_manifests fixture creates for this module
+MANIFESTS = ["alot-of-logs.yaml"]
+
+
+@given("a Kubernetes cluster is running")
+def verify_cluster_running(k8s_client):
+    """Verify that the Kubernetes cluster is accessible."""
+    logger.info("Verifying Kubernetes cluster is running...")
+    assert k8s_client is not None, "Kubernetes client could not be initialized."
+    logger.info("Kubernetes cluster verification successful.")
+
+
+@given(
+    parsers.parse('a deployment named "{deployment_name}" exists in the "{namespace}" namespace'),
+    target_fixture="log_namespace",
+)
+def verify_deployment_exists(k8s_client, deployment_name, namespace):
+    """Ensure the deployment exists and pass its namespace on to the following steps."""
+    apps_api = k8s_client("AppsV1Api")
+    logger.info("Checking if deployment '%s' exists in namespace '%s'...", deployment_name, namespace)
+    response = apps_api.read_namespaced_deployment(name=deployment_name, namespace=namespace)
+    assert response is not None, f"Deployment '{deployment_name}' does not exist in namespace '{namespace}'."
+    logger.info("Deployment '%s' exists.", deployment_name)
+    return namespace
+
+
+@when(parsers.parse('I scale "{deployment_name}" to {replicas:d} replicas'), target_fixture="log_pods")
+def scale_deployment(k8s_client, scenario_metrics, log_namespace, deployment_name, replicas):
+    """Scale the logging deployment and return the names of its running pods."""
+    namespace = log_namespace
+    timeout = SETTINGS.scaling.timeout
+    apps_api = k8s_client("AppsV1Api")
+    logger.info("Scaling deployment '%s' in namespace '%s' to %s replicas.", deployment_name, namespace, replicas)
+    apps_api.patch_namespaced_deployment_scale(
+        name=deployment_name, namespace=namespace, body={"spec": {"replicas": replicas}}
+    )
+    try:
+        deployment, elapsed = wait_for_deployment(
+            apps_api, deployment_name, namespace, deployment_scaled_to(replicas), timeout
+        )
+    except WaitTimeoutError:
+        raise WaitTimeoutError(
+            f"Deployment '{deployment_name}' did not scale to {replicas} replicas within {timeout} seconds."
+        ) from None
+    logger.info("Deployment '%s' scaled to %s replicas in %.3f seconds.", deployment_name, replicas, elapsed)
+    scenario_metrics["scale_up_seconds"] = elapsed
+
+    selector = ",".join(f"{key}={value}" for key, value in deployment.spec.selector.match_labels.items())
+    return [
+        pod.metadata.name
+        for pod in iter_pods(k8s_client("CoreV1Api"), namespace, label_selector=selector)
+        if pod.status.phase == "Running" and not pod.metadata.deletion_timestamp
+    ]
+
+
+@when(parsers.parse('I stream the logs of every "{deployment_name}" pod for up to {duration:d} seconds'),
+      target_fixture="log_collector")
+def stream_logs(k8s_client, log_namespace, log_pods, deployment_name, duration):
+    """Follow the logs of all pods concurrently, counting bytes and lines as they arrive."""
+    logs = SETTINGS.logs
+    collector = LogThroughputCollector(
+        k8s_client("CoreV1Api"), log_namespace, max_workers=logs.max_workers, chunk_size=logs.chunk_size
+    )
+    logger.info("Streaming logs of %s '%s' pods for up to %s seconds...", len(log_pods), deployment_name, duration)
+    collector.run(log_pods, duration, logs.idle_timeout)
+    return collector
+
+
+@then("every pod should have produced log output")
+def verify_log_output(log_collector):
+    """Verify that every stream delivered data without errors."""
+    silent = [stats.pod for stats in log_collector.stats if stats.bytes == 0 or stats.error]
+    assert log_collector.stats, "No running pods to stream logs from."
+    assert not silent, f"{len(silent)} pod(s) produced no log output: {', '.join(silent[:5])}"
+
+
+@then("I log the per-pod and total log throughput")
+def log_throughput(log_collector, scenario_metrics, request):
+    """Log the aggregate and per-pod ingest throughput and write the per-pod CSV."""
+    output_dir = os.path.join(SETTINGS.metrics.output_dir, request.node.name)
+    text = log_collector.write_report(output_dir)
+    scenario_metrics.update(log_collector.metrics())
+    logger.info("Log ingest throughput:\n%s", text)
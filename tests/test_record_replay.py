@@ -0,0 +1,88 @@
+import os
+from pytest_bdd import given, when, then, scenarios, parsers
+from src.utils.api_recording import ApiRecording, summarize
+from src.utils.k8s_client import KubernetesClient
+from src.utils.list_util import iter_pods
+from src.utils.logging_util import get_logger
+from src.utils.config_util import get_settings
+from src.utils.waiter import deployment_scaled_to, wait_for_deployment
+
+logger = get_logger(__name__)
+# Shared settings, parsed once per session
+SETTINGS = get_settings()
+# Link the Gherkin feature file
+scenarios("../features/record_replay.feature")
+# Manifests the applied_manifests fixture creates for this module
+MANIFESTS = ["scale-test-cc.yaml", "scale-test.yaml"]
+
+
+def scale_and_list_pods(k8s, deployment_name, replicas):
+    """Scale a deployment, wait for it and return its available replicas and pod names."""
+    namespace = SETTINGS.k8s.namespace
+    apps_api = k8s.get_client("AppsV1Api")
+    apps_api.patch_namespaced_deployment_scale(
+        name=deployment_name, namespace=namespace, body={"spec": {"replicas": replicas}}
+    )
+    deployment, _ = wait_for_deployment(
+        apps_api, deployment_name, namespace, deployment_scaled_to(replicas), SETTINGS.scaling.timeout
+    )
+    selector = ",".join(f"{key}={value}" for key, value in deployment.spec.selector.match_labels.items())
+    pods = sorted(pod.metadata.name for pod in iter_pods(k8s.get_client("CoreV1Api"), namespace, label_selector=selector))
+    return {"available": deployment.status.available_replicas, "pods": pods}
+
+
+@given("a Kubernetes cluster is running")
+def verify_cluster_running(k8s_client):
+    """Verify that the Kubernetes cluster is accessible."""
+    logger.info("Verifying Kubernetes cluster is running...")
+    assert k8s_client is not None, "Kubernetes client could not be initialized."
+    logger.info("Kubernetes cluster verification successful.")
+
+
+@when(parsers.parse('I record the API traffic of scaling "{deployment_name}" to {replicas:d} replicas'),
+      target_fixture="recording")
+def record_scale_up(kubernetes_client, request, deployment_name, replicas):
+    """Scale the deployment through a client that records its API traffic."""
+    path = os.path.join(SETTINGS.metrics.output_dir, request.node.name, "api-recording.k8srec")
+    # In fake mode the recording client talks to this module's simulated cluster.
+    fake_url = kubernetes_client.fake_server.url if kubernetes_client.fake_server is not None else None
+    k8s = KubernetesClient(fake_url=fake_url, record=path)
+    try:
+        recorded = scale_and_list_pods(k8s, deployment_name, replicas)
+    finally:
+        k8s.close()
+    logger.info("Recorded %s pods of '%s' in %s.", len(recorded["pods"]), deployment_name, path)
+    return {"path": path, "deployment_name": deployment_name, "replicas": replicas, "recorded": recorded}
+
+
+@when("I replay the recording", target_fixture="replay")
+def replay_scale_up(recording):
+    """Repeat the recorded calls against a client served from the recording."""
+    k8s = KubernetesClient(replay=recording["path"])
+    try:
+        replayed = scale_and_list_pods(k8s, recording["deployment_name"], recording["replicas"])
+    finally:
+        k8s.close()
+    return {"replayed": replayed, "requests": k8s.replay.requests, "misses": k8s.replay.misses}
+
+
+@then("the replay should report the recorded deployment and pods")
+def verify_replayed_state(recording, replay):
+    """Verify that the replayed responses describe the recorded deployment and pods."""
+    assert replay["replayed"]["available"] == recording["replicas"], (
+        f"Replay reported {replay['replayed']['available']} available replicas, expected {recording['replicas']}."
+    )
+    assert replay["replayed"]["pods"] == recording["recorded"]["pods"], "Replayed pods differ from the recorded pods."
+
+
+@then("every replayed request should have been recorded")
+def verify_no_misses(recording, replay, scenario_metrics):
+    """Verify that the replay found a recorded response for every request."""
+    assert replay["misses"] == 0, f"{replay['misses']} of {replay['requests']} replayed requests were not recorded."
+    scenario_metrics["replay_requests_count"] = replay["requests"]
+    scenario_metrics["recording_bytes_count"] = os.path.getsize(recording["path"])
+    recorded = ApiRecording(recording["path"])
+    try:
+        logger.info("Recorded API traffic:\n%s", summarize(recorded))
+    finally:
+        recorded.close()
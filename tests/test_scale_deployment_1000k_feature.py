@@ -1,14 +1,21 @@
+import os
+import time
 import pytest
-from pytest_bdd import given, when, then, scenarios
+from pytest_bdd import given, when, then, scenarios, parsers
 from src.utils.logging_util import get_logger
-import time
-from src.utils.config_util import load_config
+from src.utils.config_util import get_settings
+from src.utils.pod_lifecycle import PodLifecycleCollector, wait_for_ready_pods
+from src.utils.progress import ProgressTracker, RolloutStalledError
+from src.utils.records import read_deployment_status
+from src.utils.waiter import WaitTimeoutError, deployment_scaled_to, wait_for_deployment
 
 logger = get_logger(__name__)
-# Load configuration once at module level
-CONFIG = load_config()
+# Shared settings, parsed once per session
+SETTINGS = get_settings()
 # Link the Gherkin feature file
 scenarios("../features/scale_deployment.feature")
+# Manifests the applied_manifests fixture creates for this module
+MANIFESTS = ["scale-test-cc.yaml", "scale-test.yaml"]
 
 
 @given("a Kubernetes cluster is running")
@@ -22,74 +29,143 @@ def verify_cluster_running(k8s_client):
 @given('a deployment named "scale-test" exists')
 def verify_deployment_exists(k8s_client):
     """Ensure the deployment exists in the specified namespace."""
-    namespace = CONFIG["k8s"]["namespace"]
-    deployment_name = CONFIG["k8s"]["deployment_name"]
+    namespace = SETTINGS.k8s.namespace
+    deployment_name = SETTINGS.k8s.deployment_name
 
     # Retrieve AppsV1Api client
     apps_api = k8s_client("AppsV1Api")
-    logger.info(f"Checking if deployment '{deployment_name}' exists in namespace '{namespace}'...")
-    response = apps_api.read_namespaced_deployment(name=deployment_name, namespace=namespace)
+    logger.info("Checking if deployment '%s' exists in namespace '%s'...", deployment_name, namespace)
+    response = read_deployment_status(apps_api, deployment_name, namespace, fast_decode=SETTINGS.k8s.fast_decode)
     assert response is not None, f"Deployment '{deployment_name}' does not exist in namespace '{namespace}'."
-    logger.info(f"Deployment '{deployment_name}' exists.")
+    logger.info("Deployment '%s' exists.", deployment_name)
+
+
+@given(parsers.parse('the deployment "scale-test" is scaled to {replicas:d} replicas'), target_fixture="baseline_pods")
+def scale_to_baseline(k8s_client, k8s_informer, replicas):
+    """Scale the deployment to a fixed baseline, so every scenario measures a scale-up from the same state."""
+    namespace = SETTINGS.k8s.namespace
+    deployment_name = SETTINGS.k8s.deployment_name
+    timeout = SETTINGS.scaling.timeout
+
+    # Retrieve AppsV1Api client
+    apps_api = k8s_client("AppsV1Api")
+    logger.info("Scaling deployment '%s' to its baseline of %s replicas.", deployment_name, replicas)
+    apps_api.patch_namespaced_deployment_scale(
+        name=deployment_name, namespace=namespace, body={"spec": {"replicas": replicas}}
+    )
+    wait_for_deployment(
+        apps_api,
+        deployment_name,
+        namespace,
+        deployment_scaled_to(replicas),
+        timeout,
+        fast_decode=SETTINGS.k8s.fast_decode,
+    )
+    pod_informer = k8s_informer("pods")
+    pods = wait_for_ready_pods(pod_informer, deployment_name, replicas, timeout)
+    assert pods is not None, f"The pod informer did not observe {replicas} ready '{deployment_name}' pods."
+    return {pod_informer.key_func(pod) for pod in pods}
 
 
-@when('I scale "scale-test" to 1000 replicas')
-def scale_deployment_to_1000(k8s_client):
-    """Scale the deployment to 1000 replicas and monitor the progress."""
-    namespace = CONFIG["k8s"]["namespace"]
-    deployment_name = CONFIG["k8s"]["deployment_name"]
-    replicas = 1000
-    timeout = CONFIG["scaling"]["timeout"]  # Timeout in seconds
-    interval = 10  # Polling interval in seconds
+@when(parsers.parse('I scale "scale-test" to {replicas:d} replicas'), target_fixture="scale_started")
+def scale_deployment(k8s_client, scenario_metrics, request, replicas):
+    """Scale the deployment to the given number of replicas and monitor the progress."""
+    namespace = SETTINGS.k8s.namespace
+    deployment_name = SETTINGS.k8s.deployment_name
+    timeout = SETTINGS.scaling.timeout  # Timeout in seconds
 
     # Retrieve AppsV1Api client
     apps_api = k8s_client("AppsV1Api")
-    logger.info(f"Scaling deployment '{deployment_name}' in namespace '{namespace}' to {replicas} replicas.")
+    logger.info("Scaling deployment '%s' in namespace '%s' to %s replicas.", deployment_name, namespace, replicas)
+    progress = ProgressTracker(
+        deployment_name,
+        replicas,
+        stall_window=SETTINGS.scaling.stall_window,
+        rate_window=SETTINGS.scaling.rate_window,
+    )
     body = {"spec": {"replicas": replicas}}
+    scale_started = time.time()
     apps_api.patch_namespaced_deployment_scale(name=deployment_name, namespace=namespace, body=body)
 
-    logger.info(f"Waiting for deployment '{deployment_name}' to reach {replicas} replicas...")
-    start_time = time.time()
-    while time.time() - start_time < timeout:
-        response = apps_api.read_namespaced_deployment(name=deployment_name, namespace=namespace)
-        logger.debug(f"Current replicas: {response.status.replicas}, Available replicas: {response.status.available_replicas}")
-        if (
-            response.status.replicas == replicas
-            and response.status.available_replicas == replicas
-        ):
-            logger.info(f"Deployment '{deployment_name}' successfully scaled to {replicas} replicas.")
-            return
-        time.sleep(interval)
-
-    logger.error(f"Deployment '{deployment_name}' did not scale to {replicas} replicas within {timeout} seconds.")
-    raise RuntimeError(f"Deployment '{deployment_name}' did not scale to {replicas} replicas within {timeout} seconds.")
-
-
-@then("the deployment should have exactly 1000 replicas")
-def verify_replicas(k8s_client):
+    logger.info("Waiting for deployment '%s' to reach %s replicas...", deployment_name, replicas)
+    output_dir = os.path.join(SETTINGS.metrics.output_dir, request.node.name)
+    try:
+        _, elapsed = wait_for_deployment(
+            apps_api,
+            deployment_name,
+            namespace,
+            deployment_scaled_to(replicas),
+            timeout,
+            progress=progress,
+            fast_decode=SETTINGS.k8s.fast_decode,
+        )
+    except RolloutStalledError:
+        raise
+    except WaitTimeoutError:
+        logger.error(
+            "Deployment '%s' did not scale to %s replicas within %s seconds.", deployment_name, replicas, timeout
+        )
+        raise WaitTimeoutError(
+            f"Deployment '{deployment_name}' did not scale to {replicas} replicas within {timeout} seconds."
+        ) from None
+    finally:
+        # Keep the rollout curve of failed scale-ups too; it shows where they stalled.
+        try:
+            summary = progress.write_report(output_dir)
+        except OSError as e:
+            # Do not replace the wait's error with a report failure.
+            logger.warning("Could not write the rollout report to %s: %s", output_dir, e)
+            summary = progress.format_summary()
+    logger.info(
+        "Deployment '%s' successfully scaled to %s replicas in %.3f seconds.", deployment_name, replicas, elapsed
+    )
+    logger.info("Rollout progress of deployment '%s':\n%s", deployment_name, summary)
+    scenario_metrics["scale_up_seconds"] = elapsed
+    scenario_metrics.update(progress.metrics())
+    return scale_started
+
+
+@then(parsers.parse("the deployment should have exactly {replicas:d} replicas"))
+def verify_replicas(k8s_client, replicas):
     """Verify that the deployment has scaled to the desired number of replicas."""
-    namespace = CONFIG["k8s"]["namespace"]
-    deployment_name = CONFIG["k8s"]["deployment_name"]
+    namespace = SETTINGS.k8s.namespace
+    deployment_name = SETTINGS.k8s.deployment_name
 
     # Retrieve AppsV1Api client
     apps_api = k8s_client("AppsV1Api")
-    logger.info(f"Verifying deployment '{deployment_name}' has exactly 1000 replicas...")
-    response = apps_api.read_namespaced_deployment(name=deployment_name, namespace=namespace)
-    assert response.status.replicas == 1000, f"Expected 1000 replicas but got {response.status.replicas}."
-    logger.info(f"Deployment '{deployment_name}' has the correct number of replicas: {response.status.replicas}.")
+    logger.info("Verifying deployment '%s' has exactly %s replicas...", deployment_name, replicas)
+    response = read_deployment_status(apps_api, deployment_name, namespace, fast_decode=SETTINGS.k8s.fast_decode)
+    assert response.replicas == replicas, f"Expected {replicas} replicas but got {response.replicas}."
+    logger.info("Deployment '%s' has the correct number of replicas: %s.", deployment_name, response.replicas)
 
 
 @then("all replicas should be running and available")
-def verify_available_replicas(k8s_client):
+def verify_available_replicas(k8s_client, k8s_informer, scenario_metrics, request, scale_started, baseline_pods):
     """Verify that all replicas are running and available."""
-    namespace = CONFIG["k8s"]["namespace"]
-    deployment_name = CONFIG["k8s"]["deployment_name"]
+    namespace = SETTINGS.k8s.namespace
+    deployment_name = SETTINGS.k8s.deployment_name
 
     # Retrieve AppsV1Api client
     apps_api = k8s_client("AppsV1Api")
-    logger.info(f"Checking if all replicas for deployment '{deployment_name}' are running and available...")
-    response = apps_api.read_namespaced_deployment(name=deployment_name, namespace=namespace)
-    assert response.status.available_replicas == 1000, (
-        f"Not all replicas are available. Only {response.status.available_replicas} are available."
+    logger.info("Checking if all replicas for deployment '%s' are running and available...", deployment_name)
+    response = read_deployment_status(apps_api, deployment_name, namespace, fast_decode=SETTINGS.k8s.fast_decode)
+    assert response.available_replicas == response.spec_replicas, (
+        f"Not all replicas are available. Only {response.available_replicas} are available."
+    )
+    logger.info("All replicas for deployment '%s' are running and available.", deployment_name)
+
+    # Wait for the informer too, so the lifecycle report covers every pod the scale-up created
+    # and none of the baseline pods.
+    pod_informer = k8s_informer("pods")
+    pods = wait_for_ready_pods(
+        pod_informer, deployment_name, response.spec_replicas, SETTINGS.scaling.timeout, since=scale_started
+    )
+    assert pods is not None, (
+        f"The pod informer did not observe {response.spec_replicas} ready '{deployment_name}' pods."
     )
-    logger.info(f"All replicas for deployment '{deployment_name}' are running and available.")
+    pods = [pod for pod in pods if pod_informer.key_func(pod) not in baseline_pods]
+    output_dir = os.path.join(SETTINGS.metrics.output_dir, request.node.name)
+    collector = PodLifecycleCollector(pods)
+    table = collector.write_report(output_dir)
+    scenario_metrics.update(collector.metrics())
+    logger.info("Pod lifecycle latencies for deployment '%s':\n%s", deployment_name, table)
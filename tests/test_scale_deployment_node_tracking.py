@@ -1,13 +1,20 @@
-import time
-from pytest_bdd import given, when, then, scenarios
+import os
+from pytest_bdd import given, when, then, scenarios, parsers
 from src.utils.logging_util import get_logger
-from src.utils.config_util import load_config
+from src.utils.config_util import get_settings
+from src.utils.node_tracking import NodeProvisioningTracker
+from src.utils.pod_lifecycle import PodLifecycleCollector, wait_for_ready_pods
+from src.utils.progress import ProgressTracker, RolloutStalledError
+from src.utils.records import read_deployment_status
+from src.utils.waiter import WaitTimeoutError, deployment_scaled_to, wait_for_deployment
 
 logger = get_logger(__name__)
-# Load configuration once at module level
-CONFIG = load_config()
+# Shared settings, parsed once per session
+SETTINGS = get_settings()
 # Link the Gherkin feature file
 scenarios("../features/scale_deployment_node_tracking.feature")
+# Manifests the applied_manifests fixture creates for this module
+MANIFESTS = ["scale-test-cc.yaml", "scale-test.yaml"]
 
 
 @given("a Kubernetes cluster is running")
@@ -21,89 +28,107 @@ def verify_cluster_running(k8s_client):
 @given('a deployment named "scale-test" exists in the "scale-test" namespace')
 def verify_deployment_exists(k8s_client):
     """Ensure the deployment exists."""
-    namespace = CONFIG["k8s"]["namespace"]
-    deployment_name = CONFIG["k8s"]["deployment_name"]
+    namespace = SETTINGS.k8s.namespace
+    deployment_name = SETTINGS.k8s.deployment_name
 
     # Retrieve AppsV1Api client
     apps_api = k8s_client("AppsV1Api")
-    logger.info(f"Checking if deployment '{deployment_name}' exists in namespace '{namespace}'...")
-    response = apps_api.read_namespaced_deployment(name=deployment_name, namespace=namespace)
+    logger.info("Checking if deployment '%s' exists in namespace '%s'...", deployment_name, namespace)
+    response = read_deployment_status(apps_api, deployment_name, namespace, fast_decode=SETTINGS.k8s.fast_decode)
     assert response is not None, f"Deployment '{deployment_name}' does not exist in namespace '{namespace}'."
-    logger.info(f"Deployment '{deployment_name}' exists.")
+    logger.info("Deployment '%s' exists.", deployment_name)
 
 
-@when('I scale "scale-test" to 1000 replicas')
-def scale_deployment(k8s_client):
-    """Scale the deployment to 1000 replicas."""
-    namespace = CONFIG["k8s"]["namespace"]
-    deployment_name = CONFIG["k8s"]["deployment_name"]
-    replicas = 1000
+@when(parsers.parse('I scale "scale-test" to {replicas:d} replicas'), target_fixture="node_tracker")
+def scale_deployment(k8s_client, k8s_informer, request, replicas):
+    """Scale the deployment, recording which nodes existed beforehand."""
+    namespace = SETTINGS.k8s.namespace
+    deployment_name = SETTINGS.k8s.deployment_name
 
     # Retrieve AppsV1Api client
     apps_api = k8s_client("AppsV1Api")
-    logger.info(f"Scaling deployment '{deployment_name}' in namespace '{namespace}' to {replicas} replicas.")
+    logger.info("Scaling deployment '%s' in namespace '%s' to %s replicas.", deployment_name, namespace, replicas)
+    node_tracker = NodeProvisioningTracker(k8s_informer("nodes"), k8s_informer("pods"), deployment_name, replicas)
+    request.addfinalizer(node_tracker.stop)
     body = {"spec": {"replicas": replicas}}
     apps_api.patch_namespaced_deployment_scale(name=deployment_name, namespace=namespace, body=body)
+    return node_tracker
 
 
-@then("new nodes should become ready within 240 seconds")
-def verify_nodes_ready(k8s_client):
-    """Measure the time taken for all nodes to become ready."""
-    core_api = k8s_client("CoreV1Api")
-    node_ready_start_time = time.time()
-    timeout = 240  # seconds
-    interval = 10  # seconds
-
-    logger.info("Waiting for all new nodes to become ready...")
-    while time.time() - node_ready_start_time < timeout:
-        nodes = core_api.list_node().items
-        ready_nodes = [
-            node.metadata.name
-            for node in nodes
-            if any(condition.type == "Ready" and condition.status == "True" for condition in node.status.conditions)
-        ]
-        logger.debug(f"Ready nodes: {ready_nodes}")
-
-        # Check if all nodes are ready
-        if len(ready_nodes) == len(nodes):
-            total_node_ready_time = time.time() - node_ready_start_time
-            logger.info(f"All nodes became ready in {total_node_ready_time:.2f} seconds.")
-            return
-        time.sleep(interval)
-
-    raise RuntimeError("Not all nodes became ready within the timeout.")
-
-
-@then("all replicas of the deployment should be running and available within 240 seconds")
-def verify_pods_ready(k8s_client):
-    """Measure the time taken for all replicas to be scheduled and available."""
-    namespace = CONFIG["k8s"]["namespace"]
-    deployment_name = CONFIG["k8s"]["deployment_name"]
-    apps_api = k8s_client("AppsV1Api")
+@then(parsers.parse("new nodes should become ready within {timeout:d} seconds"))
+def verify_nodes_ready(node_tracker, scenario_metrics, timeout):
+    """Measure the time until every replica is placed on a node and the nodes created for them are ready."""
+    logger.info("Waiting for all replicas to be scheduled and all new nodes to become ready...")
+    total_node_ready_time = node_tracker.wait_for_new_nodes_ready(timeout)
+    if total_node_ready_time is None:
+        raise RuntimeError("Not all replicas were scheduled onto ready nodes within the timeout.")
+    logger.info("All %s new nodes became ready in %.3f seconds.", len(node_tracker.nodes), total_node_ready_time)
+    scenario_metrics["all_new_nodes_ready_seconds"] = total_node_ready_time
+    scenario_metrics["new_nodes_count"] = len(node_tracker.nodes)
 
-    pod_schedule_start_time = time.time()
-    timeout = 240  # seconds
-    interval = 10  # seconds
 
-    logger.info(f"Waiting for deployment '{deployment_name}' to have all replicas running and available...")
-    while time.time() - pod_schedule_start_time < timeout:
-        response = apps_api.read_namespaced_deployment(name=deployment_name, namespace=namespace)
-        pods_ready = (
-            response.status.replicas == 1000
-            and response.status.available_replicas == 1000
+@then(parsers.parse("all replicas of the deployment should be running and available within {timeout:d} seconds"))
+def verify_pods_ready(k8s_client, scenario_metrics, request, timeout):
+    """Measure the time taken for all replicas to be scheduled and available."""
+    namespace = SETTINGS.k8s.namespace
+    deployment_name = SETTINGS.k8s.deployment_name
+    apps_api = k8s_client("AppsV1Api")
+    replicas = read_deployment_status(
+        apps_api, deployment_name, namespace, fast_decode=SETTINGS.k8s.fast_decode
+    ).spec_replicas
+
+    logger.info("Waiting for deployment '%s' to have all replicas running and available...", deployment_name)
+    # The scale-up started in the When step; the rollout curve covers the wait from here on.
+    progress = ProgressTracker(
+        deployment_name,
+        replicas,
+        stall_window=SETTINGS.scaling.stall_window,
+        rate_window=SETTINGS.scaling.rate_window,
+    )
+    try:
+        _, total_pod_ready_time = wait_for_deployment(
+            apps_api,
+            deployment_name,
+            namespace,
+            deployment_scaled_to(replicas),
+            timeout,
+            progress=progress,
+            fast_decode=SETTINGS.k8s.fast_decode,
         )
-        logger.debug(f"Deployment status: {response.status.replicas} replicas, {response.status.available_replicas} available replicas.")
-
-        if pods_ready:
-            total_pod_ready_time = time.time() - pod_schedule_start_time
-            logger.info(f"All replicas became ready in {total_pod_ready_time:.2f} seconds.")
-            return
-        time.sleep(interval)
-
-    raise RuntimeError(f"Deployment '{deployment_name}' did not scale to 1000 replicas within the timeout.")
-
-
-@then("I log the timing metrics for node and pod readiness")
-def log_timing():
-    """Log timing metrics for nodes and pods."""
-    logger.info("Timing metrics have been logged for both nodes and pods readiness.")
+    except RolloutStalledError:
+        raise
+    except WaitTimeoutError:
+        raise WaitTimeoutError(
+            f"Deployment '{deployment_name}' did not scale to {replicas} replicas within {timeout} seconds."
+        ) from None
+    finally:
+        output_dir = os.path.join(SETTINGS.metrics.output_dir, request.node.name)
+        try:
+            progress.write_report(output_dir)
+        except OSError as e:
+            # Do not replace the wait's error with a report failure.
+            logger.warning("Could not write the rollout report to %s: %s", output_dir, e)
+    logger.info("All replicas became ready in %.3f seconds.", total_pod_ready_time)
+    scenario_metrics["scale_up_seconds"] = total_pod_ready_time
+
+
+@then("I log the node readiness and pod readiness times")
+def log_timing(k8s_informer, node_tracker, scenario_metrics, request):
+    """Log node provisioning and per-pod lifecycle latency percentiles and write the raw timelines."""
+    deployment_name = SETTINGS.k8s.deployment_name
+    output_dir = os.path.join(SETTINGS.metrics.output_dir, request.node.name)
+
+    table = node_tracker.write_report(output_dir)
+    scenario_metrics.update(node_tracker.metrics())
+    logger.info("Node provisioning latencies by machine family, capacity type and node pool:\n%s", table)
+
+    # Wait for the informer too, so the lifecycle report covers every pod the scale-up created.
+    pods = wait_for_ready_pods(
+        k8s_informer("pods"), deployment_name, node_tracker.replicas, SETTINGS.scaling.timeout,
+        since=node_tracker.started,
+    )
+    assert pods is not None, f"The pod informer did not observe {node_tracker.replicas} ready '{deployment_name}' pods."
+    collector = PodLifecycleCollector(pods)
+    table = collector.write_report(output_dir)
+    scenario_metrics.update(collector.metrics())
+    logger.info("Pod lifecycle latencies for deployment '%s':\n%s", deployment_name, table)
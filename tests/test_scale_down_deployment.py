@@ -1,15 +1,20 @@
-from pytest_bdd import given, when, then, scenarios
+import os
+from pytest_bdd import given, when, then, scenarios, parsers
 from src.utils.logging_util import get_logger
-import time
-from src.utils.config_util import load_config
+from src.utils.config_util import get_settings
+from src.utils.scale_down import ScaleDownTracker
+from src.utils.records import read_deployment_status
+from src.utils.waiter import WaitTimeoutError, deployment_scaled_to, wait_for_deployment
 
 logger = get_logger(__name__)
 
 # Link the feature file
 scenarios("../features/scale_down_deployment.feature")
+# Manifests the applied_manifests fixture creates for this module
+MANIFESTS = ["scale-test-cc.yaml", "scale-test.yaml"]
 
-# Load configuration once at module level
-CONFIG = load_config()
+# Shared settings, parsed once per session
+SETTINGS = get_settings()
 
 
 @given("a Kubernetes cluster is running")
@@ -23,61 +28,143 @@ def verify_cluster_running(k8s_client):
 @given('a deployment named "scale-test" exists in the "scale-test" namespace')
 def verify_deployment_exists(k8s_client):
     """Ensure the specified deployment exists."""
-    namespace = CONFIG["k8s"]["namespace"]
-    deployment_name = CONFIG["k8s"]["deployment_name"]
+    namespace = SETTINGS.k8s.namespace
+    deployment_name = SETTINGS.k8s.deployment_name
 
     # Retrieve AppsV1Api client for deployment operations
     apps_api = k8s_client("AppsV1Api")
-    logger.info(f"Checking if deployment '{deployment_name}' exists in namespace '{namespace}'...")
-    response = apps_api.read_namespaced_deployment(name=deployment_name, namespace=namespace)
+    logger.info("Checking if deployment '%s' exists in namespace '%s'...", deployment_name, namespace)
+    response = read_deployment_status(apps_api, deployment_name, namespace, fast_decode=SETTINGS.k8s.fast_decode)
     assert response is not None, f"Deployment {deployment_name} does not exist in namespace {namespace}."
-    logger.info(f"Deployment '{deployment_name}' exists.")
+    logger.info("Deployment '%s' exists.", deployment_name)
 
 
-@when('I scale "scale-test" to 1 replica in the "scale-test" namespace')
-def scale_deployment_to_1(k8s_client):
-    """Scale the deployment to 1 replica."""
-    namespace = CONFIG["k8s"]["namespace"]
-    deployment_name = CONFIG["k8s"]["deployment_name"]
-    replicas = 1
-    timeout = CONFIG["scaling"]["timeout"]
-    interval = CONFIG["scaling"]["interval"]
+@given(parsers.parse("the deployment has been scaled up to {replicas:d} replicas"))
+def scale_deployment_up(k8s_client, k8s_informer, replicas):
+    """Scale the deployment up so the scale-down has pods and nodes to release."""
+    namespace = SETTINGS.k8s.namespace
+    deployment_name = SETTINGS.k8s.deployment_name
+    timeout = SETTINGS.scaling.timeout
+
+    apps_api = k8s_client("AppsV1Api")
+    logger.info("Scaling deployment '%s' up to %s replicas before the scale-down.", deployment_name, replicas)
+    apps_api.patch_namespaced_deployment_scale(
+        name=deployment_name, namespace=namespace, body={"spec": {"replicas": replicas}}
+    )
+    try:
+        _, elapsed = wait_for_deployment(
+            apps_api,
+            deployment_name,
+            namespace,
+            deployment_scaled_to(replicas),
+            timeout,
+            fast_decode=SETTINGS.k8s.fast_decode,
+        )
+    except WaitTimeoutError:
+        raise WaitTimeoutError(
+            f"Deployment '{deployment_name}' did not scale to {replicas} replicas within {timeout} seconds."
+        ) from None
+    # Wait for the informer too, so the scale-down tracker sees every pod.
+    pod_informer = k8s_informer("pods")
+    synced = pod_informer.wait_until(
+        lambda informer: informer.count("owner_deployment", deployment_name) >= replicas, timeout
+    )
+    assert synced is not None, f"The pod informer did not observe {replicas} '{deployment_name}' pods."
+    logger.info("Deployment '%s' scaled up to %s replicas in %.3f seconds.", deployment_name, replicas, elapsed)
+
+
+@when(
+    parsers.re(r'I scale "scale-test" to (?P<replicas>\d+) replicas? in the "scale-test" namespace'),
+    converters={"replicas": int},
+    target_fixture="scale_down_tracker",
+)
+def scale_deployment_down(k8s_client, k8s_informer, scenario_metrics, request, replicas):
+    """Scale the deployment down to the given number of replicas, tracking its pods and nodes."""
+    namespace = SETTINGS.k8s.namespace
+    deployment_name = SETTINGS.k8s.deployment_name
+    timeout = SETTINGS.scaling.timeout
 
     # Retrieve AppsV1Api client for deployment operations
     apps_api = k8s_client("AppsV1Api")
-    logger.info(f"Scaling deployment '{deployment_name}' in namespace '{namespace}' to {replicas} replicas.")
+    tracker = ScaleDownTracker(k8s_informer("pods"), k8s_informer("nodes"), deployment_name)
+    request.addfinalizer(tracker.stop)
+    logger.info("Scaling deployment '%s' in namespace '%s' to %s replicas.", deployment_name, namespace, replicas)
     body = {"spec": {"replicas": replicas}}
     apps_api.patch_namespaced_deployment_scale(name=deployment_name, namespace=namespace, body=body)
 
-    logger.info(f"Waiting for deployment '{deployment_name}' to scale to {replicas} replicas...")
-    start_time = time.time()
-    while time.time() - start_time < timeout:
-        response = apps_api.read_namespaced_deployment(name=deployment_name, namespace=namespace)
-        logger.debug(f"Current replicas: {response.status.replicas}, Available replicas: {response.status.available_replicas}")
-        if (
-            response.status.replicas == replicas
-            and response.status.available_replicas == replicas
-        ):
-            logger.info(f"Deployment '{deployment_name}' successfully scaled to {replicas} replicas.")
-            return
-        time.sleep(interval)
-
-    logger.error(f"Deployment '{deployment_name}' did not scale to {replicas} replicas within {timeout} seconds.")
-    raise RuntimeError(f"Deployment '{deployment_name}' did not scale to {replicas} replicas within {timeout} seconds.")
-
-
-@then("the deployment should have exactly 1 replica")
-def verify_single_replica(k8s_client):
-    """Verify that the deployment has scaled to 1 replica."""
-    namespace = CONFIG["k8s"]["namespace"]
-    deployment_name = CONFIG["k8s"]["deployment_name"]
+    logger.info("Waiting for deployment '%s' to scale to %s replicas...", deployment_name, replicas)
+    try:
+        _, elapsed = wait_for_deployment(
+            apps_api,
+            deployment_name,
+            namespace,
+            deployment_scaled_to(replicas),
+            timeout,
+            fast_decode=SETTINGS.k8s.fast_decode,
+        )
+    except WaitTimeoutError:
+        logger.error(
+            "Deployment '%s' did not scale to %s replicas within %s seconds.", deployment_name, replicas, timeout
+        )
+        raise WaitTimeoutError(
+            f"Deployment '{deployment_name}' did not scale to {replicas} replicas within {timeout} seconds."
+        ) from None
+    logger.info(
+        "Deployment '%s' successfully scaled to %s replicas in %.3f seconds.", deployment_name, replicas, elapsed
+    )
+    scenario_metrics["scale_down_seconds"] = elapsed
+    return tracker
+
+
+@then(parsers.re(r"the deployment should have exactly (?P<replicas>\d+) replicas?"), converters={"replicas": int})
+def verify_scaled_down(k8s_client, replicas):
+    """Verify that the deployment has scaled down to the given number of replicas."""
+    namespace = SETTINGS.k8s.namespace
+    deployment_name = SETTINGS.k8s.deployment_name
 
     # Retrieve AppsV1Api client for deployment operations
     apps_api = k8s_client("AppsV1Api")
-    logger.info(f"Verifying deployment '{deployment_name}' has exactly 1 replica...")
-    response = apps_api.read_namespaced_deployment(name=deployment_name, namespace=namespace)
-    assert response.status.replicas == 1, f"Expected 1 replica but got {response.status.replicas}."
-    assert response.status.available_replicas == 1, (
-        f"Not all replicas are available. Only {response.status.available_replicas} are available."
+    logger.info("Verifying deployment '%s' has exactly %s replicas...", deployment_name, replicas)
+    response = read_deployment_status(apps_api, deployment_name, namespace, fast_decode=SETTINGS.k8s.fast_decode)
+    assert response.replicas == replicas, f"Expected {replicas} replicas but got {response.replicas}."
+    assert response.available_replicas == replicas, (
+        f"Not all replicas are available. Only {response.available_replicas} are available."
     )
-    logger.info(f"Deployment '{deployment_name}' verification successful.")
+    logger.info("Deployment '%s' verification successful.", deployment_name)
+
+
+@then(parsers.parse("every removed pod should be gone within {timeout:d} seconds"))
+def verify_pods_gone(k8s_client, scale_down_tracker, timeout):
+    """Wait until the pods removed by the scale-down have terminated."""
+    namespace = SETTINGS.k8s.namespace
+    deployment_name = SETTINGS.k8s.deployment_name
+    replicas = read_deployment_status(
+        k8s_client("AppsV1Api"), deployment_name, namespace, fast_decode=SETTINGS.k8s.fast_decode
+    ).spec_replicas
+    logger.info("Waiting up to %s seconds for the removed '%s' pods to be gone...", timeout, deployment_name)
+    elapsed = scale_down_tracker.wait_for_pods_gone(replicas, timeout)
+    assert elapsed is not None, (
+        f"{scale_down_tracker.remaining_pods() - replicas} removed pod(s) still exist after {timeout} seconds."
+    )
+
+
+@then(parsers.parse("the drained compute-class nodes should be removed within {timeout:d} seconds"))
+def verify_nodes_removed(scale_down_tracker, timeout):
+    """Wait until the autoscaler has removed every node drained by the scale-down."""
+    logger.info("Waiting up to %s seconds for the autoscaler to remove the drained nodes...", timeout)
+    elapsed = scale_down_tracker.wait_for_nodes_removed(timeout)
+    if elapsed is None:
+        summary = scale_down_tracker.summary()
+        raise AssertionError(
+            f"Only {summary['nodes_removed']} of {summary['nodes_drained']} drained nodes were removed "
+            f"within {timeout} seconds."
+        )
+
+
+@then("I log the pod termination latencies and the node scale-down timeline")
+def log_scale_down(scale_down_tracker, scenario_metrics, request):
+    """Log how fast pods and nodes were released and write the per-pod, per-node and timeline CSVs."""
+    output_dir = os.path.join(SETTINGS.metrics.output_dir, request.node.name)
+    text = scale_down_tracker.write_report(output_dir)
+    scenario_metrics.update(scale_down_tracker.metrics())
+    logger.info("Scale-down of '%s':\n%s", scale_down_tracker.deployment_name, text)